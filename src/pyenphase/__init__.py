@@ -11,13 +11,14 @@ from .exceptions import (
     EnvoyFirmwareFatalCheckError,
     EnvoyProbeFailed,
 )
+from .fleet import EnvoyFleet, EnvoyFleetResult
 from .models.acb import EnvoyACB, EnvoyACBPower, EnvoyBatteryAggregate
 from .models.c6combiner import EnvoyC6CC
 from .models.collar import EnvoyCollar
 from .models.dry_contacts import EnvoyDryContactSettings, EnvoyDryContactStatus
 from .models.encharge import EnvoyEncharge, EnvoyEnchargeAggregate, EnvoyEnchargePower
 from .models.enpower import EnvoyEnpower
-from .models.envoy import EnvoyData
+from .models.envoy import EnvoyCompactRaw, EnvoyData, EnvoyDataChanges
 from .models.generator import (
     EnvoyGenerator,
     EnvoyGeneratorConfig,
@@ -25,6 +26,7 @@ from .models.generator import (
     EnvoyGeneratorSchedule,
 )
 from .models.inverter import EnvoyInverter
+from .models.inverter_table import EnvoyInverterTable
 from .models.system_consumption import EnvoySystemConsumption
 from .models.system_production import EnvoySystemProduction
 from .models.tariff import EnvoyTariff
@@ -34,6 +36,10 @@ __all__ = (
     "register_updater",
     "Envoy",
     "EnvoyData",
+    "EnvoyDataChanges",
+    "EnvoyCompactRaw",
+    "EnvoyFleet",
+    "EnvoyFleetResult",
     "EnvoyTokenAuth",
     "EnvoyError",
     "EnvoyCommunicationError",
@@ -43,6 +49,7 @@ __all__ = (
     "EnvoyAuthenticationRequired",
     "EnvoyProbeFailed",
     "EnvoyInverter",
+    "EnvoyInverterTable",
     "EnvoySystemConsumption",
     "EnvoySystemProduction",
     "EnvoyEncharge",
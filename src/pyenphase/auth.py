@@ -1,6 +1,11 @@
 """Envoy authentication methods."""
 
+import asyncio
+import contextlib
+import logging
+import time
 from abc import abstractmethod, abstractproperty
+from dataclasses import dataclass, replace
 from typing import Any, cast
 
 import aiohttp
@@ -8,10 +13,31 @@ import jwt
 import orjson
 from tenacity import retry, retry_if_exception_type, wait_random_exponential
 
-from .const import LOCAL_TIMEOUT, URL_AUTH_CHECK_JWT
+from .const import (
+    LOCAL_TIMEOUT,
+    SESSION_COOKIE,
+    TOKEN_REFRESH_RETRY_DELAY,
+    URL_AUTH_CHECK_JWT,
+)
 from .exceptions import EnvoyAuthenticationError, EnvoyAuthenticationRequired
 from .ssl import SSL_CONTEXT
 
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class EnvoySessionStats:
+    """Statistics of the credentials sent with token authentication."""
+
+    #: Number of requests authenticated with the Envoy session cookie
+    cookie_requests: int = 0
+    #: Number of requests authenticated with the token
+    bearer_requests: int = 0
+    #: Number of times the token was verified again for an expired session
+    renewals: int = 0
+    #: Number of new tokens obtained from Enlighten cloud to replace the token
+    refreshes: int = 0
+
 
 class EnvoyAuth:
     """Base class for local Envoy authentication."""
@@ -52,6 +78,34 @@ class EnvoyAuth:
     def headers(self) -> dict[str, str]:
         """Return the auth headers for Envoy communication."""
 
+    @property
+    def credentials_expired(self) -> bool:
+        """
+        Return True if the credentials are known to be expired.
+
+        Authentication methods without expiring credentials never expire.
+
+        :return: True if the credentials expired
+        """
+        return False
+
+    def record_request(self) -> None:
+        """Record a request sent to the Envoy with the current :any:`headers`."""
+
+    async def renew_session(self, client: aiohttp.ClientSession) -> bool:
+        """
+        Renew the Envoy session after an authentication failure.
+
+        Authentication methods without a session have nothing to renew.
+
+        :param client: an aiohttp ClientSession to communicate with the local Envoy
+        :return: True if the session was renewed and the request can be retried
+        """
+        return False
+
+    async def close(self) -> None:
+        """Stop any background work of the authentication."""
+
     @abstractmethod
     def get_endpoint_url(self, endpoint: str) -> str:
         """
@@ -78,6 +132,7 @@ class EnvoyTokenAuth(EnvoyAuth):
         cloud_password: str | None = None,
         envoy_serial: str | None = None,
         token: str | None = None,
+        refresh_margin: float | None = None,
     ) -> None:
         """
         Class to authenticate with Envoy using Tokens.
@@ -94,6 +149,9 @@ class EnvoyTokenAuth(EnvoyAuth):
         :param token: Token to use with authentication, if not specified,
             one will be obtained from Enlighten cloud if username, password
             and serial are specified, defaults to None
+        :param refresh_margin: seconds before the token expires to obtain a
+            new token from Enlighten cloud in the background, requires username,
+            password and serial, defaults to None for no background refresh
 
         """
         self.host = host
@@ -104,6 +162,12 @@ class EnvoyTokenAuth(EnvoyAuth):
         self._is_consumer: bool = False
         self._manager_token: str | None = None
         self._cookies: dict[str, str] = {}
+        self._session_stats = EnvoySessionStats()
+        self.refresh_margin = refresh_margin
+        self._refresh_task: asyncio.Task[None] | None = None
+        # decoded claims of the token, decoded once per token
+        self._claims: dict[str, Any] = {}
+        self._claims_token: str | None = None
 
     async def setup(self, client: aiohttp.ClientSession) -> None:
         """
@@ -130,22 +194,119 @@ class EnvoyTokenAuth(EnvoyAuth):
                 "Unable to obtain token for Envoy authentication."
             )
 
-        await self._check_jwt(client)
+        self._cookies = await self._check_jwt(client, self.token)
+        self._schedule_refresh(client)
+
+    @property
+    def _has_cloud_credentials(self) -> bool:
+        """Return True if a new token can be obtained from Enlighten cloud."""
+        return bool(self.cloud_username and self.cloud_password and self.envoy_serial)
+
+    def _schedule_refresh(self, client: aiohttp.ClientSession) -> None:
+        """Start refreshing the token in the background if configured."""
+        if self.refresh_margin is None or (
+            self._refresh_task is not None and not self._refresh_task.done()
+        ):
+            return
+        if not self._has_cloud_credentials:
+            _LOGGER.debug("No cloud credentials to refresh the token in background")
+            return
+        self._refresh_task = asyncio.create_task(
+            self._refresh_token(client, self.refresh_margin),
+            name=f"pyenphase token refresh {self.host}",
+        )
+
+    async def _refresh_token(
+        self, client: aiohttp.ClientSession, refresh_margin: float
+    ) -> None:
+        """Obtain a new token each time the current one nears expiration."""
+        while True:
+            try:
+                if (delay := self.expire_timestamp - refresh_margin - time.time()) > 0:
+                    _LOGGER.debug("Refreshing token in %s sec", round(delay))
+                    await asyncio.sleep(delay)
+                    # the token may have been replaced in the meantime
+                    continue
+                await self._replace_token(client)
+                if self.expire_timestamp - refresh_margin - time.time() > 0:
+                    continue
+                _LOGGER.debug("Refreshed token expires within the refresh margin")
+            # keep refreshing, whatever failed this time
+            except (
+                EnvoyAuthenticationError,
+                aiohttp.ClientError,
+                TimeoutError,
+                jwt.InvalidTokenError,
+            ) as err:
+                _LOGGER.warning("Unable to refresh token: %r", err)
+            await asyncio.sleep(TOKEN_REFRESH_RETRY_DELAY)
+
+    async def _replace_token(self, client: aiohttp.ClientSession) -> None:
+        """Obtain and verify a new token, then replace the current one."""
+        token = await self._obtain_token()
+        cookies = await self._check_jwt(client, token)
+        # replace both at once, requests never see a mix of old and new
+        self._token, self._cookies = token, cookies
+        self._session_stats.refreshes += 1
+        _LOGGER.debug("Token refreshed for Envoy %s", self.host)
+
+    async def close(self) -> None:
+        """Stop refreshing the token in the background."""
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._refresh_task
+        self._refresh_task = None
+
+    async def renew_session(self, client: aiohttp.ClientSession) -> bool:
+        """
+        Renew the Envoy session after an authentication failure.
+
+        When requests were authenticated with the Envoy session cookie,
+        the session may have expired. The token is verified with the
+        local Envoy again to obtain a new session cookie. When the Envoy
+        rejects the token, or requests were authenticated with an expired
+        token, a new token is obtained from Enlighten cloud if username,
+        password and serial are available. A valid token rejected by the
+        Envoy lacks the access for the request, there is nothing to renew.
+
+        :param client: an aiohttp ClientSession to communicate with the local Envoy
+        :raises EnvoyAuthenticationError: no new token could be obtained
+            from Enlighten cloud or the Envoy rejected it
+        :return: True if the session was renewed and the request can be retried
+        """
+        if SESSION_COOKIE in self._cookies:
+            self._cookies = {}
+            self._session_stats.renewals += 1
+            try:
+                self._cookies = await self._check_jwt(client, self.token)
+            except EnvoyAuthenticationError as err:
+                _LOGGER.debug("Unable to renew Envoy session: %s", err)
+            else:
+                return True
+        elif not self._token_expired:
+            return False
+        if not self._has_cloud_credentials:
+            return False
+        await self._replace_token(client)
+        return True
 
     @retry(
         retry=retry_if_exception_type(aiohttp.ClientError),
         wait=wait_random_exponential(multiplier=2, max=3),
     )
-    async def _check_jwt(self, client: aiohttp.ClientSession) -> None:
-        """Check the JWT token for Envoy authentication."""
+    async def _check_jwt(
+        self, client: aiohttp.ClientSession, token: str
+    ) -> dict[str, str]:
+        """Check the JWT token for Envoy authentication, return the cookies."""
         async with client.get(
             f"https://{self.host}{URL_AUTH_CHECK_JWT}",
-            headers={"Authorization": f"Bearer {self.token}"},
+            headers={"Authorization": f"Bearer {token}"},
             timeout=LOCAL_TIMEOUT,
         ) as resp:
             if resp.status == 200:
-                self._cookies = {k: v.value for k, v in resp.cookies.items()}
-                return
+                return {k: v.value for k, v in resp.cookies.items()}
 
         raise EnvoyAuthenticationError(
             "Unable to verify token for Envoy authentication."
@@ -250,8 +411,23 @@ class EnvoyTokenAuth(EnvoyAuth):
 
         :return: epoch expiration time
         """
-        jwt_payload = jwt.decode(self.token, options={"verify_signature": False})
-        return cast(int, jwt_payload["exp"])
+        return cast(int, self._token_claims["exp"])
+
+    @property
+    def _token_expired(self) -> bool:
+        """Return True if the token is known to be expired."""
+        try:
+            return self.expire_timestamp <= time.time()
+        except jwt.InvalidTokenError:
+            return False
+
+    @property
+    def _token_claims(self) -> dict[str, Any]:
+        """Return the claims of the token, decoded once per token."""
+        if self._claims_token != self.token:
+            self._claims = jwt.decode(self.token, options={"verify_signature": False})
+            self._claims_token = self.token
+        return self._claims
 
     @property
     def token_type(self) -> str:
@@ -269,8 +445,7 @@ class EnvoyTokenAuth(EnvoyAuth):
             raise EnvoyAuthenticationRequired(
                 "You must authenticate to the Envoy before inspecting token."
             )
-        jwt_payload = jwt.decode(self.token, options={"verify_signature": False})
-        return jwt_payload["enphaseUser"]
+        return self._token_claims["enphaseUser"]
 
     @retry(
         retry=retry_if_exception_type(aiohttp.ClientError),
@@ -329,6 +504,18 @@ class EnvoyTokenAuth(EnvoyAuth):
         """
         return self._cookies
 
+    @property
+    def session_stats(self) -> EnvoySessionStats:
+        """
+        Return statistics of the credentials sent to the Envoy.
+
+        Counts the requests authenticated with the Envoy session cookie
+        and with the token, and the number of times the session was renewed.
+
+        :return: copy of the current statistics
+        """
+        return replace(self._session_stats)
+
     @property
     def is_consumer(self) -> bool:
         """
@@ -363,13 +550,42 @@ class EnvoyTokenAuth(EnvoyAuth):
         """
         Return the authentication headers for Envoy communication.
 
-        Token authorization with Envoy requires an Authorization header
-        in Bearer format with token.
+        Once the token was verified with the local Envoy, the session cookie
+        it returned is sent, which the Envoy validates faster than the
+        token. Without a session cookie, an Authorization header in Bearer
+        format with token is sent.
 
-        :return: token authorization header
+        :return: session cookie or token authorization header
         """
+        if SESSION_COOKIE in self._cookies:
+            return {
+                "Cookie": "; ".join(
+                    f"{name}={value}" for name, value in self._cookies.items()
+                )
+            }
         return {"Authorization": f"Bearer {self.token}"}
 
+    @property
+    def credentials_expired(self) -> bool:
+        """
+        Return True if the token is known to be expired.
+
+        :return: True if the expiration time of the token has passed
+        """
+        return self._token_expired
+
+    def record_request(self) -> None:
+        """
+        Record a request sent to the Envoy with the current :any:`headers`.
+
+        Counts the request in :any:`session_stats` as authenticated with
+        the session cookie or with the token.
+        """
+        if SESSION_COOKIE in self._cookies:
+            self._session_stats.cookie_requests += 1
+        else:
+            self._session_stats.bearer_requests += 1
+
     def get_endpoint_url(self, endpoint: str) -> str:
         """
         Return the URL for the endpoint.
@@ -405,6 +621,11 @@ class EnvoyLegacyAuth(EnvoyAuth):
         Digest authentication for local Envoy.
 
         Creates DigestAuthMiddleware based on username and password.
+        The middleware is created once and remembers the realm and nonce of
+        the last challenge by the Envoy. Following requests send the
+        Authorization header right away with an incrementing nonce count,
+        avoiding a 401 challenge round trip for each request. A new
+        challenge is only handled when the Envoy rejects the nonce as stale.
 
         :return: DigestAuthMiddleware for local Envoy or None
             if username and/or password are not specified
@@ -413,7 +634,7 @@ class EnvoyLegacyAuth(EnvoyAuth):
             return None
         if self._auth_middleware is None:
             self._auth_middleware = aiohttp.DigestAuthMiddleware(
-                self.local_username, self.local_password
+                self.local_username, self.local_password, preemptive=True
             )
         return self._auth_middleware
 
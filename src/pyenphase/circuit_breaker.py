@@ -0,0 +1,94 @@
+"""Pyenphase circuit breaker for Envoy endpoints"""
+
+from __future__ import annotations
+
+import enum
+from dataclasses import dataclass, field
+
+from .exceptions import EnvoyCircuitOpen
+
+
+class CircuitState(enum.StrEnum):
+    """State of a circuit breaker."""
+
+    #: Requests are sent
+    CLOSED = "closed"
+    #: Requests fail right away until the cooldown has passed
+    OPEN = "open"
+    #: One trial request is sent, the outcome closes or opens the breaker again
+    HALF_OPEN = "half_open"
+
+
+@dataclass(slots=True)
+class EnvoyCircuitBreaker:
+    """
+    Circuit breaker for requests to one endpoint of an Envoy.
+
+    Opens after failure_threshold consecutive failed attempts. While
+    open, requests fail right away with :any:`EnvoyCircuitOpen`. Once
+    the cooldown has passed, it is half open and lets one trial request
+    through. A successful trial closes it, a failed one opens it again.
+    """
+
+    #: Number of consecutive failed attempts opening the breaker
+    failure_threshold: int
+    #: Time in seconds before a trial request is sent once open
+    cooldown: float
+    #: Current state
+    state: CircuitState = CircuitState.CLOSED
+    #: Number of consecutive failed attempts
+    failures: int = 0
+    #: Time the breaker last opened, as time.monotonic
+    opened_at: float = 0.0
+    #: Number of times the breaker opened
+    trips: int = 0
+    #: Number of requests failed right away as the breaker was open
+    rejected: int = 0
+    _trial: bool = field(default=False, repr=False, compare=False)
+
+    def acquire(self, endpoint: str, now: float) -> None:
+        """
+        Check a request to the endpoint can be sent.
+
+        :param endpoint: Envoy endpoint of the request
+        :param now: current time, as time.monotonic
+        :raises EnvoyCircuitOpen: if the breaker is open, or half open
+            with the trial request in progress
+        """
+        if self.state is CircuitState.CLOSED:
+            return
+        if self.state is CircuitState.OPEN:
+            if (retry_after := self.opened_at + self.cooldown - now) > 0:
+                self.rejected += 1
+                raise EnvoyCircuitOpen(endpoint, retry_after)
+            self.state = CircuitState.HALF_OPEN
+        elif self._trial:
+            self.rejected += 1
+            raise EnvoyCircuitOpen(endpoint, 0)
+        self._trial = True
+
+    def release(self) -> None:
+        """Let another trial request through, the last one did not complete."""
+        self._trial = False
+
+    def success(self) -> None:
+        """Close the breaker after a successful attempt."""
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._trial = False
+
+    def failure(self, now: float) -> None:
+        """
+        Count a failed attempt, opening the breaker at the threshold.
+
+        :param now: current time, as time.monotonic
+        """
+        self.failures += 1
+        self._trial = False
+        if self.state is CircuitState.HALF_OPEN or (
+            self.state is CircuitState.CLOSED
+            and self.failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = now
+            self.trips += 1
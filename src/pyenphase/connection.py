@@ -0,0 +1,203 @@
+"""Pyenphase connection pool helpers"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp.connector import Connection
+from aiohttp.tracing import Trace
+from multidict import CIMultiDictProxy
+from yarl import URL
+
+from .const import DEFAULT_CONNECTION_LIMIT_PER_HOST, DEFAULT_KEEPALIVE_TIMEOUT
+from .ssl import NO_VERIFY_SSL_CONTEXT, create_no_verify_ssl_context, server_port
+
+
+@dataclass(slots=True)
+class EnvoyConnectionStats:
+    """Connection pool statistics for requests to an Envoy."""
+
+    #: Number of new connections opened
+    opened: int = 0
+    #: Number of requests sent over an already open connection
+    reused: int = 0
+    #: Number of new connections that required a TLS handshake
+    tls_handshakes: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class EnvoyResponse:
+    """
+    Response of the Envoy, read completely.
+
+    Holds the status, headers and body of a response once its connection
+    was returned to the pool, without the request and connection state of
+    the aiohttp ClientResponse. Offers the same methods to read the body.
+    """
+
+    #: HTTP status of the response
+    status: int
+    #: Response body
+    content: bytes
+    #: Response headers
+    headers: CIMultiDictProxy[str]
+    #: URL of the request
+    url: URL
+    #: Character set from the content type, None if not specified
+    charset: str | None = None
+
+    @classmethod
+    async def from_response(cls, response: aiohttp.ClientResponse) -> EnvoyResponse:
+        """
+        Return the response, reading its body and releasing its connection.
+
+        :param response: aiohttp ClientResponse to read
+        :return: completely read response
+        """
+        # reading the complete body returns the connection to the pool
+        content = await response.read()
+        return cls(
+            response.status, content, response.headers, response.url, response.charset
+        )
+
+    async def read(self) -> bytes:
+        """
+        Return the response body.
+
+        :return: response body
+        """
+        return self.content
+
+    async def text(self, encoding: str | None = None, errors: str = "strict") -> str:
+        """
+        Return the response body decoded.
+
+        :param encoding: encoding to use, defaults to the response charset
+            or utf-8 if not specified
+        :param errors: how to handle decoding errors, see :py:meth:`bytes.decode`
+        :return: decoded response body
+        """
+        return self.content.decode(encoding or self.charset or "utf-8", errors)
+
+    async def json(self, loads: Callable[[str], Any] = json.loads) -> Any:
+        """
+        Return the response body parsed as JSON.
+
+        :param loads: function to parse the JSON with
+        :return: parsed response body
+        """
+        return loads(await self.text())
+
+
+class _EnvoyConnector(aiohttp.TCPConnector):
+    """TCP connector telling the SSL context the port of the server."""
+
+    async def connect(
+        self,
+        req: aiohttp.ClientRequest,
+        traces: list[Trace],
+        timeout: aiohttp.ClientTimeout,
+    ) -> Connection:
+        """Return a connection to the server, setting :any:`server_port`."""
+        token = server_port.set(req.port)
+        try:
+            return await super().connect(req, traces, timeout)
+        finally:
+            server_port.reset(token)
+
+
+def create_connector(
+    limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+    ssl_session_servers: int | None = None,
+) -> aiohttp.TCPConnector:
+    """
+    Return a connector tuned for communicating with Envoys.
+
+    Connections are kept open between requests and reused, as the
+    Envoy is slow to set up new, especially TLS, connections. The
+    number of connections to one Envoy is limited, as the Envoy is
+    slow to handle many parallel requests. Requests beyond the limit
+    wait for a connection to become available. New TLS connections
+    resume the session of the previous connection to the same Envoy,
+    see :any:`SessionResumingSSLContext`.
+
+    .. code-block:: python
+
+        import aiohttp
+        from pyenphase.connection import create_connector, create_trace_config
+
+        client = aiohttp.ClientSession(
+            connector=create_connector(),
+            trace_configs=[create_trace_config()],
+        )
+
+    :param limit_per_host: maximum number of connections to one Envoy,
+        defaults to :any:`DEFAULT_CONNECTION_LIMIT_PER_HOST`
+    :param keepalive_timeout: time in seconds to keep an idle connection
+        open, defaults to :any:`DEFAULT_KEEPALIVE_TIMEOUT`
+    :param ssl_session_servers: maximum number of Envoys to keep the
+        last TLS session of in an SSL context of the connector, if not
+        specified the connector uses :any:`NO_VERIFY_SSL_CONTEXT`, which
+        keeps :any:`DEFAULT_SSL_SESSION_SERVERS`
+    :return: connector not verifying SSL certificates
+    """
+    return _EnvoyConnector(
+        ssl=NO_VERIFY_SSL_CONTEXT
+        if ssl_session_servers is None
+        else create_no_verify_ssl_context(ssl_session_servers),
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+    )
+
+
+async def _on_request_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestStartParams,
+) -> None:
+    """Remember if the request requires a TLS connection."""
+    context.tls = params.url.scheme == "https"
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionCreateEndParams,
+) -> None:
+    """Count a new connection for the Envoy sending the request."""
+    if isinstance(stats := context.trace_request_ctx, EnvoyConnectionStats):
+        stats.opened += 1
+        stats.tls_handshakes += context.tls
+
+
+async def _on_connection_reuseconn(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionReuseconnParams,
+) -> None:
+    """Count a reused connection for the Envoy sending the request."""
+    if isinstance(stats := context.trace_request_ctx, EnvoyConnectionStats):
+        stats.reused += 1
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """
+    Return a trace config collecting connection pool statistics.
+
+    Add the trace config to a ClientSession to collect the statistics
+    available from :any:`Envoy.connection_stats` for Envoys using the
+    session. Client sessions created by pyenphase include it.
+
+    :return: trace config counting opened and reused connections
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    return trace_config
@@ -23,6 +23,13 @@ URL_PRODUCTION = "/production"
 
 # Authentication
 URL_AUTH_CHECK_JWT = "/auth/check_jwt"
+#: Envoy session cookie set when the token is verified with URL_AUTH_CHECK_JWT
+SESSION_COOKIE = "sessionId"
+#: Seconds to wait before trying again when a scheduled token refresh failed
+TOKEN_REFRESH_RETRY_DELAY = 300
+
+# Device information, small and accessible without authentication
+URL_INFO = "/info"
 
 # Battery and Enpower Status
 URL_DRY_CONTACT_STATUS = "/ivp/ensemble/dry_contacts"
@@ -75,10 +82,23 @@ GENERATOR_EXERCISE_DAYS: tuple[str, ...] = (
 # Meters data
 ENDPOINT_URL_METERS = "/ivp/meters"
 ENDPOINT_URL_METERS_READINGS = "/ivp/meters/readings"
+URL_STREAM_METER = "/stream/meter"
 
 # Interface configuration
 ENDPOINT_URL_HOME = "/home"
 
+#: Endpoints with configuration data that rarely changes. All other endpoints
+#: are live endpoints requested at each :any:`Envoy.update`. Configuration
+#: endpoints are only requested again once the configuration refresh
+#: interval of the Envoy has passed or after data was sent to the Envoy.
+CONFIGURATION_ENDPOINTS: frozenset[str] = frozenset(
+    {
+        ENDPOINT_URL_METERS,
+        URL_TARIFF,
+        URL_GEN_CONFIG,
+    }
+)
+
 # Include in docs to here
 
 LOCAL_TIMEOUT = aiohttp.ClientTimeout(
@@ -100,6 +120,109 @@ MAX_REQUEST_ATTEMPTS = DEFAULT_MAX_REQUEST_ATTEMPTS  #: deprecated alias
 MAX_PROBE_REQUEST_DELAY = 50  #: maximum elapsed probe retry time in seconds
 MAX_PROBE_REQUEST_ATTEMPTS = 4  #: maximum request probe retry attempts
 
+# A circuit breaker stops requesting an endpoint after consecutive failed
+# attempts, until a cooldown has passed, rather than waiting for its timeouts
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = (
+    60  #: default time in seconds before trying an endpoint with an open breaker
+)
+
+# Requests to an endpoint can use a timeout derived from its response times,
+# a multiple of the 99th percentile of its last responses within bounds.
+# The timeout doubles after each timed out request until a response is received
+ADAPTIVE_TIMEOUT_WINDOW = 100  #: number of response times kept per endpoint
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = (
+    10  #: number of response times needed before the timeout of an endpoint adapts
+)
+DEFAULT_ADAPTIVE_TIMEOUT_FACTOR = (
+    3  #: default multiple of the 99th percentile response time used as timeout
+)
+DEFAULT_ADAPTIVE_TIMEOUT_MIN = 5  #: default minimum adaptive timeout in seconds
+
+# Upper bounds of the histogram buckets of the request and update metrics
+METRICS_LATENCY_BUCKETS = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    45.0,
+)  #: histogram buckets in seconds for request durations
+METRICS_SIZE_BUCKETS = (
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+)  #: histogram buckets in bytes for response sizes
+METRICS_ATTEMPTS_BUCKETS = (1, 2, 3, 4, 5, 6)  #: histogram buckets for request attempts
+METRICS_PROCESSING_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)  #: histogram buckets in seconds for parsing responses and building models
+
+# Response payloads are only logged for selected endpoints, on a separate
+# logger and truncated. Recent raw responses can be kept for diagnostics,
+# compressed and limited in number and size
+PAYLOAD_LOGGER = "pyenphase.payload"  #: name of the logger for payloads
+DEFAULT_PAYLOAD_LOG_LIMIT = 1000  #: default maximum number of payload bytes logged
+DEFAULT_RECORDED_RESPONSES = 50  #: default maximum number of recorded responses
+DEFAULT_RECORDED_BYTES = (
+    1048576  #: default maximum size in bytes of the compressed recorded responses
+)
+
+# The meter stream reconnects after an interruption, doubling the delay
+# after each failed reconnect until a sample is received
+STREAM_RECONNECT_DELAY = (
+    1  #: initial delay in seconds before reconnecting the meter stream
+)
+STREAM_MAX_RECONNECT_DELAY = (
+    60  #: maximum delay in seconds before reconnecting the meter stream
+)
+
+# Updaters not depending on each other run concurrently during update,
+# limit the concurrency as the Envoy is slow to handle many parallel requests
+DEFAULT_MAX_CONCURRENCY = 4  #: default maximum number of concurrently running updaters
+
+# Connections to the Envoy are kept open and reused as the Envoy is slow to
+# set up new TLS connections. Keep idle connections open longer than the
+# aiohttp default of 15 sec, so they survive the usual polling intervals, and
+# limit the connections per Envoy as it is slow to handle parallel requests
+DEFAULT_CONNECTION_LIMIT_PER_HOST = (
+    4  #: default maximum number of connections to one Envoy
+)
+DEFAULT_KEEPALIVE_TIMEOUT = (
+    75  #: default time in seconds to keep an idle connection to an Envoy open
+)
+
+# A fleet collects data from many Envoys, limit the number of Envoys
+# polled at the same time and the time a single Envoy may take
+DEFAULT_FLEET_MAX_CONCURRENCY = (
+    16  #: default maximum number of Envoys polled concurrently by a fleet
+)
+DEFAULT_FLEET_TIMEOUT = (
+    120  #: default maximum time in seconds for a fleet to collect data from an Envoy
+)
+
+# TLS sessions are kept for resumption per server, limit the number of
+# servers so a long running application polling changing hosts does not grow
+DEFAULT_SSL_SESSION_SERVERS = (
+    256  #: default maximum number of servers to keep the last TLS session of
+)
+
 
 class SupportedFeatures(enum.IntFlag):
     """
@@ -156,6 +279,14 @@ class PhaseNames(enum.StrEnum):
     PHASE_3 = "L3"  #: third phase (3, C, ..)
 
 
+class RawRetention(enum.StrEnum):
+    """How response data is kept in :any:`EnvoyData.raw`."""
+
+    PARSED = "parsed"  #: keep the parsed JSON content
+    COMPACT = "compact"  #: keep compact JSON bytes, decoded on access
+    NONE = "none"  #: keep no response data
+
+
 #: list to access :any:`PhaseNames` by numerical index.
 #:
 #: .. code-block:: python
@@ -0,0 +1,104 @@
+"""Pyenphase diagnostics of raw Envoy responses"""
+
+from __future__ import annotations
+
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+
+from .const import DEFAULT_RECORDED_BYTES, DEFAULT_RECORDED_RESPONSES
+
+
+@dataclass(slots=True, frozen=True)
+class EnvoyRecordedResponse:
+    """Raw response of the Envoy, kept compressed."""
+
+    #: Requested Envoy endpoint
+    endpoint: str
+    #: HTTP status of the response
+    status: int
+    #: Time the response was received, as time.time
+    received: float
+    #: Size of the response body in bytes
+    size: int
+    #: Response body compressed with zlib
+    compressed: bytes
+
+    @property
+    def content(self) -> bytes:
+        """
+        Return the response body.
+
+        :return: decompressed response body
+        """
+        return zlib.decompress(self.compressed)
+
+
+class EnvoyResponseRecorder:
+    """Ring buffer of the most recent raw responses of an Envoy."""
+
+    def __init__(
+        self,
+        max_responses: int = DEFAULT_RECORDED_RESPONSES,
+        max_bytes: int = DEFAULT_RECORDED_BYTES,
+    ) -> None:
+        """
+        Ring buffer of the most recent raw responses of an Envoy.
+
+        Responses are compressed when recorded. When more than
+        max_responses responses are recorded, or their compressed size
+        exceeds max_bytes, the oldest responses are dropped.
+
+        :param max_responses: maximum number of responses to keep, defaults
+            to :any:`DEFAULT_RECORDED_RESPONSES`
+        :param max_bytes: maximum compressed size in bytes of the responses
+            to keep, defaults to :any:`DEFAULT_RECORDED_BYTES`
+        :raises ValueError: if max_responses or max_bytes is less than 1
+        """
+        if max_responses < 1:
+            raise ValueError("max_responses must be 1 or more")
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be 1 or more")
+        self._max_bytes = max_bytes
+        self._responses: deque[EnvoyRecordedResponse] = deque(maxlen=max_responses)
+        self._bytes = 0
+
+    def record(self, endpoint: str, status: int, content: bytes) -> None:
+        """
+        Record a response, dropping the oldest ones beyond the limits.
+
+        :param endpoint: requested Envoy endpoint
+        :param status: HTTP status of the response
+        :param content: response body
+        """
+        # fastest compression, responses are recorded while collecting data
+        compressed = zlib.compress(content, 1)
+        if len(self._responses) == self._responses.maxlen:
+            self._bytes -= len(self._responses[0].compressed)
+        self._responses.append(
+            EnvoyRecordedResponse(
+                endpoint, status, time.time(), len(content), compressed
+            )
+        )
+        self._bytes += len(compressed)
+        while self._bytes > self._max_bytes:
+            self._bytes -= len(self._responses.popleft().compressed)
+
+    @property
+    def responses(self) -> list[EnvoyRecordedResponse]:
+        """
+        Return the recorded responses.
+
+        :return: recorded responses, oldest first
+        """
+        return list(self._responses)
+
+    @property
+    def size(self) -> int:
+        """
+        Return the compressed size of the recorded responses.
+
+        :return: size in bytes
+        """
+        return self._bytes
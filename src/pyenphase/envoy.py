@@ -1,10 +1,12 @@
 """Enphase Envoy class"""
 
 import asyncio
+import copy
 import logging
+import math
 import time
-from collections.abc import Awaitable, Callable
-from dataclasses import replace
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import fields, replace
 from functools import cached_property, partial
 from http import HTTPStatus
 from typing import TYPE_CHECKING, Any, TypeVar, overload
@@ -31,10 +33,23 @@ from .auth import (
     EnvoyLegacyAuth,
     EnvoyTokenAuth,
 )
+from .circuit_breaker import EnvoyCircuitBreaker
+from .connection import (
+    EnvoyConnectionStats,
+    EnvoyResponse,
+    create_connector,
+    create_trace_config,
+)
 from .const import (
     AUTH_TOKEN_MIN_VERSION,
+    CONFIGURATION_ENDPOINTS,
+    DEFAULT_ADAPTIVE_TIMEOUT_FACTOR,
+    DEFAULT_ADAPTIVE_TIMEOUT_MIN,
+    DEFAULT_CIRCUIT_BREAKER_COOLDOWN,
+    DEFAULT_MAX_CONCURRENCY,
     DEFAULT_MAX_REQUEST_ATTEMPTS,
     DEFAULT_MAX_REQUEST_DELAY,
+    DEFAULT_PAYLOAD_LOG_LIMIT,
     ENDPOINT_URL_HOME,
     GENERATOR_EXERCISE_DAYS,
     GENERATOR_MODES,
@@ -42,6 +57,9 @@ from .const import (
     LOCAL_TIMEOUT,
     MAX_PROBE_REQUEST_ATTEMPTS,
     MAX_PROBE_REQUEST_DELAY,
+    PAYLOAD_LOGGER,
+    STREAM_MAX_RECONNECT_DELAY,
+    STREAM_RECONNECT_DELAY,
     URL_ACB_CONFIG,
     URL_DRY_CONTACT_SETTINGS,
     URL_DRY_CONTACT_STATUS,
@@ -49,11 +67,18 @@ from .const import (
     URL_GEN_MODE,
     URL_GEN_SCHEDULE,
     URL_GRID_RELAY,
+    URL_INFO,
+    URL_STREAM_METER,
     URL_TARIFF,
+    PhaseNames,
+    RawRetention,
     SupportedFeatures,
 )
+from .diagnostics import EnvoyRecordedResponse, EnvoyResponseRecorder
 from .exceptions import (
+    EnvoyAuthenticationError,
     EnvoyAuthenticationRequired,
+    EnvoyCircuitOpen,
     EnvoyCommunicationError,
     EnvoyError,
     EnvoyFeatureNotAvailable,
@@ -63,12 +88,15 @@ from .exceptions import (
 )
 from .firmware import EnvoyFirmware
 from .json import json_loads
+from .latency import EnvoyEndpointLatency
+from .metrics import EnvoyMetrics
 from .models.common import CommonProperties
-from .models.envoy import EnvoyData
+from .models.envoy import EnvoyCompactRaw, EnvoyData, EnvoyDataChanges
 from .models.generator import EnvoyGeneratorConfig, EnvoyGeneratorSchedule
-from .models.meters import CtType, EnvoyPhaseMode
+from .models.inverter_table import EnvoyInverterTable
+from .models.meters import CtType, EnvoyMeterStreamData, EnvoyPhaseMode
 from .models.tariff import EnvoyStorageMode
-from .ssl import NO_VERIFY_SSL_CONTEXT
+from .tracing import SPAN_PROBE, SPAN_REQUEST, SPAN_UPDATE, span
 from .updaters.api_v1_production import EnvoyApiV1ProductionUpdater
 from .updaters.api_v1_production_inverters import EnvoyApiV1ProductionInvertersUpdater
 from .updaters.base import EnvoyUpdater
@@ -85,6 +113,7 @@ from .updaters.production import (
 from .updaters.tariff import EnvoyTariffUpdater
 
 _LOGGER = logging.getLogger(__name__)
+_PAYLOAD_LOGGER = logging.getLogger(PAYLOAD_LOGGER)
 
 _ModelT = TypeVar("_ModelT")
 
@@ -132,6 +161,210 @@ def register_updater(updater: type[EnvoyUpdater]) -> Callable[[], None]:
     return _remove_updater
 
 
+def _update_dependencies(updaters: list[EnvoyUpdater]) -> list[list[int]]:
+    """
+    Return the index of the updaters each updater depends on during update.
+
+    An updater depends on all prior updaters providing any of the features
+    in its update_depends_on, or on all prior updaters if it does not
+    declare its dependencies.
+
+    :param updaters: updaters in order of registration
+    :return: for each updater the index of the updaters it depends on
+    """
+    return [
+        [
+            prior
+            for prior in range(index)
+            if (depends_on := updater.update_depends_on) is None
+            or updaters[prior]._supported_features & depends_on
+        ]
+        for index, updater in enumerate(updaters)
+    ]
+
+
+def _probe_dependencies(updaters: list[type[EnvoyUpdater]]) -> list[list[int]]:
+    """
+    Return the index of the updaters each updater depends on during probe.
+
+    An updater depends on all prior updaters that may provide any of the
+    features in its probe_depends_on, or on all prior updaters if it does
+    not declare its dependencies. Prior updaters not declaring the
+    features they provide may provide any feature.
+
+    :param updaters: updater classes in order of registration
+    :return: for each updater the index of the updaters it depends on
+    """
+
+    def _depends(depends_on: SupportedFeatures | None, prior: int) -> bool:
+        if depends_on is None:
+            return True
+        provides = updaters[prior].probe_provides
+        return bool(depends_on) and (provides is None or bool(provides & depends_on))
+
+    return [
+        [prior for prior in range(index) if _depends(updater.probe_depends_on, prior)]
+        for index, updater in enumerate(updaters)
+    ]
+
+
+#: EnvoyData fields holding a dict of items, possibly set by multiple updaters
+_DICT_FIELDS = frozenset(
+    data_field.name
+    for data_field in fields(EnvoyData)
+    if data_field.default_factory is dict
+)
+
+
+def _copy_data(data: EnvoyData) -> EnvoyData:
+    """
+    Return a copy of Envoy data with its own dicts of items.
+
+    :param data: Envoy data to copy
+    :return: copy of data, dict fields are copied, other values shared
+    """
+    copied = copy.copy(data)
+    for name in _DICT_FIELDS:
+        setattr(copied, name, dict(getattr(data, name)))
+    return copied
+
+
+def _data_changes(before: EnvoyData, after: EnvoyData) -> dict[str, Any]:
+    """
+    Return fields and dict items set in after that differ from before.
+
+    Values are compared by identity, data extracted by an updater is
+    a new object unless the updater reuses data it extracted before from
+    an unchanged response.
+
+    :param before: Envoy data before the updater ran
+    :param after: Envoy data after the updater ran
+    :return: changed values keyed by field name, for dict fields the
+        dict of changed items
+    """
+    changes: dict[str, Any] = {}
+    for data_field in fields(EnvoyData):
+        name = data_field.name
+        value = getattr(after, name)
+        previous = getattr(before, name)
+        if name in _DICT_FIELDS:
+            if items := {
+                key: item
+                for key, item in value.items()
+                if key not in previous or previous[key] is not item
+            }:
+                changes[name] = items
+        elif value is not previous:
+            changes[name] = value
+    return changes
+
+
+def _merge_changes(data: EnvoyData, changes: dict[str, Any]) -> None:
+    """
+    Store changes returned by _data_changes in Envoy data.
+
+    :param data: Envoy data to store changes in
+    :param changes: changed values keyed by field name
+    """
+    for name, value in changes.items():
+        if name in _DICT_FIELDS:
+            getattr(data, name).update(value)
+        else:
+            setattr(data, name, value)
+
+
+def _changed_keys(before: dict[Any, Any], after: dict[Any, Any]) -> set[Any]:
+    """
+    Return keys added, removed or with a changed value in after.
+
+    :param before: dict to compare with
+    :param after: dict to compare
+    :return: keys of the changed items
+    """
+    changed = set(before.keys() ^ after.keys())
+    changed.update(
+        key
+        for key, value in after.items()
+        if key in before and before[key] is not value and before[key] != value
+    )
+    return changed
+
+
+def _data_diff(before: EnvoyData, after: EnvoyData) -> EnvoyDataChanges:
+    """
+    Return the changes in Envoy data compared to earlier Envoy data.
+
+    Values are compared by identity first, so data reused by updaters
+    is not compared in depth.
+
+    :param before: Envoy data of the previous update
+    :param after: Envoy data of this update
+    :return: changed fields, inverters, CT meters and CT meter phases
+    """
+    changes = EnvoyDataChanges()
+    for data_field in fields(EnvoyData):
+        name = data_field.name
+        value = getattr(after, name)
+        previous = getattr(before, name)
+        if value is not previous and value != previous:
+            changes.fields.add(name)
+    if "inverters" in changes.fields:
+        changes.inverters = _changed_keys(before.inverters, after.inverters)
+    if "ctmeters" in changes.fields:
+        changes.ctmeters = _changed_keys(before.ctmeters, after.ctmeters)
+    if "ctmeters_phases" in changes.fields:
+        for ct_type in before.ctmeters_phases.keys() | after.ctmeters_phases.keys():
+            changes.ctmeters_phases.update(
+                (ct_type, phase)
+                for phase in _changed_keys(
+                    before.ctmeters_phases.get(ct_type, {}),
+                    after.ctmeters_phases.get(ct_type, {}),
+                )
+            )
+    return changes
+
+
+#: phase names used in the meter stream
+_STREAM_PHASES: dict[str, PhaseNames] = {
+    "ph-a": PhaseNames.PHASE_1,
+    "ph-b": PhaseNames.PHASE_2,
+    "ph-c": PhaseNames.PHASE_3,
+}
+
+
+def _parse_meter_stream_line(
+    line: bytes,
+) -> dict[str, dict[str, EnvoyMeterStreamData]] | None:
+    """
+    Return the CT meter phase samples in a line of the meter stream.
+
+    The meter stream sends server-sent events, each sample is a line
+    with a JSON object prefixed by ``data:``.
+
+    :param line: line received from the meter stream
+    :return: samples keyed by :any:`CtType` and :any:`PhaseNames`, None
+        if the line holds no sample
+    """
+    line = line.strip()
+    if line.startswith(b"data:"):
+        line = line[5:].lstrip()
+    if not line.startswith(b"{"):
+        return None
+    try:
+        stream_data: dict[str, dict[str, dict[str, Any]]] = orjson.loads(line)
+        return {
+            ct_type: {
+                _STREAM_PHASES[phase]: EnvoyMeterStreamData.from_stream(phase_data)
+                for phase, phase_data in phases.items()
+                if phase in _STREAM_PHASES
+            }
+            for ct_type, phases in stream_data.items()
+        }
+    except (orjson.JSONDecodeError, AttributeError, KeyError, TypeError) as err:
+        _LOGGER.debug("Skipping invalid meter stream data %s: %s", line[:200], err)
+        return None
+
+
 def get_updaters() -> list[type[EnvoyUpdater]]:
     """
     Return list of registered updaters.
@@ -154,6 +387,11 @@ class Envoy:
         client: aiohttp.ClientSession | None = None,
         timeout: float | aiohttp.ClientTimeout | None = None,
         v2_acb_mode: bool = True,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        configuration_refresh_interval: float = 0,
+        circuit_breaker_threshold: int = 0,
+        circuit_breaker_cooldown: float = DEFAULT_CIRCUIT_BREAKER_COOLDOWN,
+        metrics: EnvoyMetrics | None = None,
     ) -> None:
         """
         Class for communicating with an envoy.
@@ -179,30 +417,74 @@ class Envoy:
 
         :param host: Envoy DNS name or IP address
         :param client: aiohttp ClientSession not verifying SSL
-            certificates, if not specified one will be created. In
-            that case call :py:meth:`Envoy.close` before application
+            certificates, if not specified one will be created using
+            :any:`create_connector`, reusing connections to the Envoy.
+            In that case call :py:meth:`Envoy.close` before application
             exit.
-        :param timeout: aiohttp ClientTimeout to use, if not specified
-            10 sec connection and 45 sec read timeouts will be used
-            (:any:`LOCAL_TIMEOUT`).
+        :param timeout: aiohttp ClientTimeout or total timeout in seconds
+            to use, if not specified 10 sec connection and 45 sec read
+            timeouts will be used (:any:`LOCAL_TIMEOUT`). When adaptive
+            timeouts are used, this remains the upper bound, see
+            :py:meth:`Envoy.set_adaptive_timeout`.
         :param v2_acb_mode: in v3 acb data is not included in inverter data as it
             is (incorrectly) in v2. This may break applications. Use this mode to
             include acb battery data in inverter data. In v3 this defaults to True.
             In a future version this default will be set to False.
-        """
+        :param max_concurrency: maximum number of updaters to run concurrently
+            during :py:meth:`Envoy.update`, defaults to :any:`DEFAULT_MAX_CONCURRENCY`.
+            Use 1 to run the updaters one after the other.
+        :param configuration_refresh_interval: minimum time in seconds between
+            requests to :any:`CONFIGURATION_ENDPOINTS` during :py:meth:`Envoy.update`.
+            In between, the last response and the data extracted from it are
+            reused. Sending data to the Envoy forces a new request at next update.
+            Defaults to 0, requesting these at each update.
+        :param circuit_breaker_threshold: number of consecutive failed attempts
+            to request an endpoint after which its circuit breaker opens, see
+            :any:`circuit_breakers`. Defaults to 0, not using circuit breakers.
+        :param circuit_breaker_cooldown: time in seconds an open circuit breaker
+            fails requests right away before trying the endpoint again, defaults
+            to :any:`DEFAULT_CIRCUIT_BREAKER_COOLDOWN`
+        :param metrics: registry to record request, parse and model build
+            metrics of this Envoy in, see :any:`EnvoyMetrics`. Defaults to
+            None, not recording metrics.
+        :raises ValueError: if max_concurrency is less than 1,
+            configuration_refresh_interval or circuit_breaker_threshold is
+            negative or circuit_breaker_cooldown is not positive
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be 1 or more")
+        if configuration_refresh_interval < 0:
+            raise ValueError("configuration_refresh_interval can not be negative")
+        if circuit_breaker_threshold < 0:
+            raise ValueError("circuit_breaker_threshold can not be negative")
+        if circuit_breaker_cooldown <= 0:
+            raise ValueError("circuit_breaker_cooldown must be positive")
         # We use our own aiohttp client session so we can disable SSL verification (Envoys use self-signed SSL certs)
-        self._timeout = timeout or LOCAL_TIMEOUT
-        connector = aiohttp.TCPConnector(ssl=NO_VERIFY_SSL_CONTEXT)
-        self._client = client or aiohttp.ClientSession(connector=connector)  # nosec
+        if not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout) if timeout else LOCAL_TIMEOUT
+        self._timeout: aiohttp.ClientTimeout = timeout
+        self._client = client or aiohttp.ClientSession(
+            connector=create_connector(), trace_configs=[create_trace_config()]
+        )  # nosec
         self._user_client = client is not None
         self.auth: EnvoyAuth | None = None
         self._host = host
         self._firmware = EnvoyFirmware(self._client, self._host)
         self._supported_features: SupportedFeatures | None = None
         self._updaters: list[EnvoyUpdater] = []
-        self._endpoint_cache: dict[str, aiohttp.ClientResponse] = {}
+        self._endpoint_cache: dict[str, EnvoyResponse] = {}
+        self._pending_requests: dict[str, asyncio.Future[EnvoyResponse]] = {}
+        self._coalesced_requests: int = 0
+        self._connection_stats = EnvoyConnectionStats()
+        # incremented when the credentials change, to retry requests that
+        # failed authentication with the previous credentials
+        self._auth_generation: int = 0
+        self._auth_recovery: asyncio.Task[bool] | None = None
         self.data: EnvoyData | None = None
         self._common_properties: CommonProperties = CommonProperties()
+        self._metrics = metrics
+        if metrics is not None:
+            self._common_properties.observe_parse = partial(metrics.observe_parse, host)
         self._interface_settings: EnvoyInterfaceInformation | None = None
         self._request_max_attempts: int = DEFAULT_MAX_REQUEST_ATTEMPTS
         self._request_max_delay: int = DEFAULT_MAX_REQUEST_DELAY
@@ -211,6 +493,35 @@ class Envoy:
         self._request_last_elapsed: float = 0.0
         self._request_last_endpoint: str = ""
         self._v2_acb_mode: bool = v2_acb_mode
+        self._max_concurrency: int = max_concurrency
+        self._configuration_refresh_interval: float = configuration_refresh_interval
+        self._configuration_responses: dict[str, tuple[float, EnvoyResponse]] = {}
+        self._circuit_breaker_threshold: int = circuit_breaker_threshold
+        self._circuit_breaker_cooldown: float = circuit_breaker_cooldown
+        self._circuit_breakers: dict[str, EnvoyCircuitBreaker] = {}
+        self._endpoint_latency: dict[str, EnvoyEndpointLatency] = {}
+        self._adaptive_timeout_factor: float = 0
+        self._adaptive_timeout_min: float = DEFAULT_ADAPTIVE_TIMEOUT_MIN
+        self._adaptive_timeout_max: float | None = None
+        self._payload_endpoints: frozenset[str] = frozenset()
+        self._payload_log_limit: int = DEFAULT_PAYLOAD_LOG_LIMIT
+        self._response_recorder: EnvoyResponseRecorder | None = None
+        self._raw_retention: RawRetention = RawRetention.PARSED
+        self._raw_endpoints: frozenset[str] | None = None
+        # per endpoint, last response data kept compact
+        self._compact_raw: dict[str, EnvoyCompactRaw] = {}
+        # incremented when data is sent, responses requested before are not reused
+        self._configuration_generation: int = 0
+        self._update_intervals: dict[type[EnvoyUpdater], float] = {}
+        # per updater index, time of last data collection and data collected
+        self._updater_changes: dict[int, tuple[float, dict[str, Any]]] = {}
+        # per EnvoyData field, time the data in self.data was collected
+        self._data_collected: dict[str, float] = {}
+        self._changes: EnvoyDataChanges | None = None
+        # per EnvoyData field, update generation in which it last changed
+        self._generations: dict[str, int] = {
+            data_field.name: 0 for data_field in fields(EnvoyData)
+        }
 
     async def setup(self) -> None:
         """
@@ -248,8 +559,12 @@ class Envoy:
 
           - Envoy will not close the provided session; the caller remains responsible.
 
+        Also stops refreshing the token in the background.
+
         :return: None
         """
+        if self.auth:
+            await self.auth.close()
         if not self._user_client and not self._client.closed:
             await self._client.close()
 
@@ -258,6 +573,8 @@ class Envoy:
         username: str | None = None,
         password: str | None = None,
         token: str | None = None,
+        warm_up: bool = False,
+        token_refresh_margin: float | None = None,
     ) -> None:
         """
         Authenticate to the Envoy based on firmware version.
@@ -272,10 +589,21 @@ class Envoy:
         :param username: Enligthen Cloud username or local Envoy username, defaults to None
         :param password: Enligthen Cloud password or local Envoy password, defaults to None
         :param token: Token to use with authentication, defaults to None
+        :param warm_up: open connections to the Envoy once authenticated, so
+            the first update does not have to, see :py:meth:`Envoy.warm_up`.
+            Defaults to False
+        :param token_refresh_margin: with token authentication, seconds before
+            the token expires to obtain a new token from Enlighten cloud in the
+            background, requires username and password. Defaults to None for no
+            background refresh
         :raises EnvoyAuthenticationRequired: Authentication failed with the local Envoy,
             provided token is expired or no token could be obtained from Enlighten cloud
             due to error or missing parameters.
         """
+        if self.auth:
+            # stop background work of the authentication being replaced
+            await self.auth.close()
+
         if self._firmware.version < AUTH_TOKEN_MIN_VERSION:
             # Envoy firmware using old envoy/installer authentication
             _LOGGER.debug(
@@ -309,6 +637,7 @@ class Envoy:
                     cloud_password=password,
                     envoy_serial=self._firmware.serial,
                     token=token,
+                    refresh_margin=token_refresh_margin,
                 )
 
         if not self.auth:
@@ -318,6 +647,42 @@ class Envoy:
             raise EnvoyAuthenticationRequired("Could not setup authentication object.")
 
         await self.auth.setup(self._client)
+        self._auth_generation += 1
+        if warm_up:
+            await self.warm_up()
+
+    async def warm_up(self, connections: int | None = None) -> None:
+        """
+        Open connections to the Envoy ahead of data collection.
+
+        Sends concurrent requests for the small /info endpoint, so the
+        connection pool holds the connections, including their TLS
+        handshakes, used by the next :py:meth:`Envoy.update`. Use after
+        authentication or when the Envoy was unreachable for some time.
+        Failing requests are only logged, the update will open the
+        connections instead.
+
+        :param connections: number of connections to open, defaults to
+            the maximum number of concurrently running updaters
+        :raises EnvoyAuthenticationRequired: if no prior authentication
+            was completed
+        """
+        if self.auth is None:
+            raise EnvoyAuthenticationRequired(
+                "You must authenticate to the Envoy before making requests."
+            )
+
+        async def _open_connection() -> None:
+            response = await self._request(URL_INFO)
+            await response.read()
+
+        results = await asyncio.gather(
+            *(_open_connection() for _ in range(connections or self._max_concurrency)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.debug("Connection warm-up to %s failed: %r", self.host, result)
 
     @retry(
         retry=retry_if_exception_type(
@@ -373,6 +738,9 @@ class Envoy:
         ever comes first. Adjust these settings using
         :py:meth:`pyenphase.Envoy.set_retry_policy`
 
+        When circuit breakers are used, GET requests to an endpoint with an
+        open circuit breaker fail right away, also between retries.
+
         :param endpoint: Envoy Endpoint to access, start with leading /
         :param data: optional data dictionary to send to the Envoy.
             Defaults to none, if none a GET request is issued.
@@ -380,34 +748,89 @@ class Envoy:
             if none and data is specified, POST is default.
         :raises EnvoyAuthenticationRequired: if no prior authentication
             was completed or HTTP status 401 or 404 is returned.
+        :raises EnvoyCircuitOpen: if the circuit breaker of the endpoint is open
         :raises: Any communication errors when retries are exceeded
         :return: request response.
         """
-        self._request_last_attempts = 0
-        self._request_last_elapsed = 0
-        self._request_last_endpoint = endpoint
-
-        async for attempt in AsyncRetrying(
-            wait=wait_random_exponential(
-                multiplier=self._request_wait_multiplier, max=5
-            ),
-            stop=stop_after_delay(self._request_max_delay)
-            | stop_after_attempt(self._request_max_attempts),
-            retry=retry_if_exception_type(
-                (
-                    aiohttp.ClientError,
-                    asyncio.TimeoutError,
-                )
-            ),
-            reraise=True,
-            before_sleep=before_sleep_log(_LOGGER, logging.DEBUG),
-        ):
-            with attempt:
-                result = await self._request(endpoint, data, method)
-            self._request_last_attempts = attempt.retry_state.attempt_number
-            self._request_last_elapsed = attempt.retry_state.seconds_since_start
+        attempts = 0
+        elapsed: float | None = 0.0
+        try:
+            async for attempt in AsyncRetrying(
+                wait=wait_random_exponential(
+                    multiplier=self._request_wait_multiplier, max=5
+                ),
+                stop=stop_after_delay(self._request_max_delay)
+                | stop_after_attempt(self._request_max_attempts),
+                retry=retry_if_exception_type(
+                    (
+                        aiohttp.ClientError,
+                        asyncio.TimeoutError,
+                    )
+                ),
+                reraise=True,
+                before_sleep=before_sleep_log(_LOGGER, logging.DEBUG),
+            ):
+                with attempt:
+                    if self._circuit_breaker_threshold and data is None:
+                        result = await self._guarded_request(endpoint)
+                    else:
+                        result = await self._request(endpoint, data, method)
+                attempts = attempt.retry_state.attempt_number
+                elapsed = attempt.retry_state.seconds_since_start
+        except asyncio.CancelledError:
+            # a cancelled request did not complete, leave statistics as is
+            raise
+        except BaseException:
+            self._set_request_statistics(endpoint, attempts, elapsed)
+            raise
+        self._set_request_statistics(endpoint, attempts, elapsed)
         return result
 
+    async def _guarded_request(self, endpoint: str) -> aiohttp.ClientResponse:
+        """
+        Make a GET request to the Envoy guarded by the endpoint circuit breaker.
+
+        :param endpoint: Envoy Endpoint to access, start with leading /
+        :raises EnvoyCircuitOpen: if the circuit breaker of the endpoint is open
+        :return: request response
+        """
+        if (breaker := self._circuit_breakers.get(endpoint)) is None:
+            breaker = self._circuit_breakers[endpoint] = EnvoyCircuitBreaker(
+                self._circuit_breaker_threshold, self._circuit_breaker_cooldown
+            )
+        breaker.acquire(endpoint, time.monotonic())
+        try:
+            response = await self._request(endpoint)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            breaker.failure(time.monotonic())
+            raise
+        except BaseException:
+            # not a failure of the endpoint, like a cancelled request
+            breaker.release()
+            raise
+        breaker.success()
+        return response
+
+    def _set_request_statistics(
+        self, endpoint: str, attempts: int, elapsed: float | None
+    ) -> None:
+        """
+        Store the statistics of a completed request.
+
+        Requests may run concurrently, the statistics of a request are
+        stored together when it completes so they are not mixed with the
+        statistics of other requests.
+
+        :param endpoint: Envoy endpoint of the request
+        :param attempts: number of attempts made for the request
+        :param elapsed: time elapsed since first attempt
+        """
+        self._request_last_endpoint = endpoint
+        self._request_last_attempts = attempts
+        self._request_last_elapsed = elapsed or 0.0
+        if self._metrics is not None and attempts:
+            self._metrics.observe_attempts(self._host, endpoint, attempts)
+
     def set_retry_policy(
         self,
         *,
@@ -446,12 +869,277 @@ class Envoy:
             self._request_wait_multiplier,
         )
 
+    def set_adaptive_timeout(
+        self,
+        *,
+        factor: float = DEFAULT_ADAPTIVE_TIMEOUT_FACTOR,
+        min_timeout: float = DEFAULT_ADAPTIVE_TIMEOUT_MIN,
+        max_timeout: float | None = None,
+    ) -> None:
+        """
+        Set the timeout of GET requests to each endpoint from its response times.
+
+        Once :any:`ADAPTIVE_TIMEOUT_MIN_SAMPLES` responses of an endpoint
+        were received, requests to it time out after factor times the 99th
+        percentile of its last :any:`ADAPTIVE_TIMEOUT_WINDOW` response times,
+        limited to min_timeout and max_timeout. Fast endpoints then fail
+        and are retried quickly, rather than waiting for the timeout of the
+        slowest endpoint. After each timed out request to an endpoint its
+        timeout doubles, until a response is received. The total timeout
+        specified for the Envoy remains the upper bound.
+
+        .. code-block:: python
+
+            envoy.set_adaptive_timeout(factor=4, min_timeout=2)
+
+        :param factor: multiple of the 99th percentile response time used as
+            timeout, defaults to :any:`DEFAULT_ADAPTIVE_TIMEOUT_FACTOR`.
+            Use 0 to stop adapting timeouts.
+        :param min_timeout: minimum timeout in seconds, defaults to
+            :any:`DEFAULT_ADAPTIVE_TIMEOUT_MIN`
+        :param max_timeout: maximum timeout in seconds, defaults to the
+            total timeout specified for the Envoy
+        :raises ValueError: if factor is negative, min_timeout is not positive
+            or max_timeout is less than min_timeout
+        """
+        if factor < 0:
+            raise ValueError("factor can not be negative")
+        if min_timeout <= 0:
+            raise ValueError("min_timeout must be positive")
+        if max_timeout is not None and max_timeout < min_timeout:
+            raise ValueError("max_timeout can not be less than min_timeout")
+        self._adaptive_timeout_factor = factor
+        self._adaptive_timeout_min = min_timeout
+        self._adaptive_timeout_max = max_timeout
+        _LOGGER.debug(
+            "Adaptive timeout set to %s times p99 between %s and %s seconds",
+            factor,
+            min_timeout,
+            max_timeout,
+        )
+
+    def _request_timeout(self, endpoint: str) -> aiohttp.ClientTimeout:
+        """
+        Return the timeout for a GET request to the endpoint.
+
+        :param endpoint: Envoy endpoint of the request
+        :return: adaptive timeout of the endpoint if available, the
+            timeout specified for the Envoy otherwise
+        """
+        if not self._adaptive_timeout_factor or (
+            (latency := self._endpoint_latency.get(endpoint)) is None
+        ):
+            return self._timeout
+        maximum = self._timeout.total or self._timeout.sock_read or math.inf
+        if self._adaptive_timeout_max is not None:
+            maximum = min(maximum, self._adaptive_timeout_max)
+        timeout = latency.timeout(
+            self._adaptive_timeout_factor, self._adaptive_timeout_min, maximum
+        )
+        if timeout is None:
+            return self._timeout
+        return aiohttp.ClientTimeout(
+            total=timeout,
+            connect=self._timeout.connect,
+            sock_read=self._timeout.sock_read,
+            sock_connect=self._timeout.sock_connect,
+        )
+
+    def set_payload_logging(
+        self, *endpoints: str, limit: int = DEFAULT_PAYLOAD_LOG_LIMIT
+    ) -> None:
+        """
+        Log the payloads of requests to the specified endpoints.
+
+        Requests are logged at debug level without their payloads. For the
+        specified endpoints, data sent and responses received are logged at
+        debug level on the :any:`PAYLOAD_LOGGER` logger as well, truncated
+        to limit bytes. Specify :any:`URL_INFO` to log the firmware
+        information read by :py:meth:`setup`. Call without endpoints to
+        stop logging payloads.
+
+        .. code-block:: python
+
+            logging.getLogger(PAYLOAD_LOGGER).setLevel(logging.DEBUG)
+            envoy.set_payload_logging("/ivp/meters", "/ivp/meters/readings")
+
+        :param endpoints: Envoy endpoints to log the payloads of
+        :param limit: maximum number of payload bytes to log, defaults to
+            :any:`DEFAULT_PAYLOAD_LOG_LIMIT`
+        :raises ValueError: if limit is negative
+        """
+        if limit < 0:
+            raise ValueError("limit can not be negative")
+        self._payload_endpoints = frozenset(endpoints)
+        self._payload_log_limit = limit
+        self._firmware._payload_log_limit = (
+            limit if URL_INFO in self._payload_endpoints else None
+        )
+
+    def set_response_recorder(self, recorder: EnvoyResponseRecorder | None) -> None:
+        """
+        Keep the most recent raw responses of the Envoy for diagnostics.
+
+        All responses received are recorded compressed in the recorder,
+        which keeps a limited number of them. Use
+        :any:`recorded_responses` to obtain them.
+
+        .. code-block:: python
+
+            envoy.set_response_recorder(EnvoyResponseRecorder(max_responses=20))
+            # ...
+            for response in envoy.recorded_responses:
+                print(response.endpoint, response.content)
+
+        :param recorder: recorder to keep responses in, None to stop recording
+        """
+        self._response_recorder = recorder
+
+    def set_raw_retention(
+        self,
+        retention: RawRetention,
+        endpoints: Iterable[str] | None = None,
+    ) -> None:
+        """
+        Set how response data is kept in :any:`EnvoyData.raw`.
+
+        By default the parsed JSON content of all responses is kept, next
+        to the data models extracted from it. To reduce the memory used by
+        the data returned by :py:meth:`update`, keep it as
+        :any:`EnvoyCompactRaw` instead, which decodes it on access, keep
+        it only for some endpoints or keep none at all. Updaters then only
+        keep a digest of the responses not kept parsed, to reuse the data
+        models of unchanged responses. Applies to the data returned by the
+        next update.
+
+        .. code-block:: python
+
+            # keep only the inventory, as compact JSON
+            envoy.set_raw_retention(RawRetention.COMPACT, endpoints=[URL_INVENTORY])
+            data = await envoy.update()
+            inventory = data.raw[URL_INVENTORY].json
+
+        :param retention: how to keep the response data
+        :param endpoints: only keep response data for these endpoints,
+            defaults to all endpoints
+        """
+        self._raw_retention = retention
+        self._raw_endpoints = None if endpoints is None else frozenset(endpoints)
+        self._compact_raw.clear()
+        # updaters keep no parsed content the Envoy data does not keep
+        self._common_properties.parsed_json_endpoints = (
+            self._raw_endpoints if retention is RawRetention.PARSED else frozenset()
+        )
+
+    def _retain_raw(self, raw: dict[str, Any]) -> dict[str, Any]:
+        """
+        Return the response data to keep, as set by set_raw_retention.
+
+        Data kept compact for an endpoint is reused while its JSON content
+        is the same, so unchanged responses keep the same raw data. Data
+        retained compact by an earlier update is decoded when the content
+        is kept parsed.
+
+        :param raw: response data keyed by endpoint, parsed or as retained
+        :return: response data to keep in Envoy data
+        """
+        retention = self._raw_retention
+        if retention is RawRetention.NONE:
+            return {}
+        retained: dict[str, Any] = {}
+        for endpoint, value in raw.items():
+            if self._raw_endpoints is not None and endpoint not in self._raw_endpoints:
+                continue
+            if retention is RawRetention.PARSED:
+                if isinstance(value, EnvoyCompactRaw):
+                    value = value.json
+            elif not isinstance(value, EnvoyCompactRaw):
+                content = orjson.dumps(value)
+                compact = self._compact_raw.get(endpoint)
+                if compact is None or compact.content != content:
+                    # orjson returns bytes with spare capacity, keep a copy
+                    compact = EnvoyCompactRaw(bytes(memoryview(content)))
+                    self._compact_raw[endpoint] = compact
+                value = compact
+            retained[endpoint] = value
+        return retained
+
+    def _retained_changes(self, changes: dict[str, Any]) -> dict[str, Any]:
+        """
+        Return changes collected by an updater with response data as retained.
+
+        :param changes: changed values as returned by _data_changes
+        :return: changes with the response data kept as set by
+            set_raw_retention
+        """
+        if "raw" not in changes:
+            return changes
+        return {**changes, "raw": self._retain_raw(changes["raw"])}
+
+    def _store_raw(self, endpoint: str, value: Any) -> None:
+        """
+        Store response data in the last returned data, as retained.
+
+        :param endpoint: endpoint of the response
+        :param value: JSON content of the response
+        """
+        if TYPE_CHECKING:
+            assert self.data is not None  # nosec
+        self.data.raw.update(self._retain_raw({endpoint: value}))
+
+    @property
+    def recorded_responses(self) -> list[EnvoyRecordedResponse]:
+        """
+        Return the raw responses kept by the response recorder.
+
+        :return: recorded responses, oldest first, empty if no
+            recorder is set, see :py:meth:`Envoy.set_response_recorder`
+        """
+        if self._response_recorder is None:
+            return []
+        return self._response_recorder.responses
+
+    def set_inverter_table(self, enabled: bool) -> None:
+        """
+        Collect inverter data as a columnar table.
+
+        For sites with many microinverters, the inverter updaters can build
+        an :any:`EnvoyInverterTable` directly from the inverter responses
+        instead of an :any:`EnvoyInverter` per inverter. The table holds a
+        numeric column per inverter field, which is smaller and faster to
+        analyze. When enabled, :any:`EnvoyData.inverters` stays empty, use
+        :any:`inverter_table` instead. Its ``inverters`` property offers
+        the same dict of :any:`EnvoyInverter`, built on first access.
+        Applies from the next update.
+
+        .. code-block:: python
+
+            envoy.set_inverter_table(True)
+            await envoy.update()
+            table = envoy.inverter_table
+
+        :param enabled: whether to collect inverter data as a table
+        """
+        self._common_properties.inverter_table_mode = enabled
+        if not enabled:
+            self._common_properties.inverter_table = None
+
+    @property
+    def inverter_table(self) -> EnvoyInverterTable | None:
+        """
+        Return the inverter data of the last update as a columnar table.
+
+        :return: inverter table, None if not enabled using
+            :py:meth:`set_inverter_table` or not collected yet
+        """
+        return self._common_properties.inverter_table
+
     @property
     def last_request_statistics(self) -> dict[str, str | int | float | None]:
         """
         Return statistics of last request call.
 
-        Returns retry information on last executed
+        Returns retry information on last completed
         :py:meth:`pyenphase.Envoy.request` method. Provides
         information on retry endpoint, attempts and elapsed time.
 
@@ -463,6 +1151,102 @@ class Envoy:
             "delay_since_first_attempt": self._request_last_elapsed,
         }
 
+    @property
+    def circuit_breakers(self) -> dict[str, EnvoyCircuitBreaker]:
+        """
+        Return the circuit breakers of the requested endpoints.
+
+        Each endpoint requested with GET has a circuit breaker when a
+        circuit_breaker_threshold was specified for the Envoy. After the
+        threshold of consecutive failed attempts, requests to the endpoint
+        fail right away with :any:`EnvoyCircuitOpen` until the cooldown
+        has passed. Then one trial request is sent, which closes the
+        breaker when it succeeds.
+
+        :return: copy of the circuit breaker of each endpoint
+        """
+        return {
+            endpoint: replace(breaker)
+            for endpoint, breaker in self._circuit_breakers.items()
+        }
+
+    @property
+    def endpoint_latency(self) -> dict[str, EnvoyEndpointLatency]:
+        """
+        Return the response times of the endpoints requested with GET.
+
+        Used to adapt the timeout of each endpoint when set by
+        :py:meth:`Envoy.set_adaptive_timeout`.
+
+        :return: copy of the response times of each endpoint
+        """
+        return {
+            endpoint: replace(latency, samples=latency.samples.copy())
+            for endpoint, latency in self._endpoint_latency.items()
+        }
+
+    @property
+    def metrics(self) -> EnvoyMetrics | None:
+        """
+        Return the registry the metrics of this Envoy are recorded in.
+
+        :return: metrics registry specified for the Envoy, None if not recording
+        """
+        return self._metrics
+
+    @property
+    def coalesced_requests(self) -> int:
+        """
+        Return number of requests saved by waiting for a request in progress.
+
+        Counts the requests by updaters for an endpoint that were not sent
+        to the Envoy during :any:`probe` or :any:`update` as a request
+        for the same endpoint was already in progress.
+
+        :return: number of coalesced requests since the Envoy was created
+        """
+        return self._coalesced_requests
+
+    @property
+    def connection_stats(self) -> EnvoyConnectionStats:
+        """
+        Return connection pool statistics for requests to the Envoy.
+
+        Counts the connections opened and reused by requests for data
+        from the Envoy. In steady state polling all requests should reuse
+        connections, without new TLS handshakes. Only collected when the
+        ClientSession includes the trace config from
+        :any:`create_trace_config`, as the ClientSession created by the
+        Envoy does.
+
+        :return: copy of the statistics since the Envoy was created
+        """
+        return replace(self._connection_stats)
+
+    @property
+    def parsed_responses(self) -> int:
+        """
+        Return number of responses parsed by updaters during :any:`update`.
+
+        :return: number of parsed responses since the Envoy was created
+        """
+        return self._common_properties.parsed_responses
+
+    @property
+    def unchanged_responses(self) -> int:
+        """
+        Return number of responses not parsed as their body was unchanged.
+
+        Counts the responses received by updaters during :any:`update`
+        with the same body as the previous response for the endpoint. The
+        previously parsed content and the data extracted from it are
+        reused. Together with :any:`parsed_responses` this gives the hit
+        rate of reusing unchanged responses.
+
+        :return: number of unchanged responses since the Envoy was created
+        """
+        return self._common_properties.unchanged_responses
+
     async def _request(
         self,
         endpoint: str,
@@ -475,13 +1259,17 @@ class Envoy:
         If data is specified use POST or specified method to
         send data dictionary as json string to the endpoint.
         If no data is specified use GET request. Return the response.
+        When authentication fails with status 401, or with status 403 for
+        expired credentials, and the credentials were renewed, see
+        :py:meth:`Envoy._recover_authentication`, the request is repeated once.
 
         :param endpoint: Envoy Endpoint to access, start with leading /
         :param data: data dictionary to send to the Envoy, defaults to None
         :param method: method to use to send data dictionary,
             POST if none, only used for data send
         :raises EnvoyAuthenticationRequired: if no prior authentication
-            was completed or HTTP status 401 or 404 is returned
+            was completed, HTTP status 401 or 404 is returned or renewing
+            the credentials failed
         :return: request response
         """
         if self.auth is None:
@@ -489,42 +1277,27 @@ class Envoy:
                 "You must authenticate to the Envoy before making requests."
             )
 
+        if data:
+            # data sent may change the configuration, request it again
+            self._configuration_responses.clear()
+            self._configuration_generation += 1
+
         url = self.auth.get_endpoint_url(endpoint)
         debugon = _LOGGER.isEnabledFor(logging.DEBUG)
         if debugon:
             request_start = time.monotonic()
 
-        # Set up middleware from auth
-        middlewares = (self.auth.auth,) if self.auth.auth else None
-
-        # not using redirects to avoid following 301s to error pages on missing
-        # end points and lots of extra requests
-        if data:
-            if debugon:
-                _LOGGER.debug(
-                    "Sending %s to %s with data %s",
-                    method or "POST",
-                    url,
-                    orjson.dumps(data),
-                )
-            response = await self._client.request(
-                method or "POST",
-                url,
-                headers={**DEFAULT_HEADERS, **self.auth.headers},
-                timeout=self._timeout,
-                data=orjson.dumps(data),
-                middlewares=middlewares,
-                allow_redirects=False,
-            )
-        else:
-            _LOGGER.debug("Requesting %s with timeout %s", url, self._timeout)
-            response = await self._client.get(
-                url,
-                headers={**DEFAULT_HEADERS, **self.auth.headers},
-                timeout=self._timeout,
-                middlewares=middlewares,
-                allow_redirects=False,
-            )
+        if self._auth_recovery:
+            # wait for the running re-authentication, rather than sending
+            # credentials that are being replaced
+            await asyncio.wait([self._auth_recovery])
+        generation = self._auth_generation
+        response = await self._send_request(endpoint, url, data, method)
+        if self._renewable(response.status) and await self._recover_authentication(
+            generation
+        ):
+            _LOGGER.debug("Retrying %s with renewed authentication", url)
+            response = await self._send_request(endpoint, url, data, method)
 
         status_code = response.status
         if status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
@@ -545,16 +1318,262 @@ class Envoy:
             request_end = time.monotonic()
             content_type = response.headers.get("content-type")
             _LOGGER.debug(
-                "Request reply in %s sec from %s status %s: %s %s",
+                "Request reply in %s sec from %s status %s: %s %s bytes",
                 round(request_end - request_start, 1),
                 url,
                 status_code,
                 content_type,
-                await response.read(),  # Use the actual content bytes
+                len(await response.read()),  # body was read already
             )
 
         return response
 
+    def _request_headers(self) -> dict[str, str]:
+        """Return the headers of a request to the Envoy, recording the request."""
+        assert self.auth is not None  # nosec
+        self.auth.record_request()
+        return {**DEFAULT_HEADERS, **self.auth.headers}
+
+    def _renewable(self, status: int) -> bool:
+        """
+        Return True if renewing the credentials may resolve a failed request.
+
+        Status 401 tells the credentials were not accepted, for example
+        for an expired session. Status 403 tells the credentials lack
+        access to the endpoint, which renewing them only resolves if they
+        actually expired.
+
+        :param status: HTTP status of the response
+        :return: True if the credentials should be renewed
+        """
+        assert self.auth is not None  # nosec
+        return status == HTTPStatus.UNAUTHORIZED or (
+            status == HTTPStatus.FORBIDDEN and self.auth.credentials_expired
+        )
+
+    async def _recover_authentication(self, generation: int) -> bool:
+        """
+        Renew the credentials after a request failed authentication.
+
+        Only one renewal runs at a time. Requests failing authentication
+        while it runs wait for its outcome instead of starting another.
+        Requests that were sent before the credentials last changed are
+        retried without renewing.
+
+        :param generation: credentials generation the request was sent with
+        :raises EnvoyAuthenticationRequired: if renewing the credentials failed
+        :return: True if the request can be retried with renewed credentials
+        """
+        assert self.auth is not None  # nosec
+        if generation != self._auth_generation:
+            return True
+        if self._auth_recovery is None:
+            self._auth_recovery = asyncio.create_task(
+                self._renew_authentication(self.auth)
+            )
+        try:
+            # a cancelled request does not cancel the renewal for the others
+            return await asyncio.shield(self._auth_recovery)
+        except EnvoyAuthenticationError as err:
+            raise EnvoyAuthenticationRequired(
+                f"Unable to renew authentication with the Envoy: {err}"
+            ) from err
+
+    async def _renew_authentication(self, auth: EnvoyAuth) -> bool:
+        """Renew the credentials of the authentication."""
+        try:
+            renewed = await auth.renew_session(self._client)
+        finally:
+            self._auth_recovery = None
+        if renewed:
+            self._auth_generation += 1
+        return renewed
+
+    async def _send_request(
+        self,
+        endpoint: str,
+        url: str,
+        data: dict[str, Any] | None,
+        method: str | None,
+    ) -> aiohttp.ClientResponse:
+        """Send a request to the Envoy and read its response."""
+        assert self.auth is not None  # nosec
+        # Set up middleware from auth
+        middlewares = (self.auth.auth,) if self.auth.auth else None
+
+        # not using redirects to avoid following 301s to error pages on missing
+        # end points and lots of extra requests
+        start = time.monotonic()
+        with span(
+            SPAN_REQUEST,
+            host=self._host,
+            endpoint=endpoint,
+            method=(method or "POST") if data else "GET",
+        ):
+            try:
+                if data:
+                    _LOGGER.debug("Sending %s to %s", method or "POST", url)
+                    if endpoint in self._payload_endpoints and (
+                        _PAYLOAD_LOGGER.isEnabledFor(logging.DEBUG)
+                    ):
+                        _PAYLOAD_LOGGER.debug(
+                            "Data sent to %s: %s",
+                            url,
+                            orjson.dumps(data)[: self._payload_log_limit],
+                        )
+                    response = await self._client.request(
+                        method or "POST",
+                        url,
+                        headers=self._request_headers(),
+                        timeout=self._timeout,
+                        data=orjson.dumps(data),
+                        middlewares=middlewares,
+                        allow_redirects=False,
+                        trace_request_ctx=self._connection_stats,
+                    )
+                else:
+                    timeout = self._request_timeout(endpoint)
+                    _LOGGER.debug("Requesting %s with timeout %s", url, timeout)
+                    response = await self._client.get(
+                        url,
+                        headers=self._request_headers(),
+                        timeout=timeout,
+                        middlewares=middlewares,
+                        allow_redirects=False,
+                        trace_request_ctx=self._connection_stats,
+                    )
+                # reading the complete body returns the connection to the pool right
+                # away, rather than when the caller reads it. The body remains
+                # available from the response
+                content = await response.read()
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if (
+                    not data
+                    and isinstance(err, TimeoutError)
+                    and (latency := self._endpoint_latency.get(endpoint)) is not None
+                ):
+                    latency.timed_out()
+                if self._metrics is not None:
+                    self._metrics.observe_error(self._host, endpoint, err)
+                raise
+        duration = time.monotonic() - start
+        if self._response_recorder is not None:
+            self._response_recorder.record(endpoint, response.status, content)
+        if endpoint in self._payload_endpoints and (
+            _PAYLOAD_LOGGER.isEnabledFor(logging.DEBUG)
+        ):
+            _PAYLOAD_LOGGER.debug(
+                "Response from %s status %s, %s bytes: %s",
+                url,
+                response.status,
+                len(content),
+                content[: self._payload_log_limit],
+            )
+        if self._metrics is not None:
+            self._metrics.observe_response(
+                self._host, endpoint, response.status, duration, len(content)
+            )
+        if not data:
+            if (latency := self._endpoint_latency.get(endpoint)) is None:
+                latency = self._endpoint_latency[endpoint] = EnvoyEndpointLatency()
+            latency.add(duration)
+        return response
+
+    async def stream_meters(
+        self,
+        reconnect_delay: float = STREAM_RECONNECT_DELAY,
+        max_reconnect_delay: float = STREAM_MAX_RECONNECT_DELAY,
+    ) -> AsyncIterator[dict[str, dict[str, EnvoyMeterStreamData]]]:
+        """
+        Return CT meter samples as they are pushed by the Envoy meter stream.
+
+        Keeps one connection open to the /stream/meter endpoint, which
+        sends a sample of all CT meter phases about every second. Each
+        sample is parsed as soon as it is received. When the connection
+        is interrupted or closed by the Envoy, it is reopened after
+        reconnect_delay, doubling the delay after each failed attempt
+        up to max_reconnect_delay.
+
+        Samples are only read from the connection when the next one is
+        requested. When the consumer is slower than the stream, the
+        connection buffers fill up and the Envoy has to wait before
+        sending more data, rather than samples piling up in memory.
+
+        .. code-block:: python
+
+            async for sample in envoy.stream_meters():
+                production = sample.get(CtType.PRODUCTION, {})
+                print(production[PhaseNames.PHASE_1].active_power)
+
+        The meter stream is only available on metered Envoy with CT
+        installed and may require installer access on newer firmware.
+
+        :param reconnect_delay: initial delay in seconds before reconnecting
+        :param max_reconnect_delay: maximum delay in seconds before reconnecting
+        :raises EnvoyAuthenticationRequired: if no prior authentication
+            was completed or HTTP status 401 or 403 is returned
+        :raises EnvoyHTTPStatusError: when HTTP status is not 2xx
+        :return: iterator of samples keyed by :any:`CtType` and
+            :any:`PhaseNames`
+        """
+        if self.auth is None:
+            raise EnvoyAuthenticationRequired(
+                "You must authenticate to the Envoy before making requests."
+            )
+        url = self.auth.get_endpoint_url(URL_STREAM_METER)
+        # the stream never completes, only limit the time between data
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=self._timeout.connect,
+            sock_read=self._timeout.sock_read,
+        )
+        delay = reconnect_delay
+        renewed = False
+        while True:
+            _LOGGER.debug("Opening meter stream %s", url)
+            generation = self._auth_generation
+            try:
+                response = await self._client.get(
+                    url,
+                    headers=self._request_headers(),
+                    timeout=timeout,
+                    middlewares=(self.auth.auth,) if self.auth.auth else None,
+                    allow_redirects=False,
+                    trace_request_ctx=self._connection_stats,
+                )
+                try:
+                    if response.status in (
+                        HTTPStatus.UNAUTHORIZED,
+                        HTTPStatus.FORBIDDEN,
+                    ):
+                        if (
+                            not renewed
+                            and self._renewable(response.status)
+                            and await self._recover_authentication(generation)
+                        ):
+                            # reopen right away with the renewed session
+                            renewed = True
+                            continue
+                        raise EnvoyAuthenticationRequired(
+                            f"Authentication failed for {url} with status "
+                            f"{response.status}, the meter stream may require "
+                            "installer access."
+                        )
+                    if not (200 <= response.status < 300):
+                        raise EnvoyHTTPStatusError(response.status, url)
+                    async for line in response.content:
+                        if sample := _parse_meter_stream_line(line):
+                            delay = reconnect_delay
+                            renewed = False
+                            yield sample
+                    _LOGGER.debug("Meter stream %s closed by Envoy", url)
+                finally:
+                    response.close()
+            except (aiohttp.ClientError, TimeoutError) as err:
+                _LOGGER.debug("Meter stream %s interrupted: %s", url, err)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_reconnect_delay)
+
     async def interface_settings(self) -> EnvoyInterfaceInformation | None:
         """
         Returns Envoy active interface information.
@@ -732,23 +1751,105 @@ class Envoy:
 
     async def _make_cached_request(
         self,
-        request_func: Callable[[str], Awaitable[aiohttp.ClientResponse]],
+        request_func: Callable[[str], Awaitable[EnvoyResponse]],
         endpoint: str,
-    ) -> aiohttp.ClientResponse:
-        """Make a cached request."""
+    ) -> EnvoyResponse:
+        """
+        Make a cached request.
+
+        Responses with status 200 are cached for the current probe or
+        update cycle. Only one request per endpoint is sent to the Envoy
+        at a time, concurrent requests for an endpoint wait for the
+        result of the request in progress instead.
+
+        :param request_func: method to send the request to the Envoy
+        :param endpoint: Envoy endpoint to request
+        :return: request response
+        """
         if cached_response := self._endpoint_cache.get(endpoint):
             return cached_response
-        response = await request_func(endpoint)
+
+        if (pending := self._pending_requests.get(endpoint)) is not None:
+            self._coalesced_requests += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task and task.cancelling()):
+                    raise
+            # the request in progress was cancelled, send our own
+            self._coalesced_requests -= 1
+            return await self._make_cached_request(request_func, endpoint)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._pending_requests[endpoint] = pending
+        try:
+            response = await request_func(endpoint)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as err:
+            pending.set_exception(err)
+            # mark retrieved, there may not be any other request waiting
+            pending.exception()
+            raise
+        else:
+            pending.set_result(response)
+        finally:
+            del self._pending_requests[endpoint]
+
         if response.status == 200:
             self._endpoint_cache[endpoint] = response
         return response
 
+    async def _probe_update_request(self, endpoint: str) -> EnvoyResponse:
+        """
+        Make a probe request to the Envoy for the probe of the updaters.
+
+        :param endpoint: Envoy endpoint to request
+        :return: request response
+        """
+        return await EnvoyResponse.from_response(await self.probe_request(endpoint))
+
+    async def _update_request(self, endpoint: str) -> EnvoyResponse:
+        """
+        Make a request to the Envoy for data collection by the updaters.
+
+        Responses of :any:`CONFIGURATION_ENDPOINTS` with status 200 are reused
+        until the configuration refresh interval has passed or data was sent
+        to the Envoy. Other endpoints are requested each time.
+
+        :param endpoint: Envoy endpoint to request
+        :return: request response
+        """
+        if (
+            not self._configuration_refresh_interval
+            or endpoint not in CONFIGURATION_ENDPOINTS
+        ):
+            return await EnvoyResponse.from_response(await self.request(endpoint))
+
+        now = time.monotonic()
+        if (cached := self._configuration_responses.get(endpoint)) and now - cached[
+            0
+        ] < self._configuration_refresh_interval:
+            return cached[1]
+
+        generation = self._configuration_generation
+        response = await EnvoyResponse.from_response(await self.request(endpoint))
+        if response.status == 200 and generation == self._configuration_generation:
+            self._configuration_responses[endpoint] = (now, response)
+        return response
+
     async def probe(self) -> None:
         """
         Probe for Envoy model and supported features.
 
         For each updater in the list of updaters returned by get_updaters,
-        execute the probe() method. Build and store a list of updaters to use,
+        execute the probe() method. Probes run concurrently, up to the
+        max_concurrency specified for the Envoy. The probe of an updater is
+        only started once the prior registered updaters providing features
+        it depends on, as declared in its :any:`EnvoyUpdater.probe_depends_on`,
+        have completed their probe. Build and store a list of updaters to use,
         containing updaters for which the probe() method does return at least 1
         supported feature. Store the map of all returned supported features.
 
@@ -768,17 +1869,37 @@ class Envoy:
         metered = self.is_metered
         v2_acb_mode = self._v2_acb_mode
         self._endpoint_cache.clear()
-        cached_probe = partial(self._make_cached_request, self.probe_request)
-        cached_request = partial(self._make_cached_request, self.request)
+        self._configuration_responses.clear()
+        self._updater_changes.clear()
+        cached_probe = partial(self._make_cached_request, self._probe_update_request)
+        cached_request = partial(self._make_cached_request, self._update_request)
         self._common_properties.reset_probe_properties(
             is_metered=metered, v2_acb_mode=v2_acb_mode
         )
 
-        for updater in get_updaters():
-            klass = updater(
-                version, cached_probe, cached_request, self._common_properties
+        updater_classes = get_updaters()
+        dependencies = _probe_dependencies(updater_classes)
+        probed: list[SupportedFeatures | None] = [None] * len(updater_classes)
+        instances = [
+            updater(version, cached_probe, cached_request, self._common_properties)
+            for updater in updater_classes
+        ]
+
+        async def _probe(index: int) -> None:
+            # only features of the updaters depended on are discovered yet
+            discovered_features = SupportedFeatures(0)
+            for prior in dependencies[index]:
+                discovered_features |= probed[prior] or SupportedFeatures(0)
+            probed[index] = await instances[index].probe(discovered_features)
+
+        with span(SPAN_PROBE, host=self._host):
+            await self._run_with_dependencies(
+                [partial(_probe, index) for index in range(len(instances))],
+                dependencies,
             )
-            if updater_features := await klass.probe(supported_features):
+
+        for klass, updater_features in zip(instances, probed, strict=True):
+            if updater_features:
                 supported_features |= updater_features
                 updaters.append(klass)
 
@@ -820,7 +1941,7 @@ class Envoy:
                     f"FW 3.x production all zero at startup ({self._firmware.version})."
                 )
 
-    async def update(self) -> EnvoyData:
+    async def update(self, features: SupportedFeatures | None = None) -> EnvoyData:
         """
         Read data from Envoy.
 
@@ -831,8 +1952,29 @@ class Envoy:
         An updaters update() method should obtain the data for the specific
         updater scope and save to the Envoy data set.
 
+        Updaters run concurrently, up to the max_concurrency specified for
+        the Envoy. An updater is only started once the prior registered
+        updaters it depends on, as declared in its
+        :any:`EnvoyUpdater.update_depends_on`, have completed. The time
+        needed for an update is determined by the slowest chain of
+        depending updaters rather than by the sum of all requests.
+
+        When features are specified, only the updaters providing any of
+        these features are used. Their data is merged into a copy of the
+        last returned data, all other data is returned as is. Use this
+        for a quick refresh of specific data between full updates, if
+        no data was collected yet, a full update is done.
+
+        .. code-block:: python
+
+            data = await envoy.update(
+                features=SupportedFeatures.ENCHARGE | SupportedFeatures.CTMETERS
+            )
+
+        :param features: only collect data for these features, defaults to all
         :raises EnvoyCommunicationError: when aiohttp network or communication error occurs.
         :raises EnvoyHTTPStatusError: when HTTP status is not 2xx.
+        :raises EnvoyFeatureNotAvailable: if no updater provides any of features
         :return: Collected Envoy data
         """
         # Some of the updaters user the same endpoint
@@ -842,19 +1984,298 @@ class Envoy:
         if not self._supported_features:
             await self.probe()
 
-        data = EnvoyData()
-        for updater in self._updaters:
-            try:
-                await updater.update(data)
-            except aiohttp.ClientError as err:  # noqa: PERF203
-                raise EnvoyCommunicationError(f"aiohttp ClientError {err!s}") from err
-            except asyncio.TimeoutError as err:
-                raise EnvoyCommunicationError(f"Timeout {err!s}") from err
+        if features is not None and self.data is not None:
+            data = await self._partial_update(features)
+        elif self._update_intervals or self._circuit_breaker_threshold:
+            data = await self._scheduled_update()
+        else:
+            data = EnvoyData()
+            updaters = self._updaters
+            await self._run_with_dependencies(
+                [partial(self._update_with, updater, data) for updater in updaters],
+                _update_dependencies(updaters),
+            )
+            self._data_collected = dict.fromkeys(
+                _data_changes(EnvoyData(), data), time.monotonic()
+            )
 
         self._validate_update(data)
+        data.raw = self._retain_raw(data.raw)
+        changes = _data_diff(self.data or EnvoyData(), data)
+        changes.generation = (self._changes.generation if self._changes else 0) + 1
+        for name in changes.fields:
+            self._generations[name] = changes.generation
+        changes.generations = dict(self._generations)
+        self._changes = changes
         self.data = data
         return data
 
+    async def _scheduled_update(self) -> EnvoyData:
+        """
+        Collect data from the Envoy using the updaters that are due.
+
+        Updaters for which the update interval has not passed since they
+        last collected data are not used, the data they collected last is
+        used instead. Each updater collects data in its own copy of the
+        data collected so far, the data it changed is merged in the
+        returned data in order of the updaters.
+
+        :return: Envoy data collected by due updaters and reused from others
+        """
+        updaters = self._updaters
+        now = time.monotonic()
+        data = EnvoyData()
+        due: set[int] = set()
+        for index, updater in enumerate(updaters):
+            last = self._updater_changes.get(index)
+            if last and now - last[0] < self._update_intervals.get(type(updater), 0):
+                _merge_changes(data, last[1])
+            else:
+                due.add(index)
+
+        collected = await self._collect_changes(due, data, now)
+        self._updater_changes.update(
+            (index, (collected_at, self._retained_changes(changes)))
+            for index, (collected_at, changes) in collected.items()
+        )
+
+        data = EnvoyData()
+        data_collected: dict[str, float] = {}
+        for index in range(len(updaters)):
+            collected_at, changes = self._updater_changes[index]
+            _merge_changes(data, changes)
+            for name in changes:
+                data_collected[name] = min(
+                    data_collected.get(name, collected_at), collected_at
+                )
+        self._data_collected = data_collected
+        return data
+
+    async def _partial_update(self, features: SupportedFeatures) -> EnvoyData:
+        """
+        Collect data using the updaters providing any of features.
+
+        Data the updaters reused from unchanged responses is not seen as
+        changed and keeps its age in :any:`data_age`.
+
+        :param features: features to collect data for
+        :raises EnvoyFeatureNotAvailable: if no updater provides any of features
+        :return: last returned Envoy data with the newly collected data merged
+        """
+        if TYPE_CHECKING:
+            assert self.data is not None  # nosec
+        due = {
+            index
+            for index, updater in enumerate(self._updaters)
+            if updater._supported_features & features
+        }
+        if not due:
+            raise EnvoyFeatureNotAvailable(
+                f"No data available for {features!r} on this Envoy"
+            )
+        now = time.monotonic()
+        # updaters may read the response data of others, as retained
+        collected = await self._collect_changes(due, _copy_data(self.data), now)
+
+        data = _copy_data(self.data)
+        for index in sorted(collected):
+            collected_at, changes = collected[index]
+            if collected_at != now:
+                # reused data collected before, already in the last data
+                continue
+            changes = self._retained_changes(changes)
+            _merge_changes(data, changes)
+            if previous := self._updater_changes.get(index):
+                # keep data not changed by this update for scheduled updates
+                combined = dict(previous[1])
+                for name, value in changes.items():
+                    combined[name] = (
+                        {**combined.get(name, {}), **value}
+                        if name in _DICT_FIELDS
+                        else value
+                    )
+                self._updater_changes[index] = (now, combined)
+            for name in changes:
+                # dict fields also hold older data of other updaters
+                if name not in _DICT_FIELDS or name not in self._data_collected:
+                    self._data_collected[name] = now
+        return data
+
+    async def _collect_changes(
+        self, due: set[int], data: EnvoyData, now: float
+    ) -> dict[int, tuple[float, dict[str, Any]]]:
+        """
+        Collect data using the due updaters, each in its own copy of data.
+
+        Updaters run concurrently in order of their dependencies. Data
+        changed by an updater is merged in data when it completes, making
+        it available to updaters depending on it.
+
+        :param due: index of the updaters to use
+        :param data: Envoy data to start from, changes are merged in it
+        :param now: time of the data collection
+        :return: per due updater index, the time of the data collection and
+            the changes as returned by _data_changes
+        """
+        updaters = self._updaters
+        collected: dict[int, tuple[float, dict[str, Any]]] = {}
+
+        async def _collect(index: int) -> None:
+            if index not in due:
+                return
+            before = _copy_data(data)
+            updater_data = _copy_data(before)
+            try:
+                await self._update_with(updaters[index], updater_data)
+            except EnvoyCircuitOpen as err:
+                if (previous := self._updater_changes.get(index)) is None:
+                    raise
+                # serve the data collected last, it keeps its age
+                _LOGGER.debug("Reusing data of %s: %s", type(updaters[index]), err)
+                _merge_changes(data, previous[1])
+                collected[index] = previous
+                return
+            changes = _data_changes(before, updater_data)
+            # make the data available to depending updaters
+            _merge_changes(data, changes)
+            collected[index] = (now, changes)
+
+        await self._run_with_dependencies(
+            [partial(_collect, index) for index in range(len(updaters))],
+            _update_dependencies(updaters),
+        )
+        return collected
+
+    def set_update_interval(self, updater: type[EnvoyUpdater], interval: float) -> None:
+        """
+        Set the minimum time between data collections by an updater.
+
+        By default each updater collects data at each :py:meth:`update`.
+        When an interval is set for an updater, update only uses it when
+        the interval has passed since it last collected data. Otherwise
+        the data it collected last is returned again. Use
+        :py:attr:`data_age` to find the age of the returned data.
+
+        .. code-block:: python
+
+            # collect inverter data only every 5 minutes
+            envoy.set_update_interval(EnvoyDeviceDataInvertersUpdater, 300)
+
+        :param updater: updater class, as returned by :any:`get_updaters`
+        :param interval: minimum time in seconds between data collections,
+            0 to collect data at each update
+        :raises ValueError: if interval is negative
+        """
+        if interval < 0:
+            raise ValueError("interval can not be negative")
+        if interval:
+            self._update_intervals[updater] = interval
+        else:
+            self._update_intervals.pop(updater, None)
+
+    @property
+    def changes(self) -> EnvoyDataChanges | None:
+        """
+        Return the changes in the data returned by the last update.
+
+        Lists the :any:`EnvoyData` fields, inverters, CT meters and CT meter
+        phases that changed compared to the data returned by the update
+        before it. For the first update, changes compared to empty data.
+
+        .. code-block:: python
+
+            data = await envoy.update()
+            if envoy.changes and "inverters" in envoy.changes.fields:
+                for serial in envoy.changes.inverters:
+                    publish(serial, data.inverters.get(serial))
+
+        :return: changes in the last returned data, None before the first update
+        """
+        return self._changes
+
+    @property
+    def data_age(self) -> dict[str, float]:
+        """
+        Return the age of the data returned by the last update.
+
+        :return: time in seconds since the data was collected, keyed by
+            :any:`EnvoyData` field name, for fields holding data only.
+            For fields with data of multiple updaters, the age of the
+            oldest data.
+        """
+        now = time.monotonic()
+        return {
+            name: now - collected for name, collected in self._data_collected.items()
+        }
+
+    async def _update_with(self, updater: EnvoyUpdater, data: EnvoyData) -> None:
+        """
+        Collect data from the Envoy using an updater.
+
+        :param updater: updater to use for data collection
+        :param data: Envoy data to store collected data in
+        :raises EnvoyCommunicationError: when aiohttp network or communication error occurs.
+        """
+        updater.json_request_duration = 0.0
+        start = time.perf_counter()
+        try:
+            with span(SPAN_UPDATE, host=self._host, updater=type(updater).__name__):
+                await updater.update(data)
+        except aiohttp.ClientError as err:
+            raise EnvoyCommunicationError(f"aiohttp ClientError {err!s}") from err
+        except asyncio.TimeoutError as err:
+            raise EnvoyCommunicationError(f"Timeout {err!s}") from err
+        if self._metrics is not None:
+            self._metrics.observe_build(
+                self._host,
+                type(updater).__name__,
+                time.perf_counter() - start - updater.json_request_duration,
+            )
+
+    async def _run_with_dependencies(
+        self,
+        jobs: list[Callable[[], Awaitable[None]]],
+        dependencies: list[list[int]],
+    ) -> None:
+        """
+        Run jobs concurrently in the order set by their dependencies.
+
+        Each job is started once all jobs it depends on have completed.
+        At most max_concurrency jobs run at the same time. When a job fails,
+        the jobs still running or waiting are cancelled right away and the
+        exception of the failing job is raised. The limit is shared with
+        updaters through :any:`CommonProperties.concurrency_limit`, for
+        the requests they make concurrently.
+
+        :param jobs: callables returning the awaitable to run for each job
+        :param dependencies: for each job, the index of the jobs it depends on
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._common_properties.concurrency_limit = semaphore
+        tasks: list[asyncio.Task[None]] = []
+
+        async def _run(index: int) -> None:
+            try:
+                if depends_on := dependencies[index]:
+                    await asyncio.wait([tasks[prior] for prior in depends_on])
+                async with semaphore:
+                    await jobs[index]()
+            except Exception:
+                # fail fast, the results of the other jobs are of no use
+                for task in tasks:
+                    if task is not tasks[index]:
+                        task.cancel()
+                raise
+
+        tasks.extend(asyncio.create_task(_run(index)) for index in range(len(jobs)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # only tasks still pending are cancelled, wait for these to end
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def _json_request(
         self, end_point: str, data: dict[str, Any] | None, method: str | None = None
     ) -> Any:
@@ -1181,7 +2602,7 @@ class Envoy:
                 "The Envoy returned an incomplete generator schedule, "
                 "no data was changed and no update was sent",
             )
-            data.raw[URL_GEN_SCHEDULE] = current
+            self._store_raw(URL_GEN_SCHEDULE, current)
         new_data = self._validated_generator_schedule(new_data, data.generator_schedule)
         # merge with the current settings and send the whole document
         new_model = replace(data.generator_schedule, **new_data)
@@ -1198,7 +2619,7 @@ class Envoy:
             "The Envoy returned an incomplete generator schedule for the update, "
             "the update was sent but the stored data was left unchanged",
         )
-        data.raw[URL_GEN_SCHEDULE] = result
+        self._store_raw(URL_GEN_SCHEDULE, result)
         data.generator_schedule = new_state
         return result
 
@@ -1359,7 +2780,7 @@ class Envoy:
                 "The Envoy returned an incomplete generator configuration, "
                 "no data was changed and no update was sent",
             )
-            data.raw[URL_GEN_CONFIG] = current
+            self._store_raw(URL_GEN_CONFIG, current)
         # gen_config is the GENERATOR detection gate, so it is always
         # collected during update when the feature is available
         if TYPE_CHECKING:
@@ -1380,7 +2801,7 @@ class Envoy:
             "The Envoy returned an incomplete generator configuration for the update, "
             "the update was sent but the stored data was left unchanged",
         )
-        data.raw[URL_GEN_CONFIG] = result
+        self._store_raw(URL_GEN_CONFIG, result)
         data.generator_config = new_state
         return result
 
@@ -1544,14 +2965,7 @@ class Envoy:
         :return: JSON response of Envoy
         """
         self._verify_tariff_storage_or_raise()
-        if TYPE_CHECKING:
-            assert self.data is not None  # nosec
-            assert self.data.tariff is not None  # nosec
-            assert self.data.tariff.storage_settings is not None  # nosec
-        self.data.tariff.storage_settings.charge_from_grid = True
-        return await self._json_request(
-            URL_TARIFF, {"tariff": self.data.tariff.to_api()}, method="PUT"
-        )
+        return await self._put_storage_settings(charge_from_grid=True)
 
     async def disable_charge_from_grid(self) -> dict[str, Any]:
         """
@@ -1570,14 +2984,7 @@ class Envoy:
         :return: JSON response of Envoy
         """
         self._verify_tariff_storage_or_raise()
-        if TYPE_CHECKING:
-            assert self.data is not None  # nosec
-            assert self.data.tariff is not None  # nosec
-            assert self.data.tariff.storage_settings is not None  # nosec
-        self.data.tariff.storage_settings.charge_from_grid = False
-        return await self._json_request(
-            URL_TARIFF, {"tariff": self.data.tariff.to_api()}, method="PUT"
-        )
+        return await self._put_storage_settings(charge_from_grid=False)
 
     async def set_storage_mode(
         self,
@@ -1617,15 +3024,13 @@ class Envoy:
             assert self.data.tariff.storage_settings is not None  # nosec
         if type(mode) is not EnvoyStorageMode:
             raise TypeError("Mode must be of type EnvoyStorageMode")
-        self.data.tariff.storage_settings.mode = mode
+        changes: dict[str, Any] = {"mode": mode}
         if (
             disable_optimized_schedules
             and self.data.tariff.storage_settings.opt_schedules is not None
         ):
-            self.data.tariff.storage_settings.opt_schedules = False
-        return await self._json_request(
-            URL_TARIFF, {"tariff": self.data.tariff.to_api()}, method="PUT"
-        )
+            changes["opt_schedules"] = False
+        return await self._put_storage_settings(**changes)
 
     async def set_reserve_soc(self, value: int) -> dict[str, Any]:
         """
@@ -1645,14 +3050,38 @@ class Envoy:
         :return: JSON response of Envoy
         """
         self._verify_tariff_storage_or_raise()
+        return await self._put_storage_settings(reserved_soc=round(float(value), 1))
+
+    async def _put_storage_settings(self, **changes: Any) -> dict[str, Any]:
+        """
+        Send the tariff data with changed storage settings to the Envoy.
+
+        The stored tariff data is shared with the tariff updater, which
+        returns it again as long as the Envoy reports the same tariff.
+        The changes are applied to a copy, which replaces the stored
+        tariff data only after the Envoy accepted it, so a failed
+        request leaves the data at the state the Envoy reported.
+
+        :param changes: storage settings to change
+        :raises EnvoyCommunicationError: when aiohttp network or communication error occurs.
+        :raises EnvoyHTTPStatusError: when HTTP status is not 2xx.
+        :return: JSON response of Envoy
+        """
         if TYPE_CHECKING:
             assert self.data is not None  # nosec
             assert self.data.tariff is not None  # nosec
-            assert self.data.tariff.storage_settings is not None  # nosec
-        self.data.tariff.storage_settings.reserved_soc = round(float(value), 1)
-        return await self._json_request(
-            URL_TARIFF, {"tariff": self.data.tariff.to_api()}, method="PUT"
+        tariff = self.data.tariff
+        storage_settings = tariff.storage_settings
+        if TYPE_CHECKING:
+            assert storage_settings is not None  # nosec
+        new_tariff = replace(
+            tariff, storage_settings=replace(storage_settings, **changes)
         )
+        result = await self._json_request(
+            URL_TARIFF, {"tariff": new_tariff.to_api()}, method="PUT"
+        )
+        self.data.tariff = new_tariff
+        return result
 
     def _verify_tariff_storage_or_raise(self) -> None:
         """
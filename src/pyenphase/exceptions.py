@@ -99,6 +99,24 @@ class EnvoyCommunicationError(EnvoyError):
     """
 
 
+class EnvoyCircuitOpen(EnvoyCommunicationError):
+    """
+    Exception raised when an endpoint is not requested as its circuit breaker is open.
+
+    - The endpoint failed too often in a row and its cooldown has not passed yet.
+
+    :param endpoint: Envoy endpoint not requested
+    :param retry_after: seconds until the endpoint is tried again
+    """
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit breaker open for {endpoint}, retry in {retry_after:.0f} sec"
+        )
+
+
 class EnvoyFeatureNotAvailable(EnvoyError):
     """
     Exception raised when the Envoy feature is not available.
@@ -15,10 +15,16 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from .const import LOCAL_TIMEOUT, MAX_PROBE_REQUEST_ATTEMPTS, MAX_PROBE_REQUEST_DELAY
+from .const import (
+    LOCAL_TIMEOUT,
+    MAX_PROBE_REQUEST_ATTEMPTS,
+    MAX_PROBE_REQUEST_DELAY,
+    PAYLOAD_LOGGER,
+)
 from .exceptions import EnvoyFirmwareCheckError, EnvoyFirmwareFatalCheckError
 
 _LOGGER = logging.getLogger(__name__)
+_PAYLOAD_LOGGER = logging.getLogger(PAYLOAD_LOGGER)
 
 
 class EnvoyFirmware:
@@ -30,6 +36,7 @@ class EnvoyFirmware:
         "_host",
         "_metered",
         "_part_number",
+        "_payload_log_limit",
         "_serial_number",
         "_url",
     )
@@ -53,6 +60,9 @@ class EnvoyFirmware:
         self._part_number: str | None = None
         self._url: str = ""
         self._metered: bool = False
+        #: maximum number of payload bytes of the /info response to log,
+        #: None unless opted in using :any:`Envoy.set_payload_logging`
+        self._payload_log_limit: int | None = None
 
     @retry(
         retry=retry_if_exception_type(aiohttp.ClientError),
@@ -138,11 +148,19 @@ class EnvoyFirmware:
             if debugon:
                 request_end = time.monotonic()
                 _LOGGER.debug(
-                    "Request reply in %s sec from %s status %s: %s",
+                    "Request reply in %s sec from %s status %s: %s bytes",
                     round(request_end - request_start, 1),
                     self._url,
                     status_code,
-                    content,
+                    len(content),
+                )
+            if self._payload_log_limit is not None and _PAYLOAD_LOGGER.isEnabledFor(
+                logging.DEBUG
+            ):
+                _PAYLOAD_LOGGER.debug(
+                    "Response from %s: %s",
+                    self._url,
+                    content[: self._payload_log_limit],
                 )
             xml = etree.fromstring(content)  # nosec
             if (device_tag := xml.find("device")) is not None:
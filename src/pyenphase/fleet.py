@@ -0,0 +1,328 @@
+"""Poll many Envoys using a shared connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+
+from .connection import EnvoyConnectionStats, create_connector, create_trace_config
+from .const import DEFAULT_FLEET_MAX_CONCURRENCY, DEFAULT_FLEET_TIMEOUT
+from .envoy import Envoy
+from .exceptions import EnvoyAuthenticationRequired
+from .models.envoy import EnvoyData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class EnvoyFleetResult:
+    """Result of a data collection from an Envoy in an :any:`EnvoyFleet`."""
+
+    #: Envoy host as added to the fleet
+    host: str
+    #: Envoy the data was collected from
+    envoy: Envoy
+    #: Collected data, None if the data collection failed
+    data: EnvoyData | None = None
+    #: Error raised by the data collection, None if it succeeded
+    error: Exception | None = None
+    #: Time in seconds used for the data collection
+    elapsed: float = 0.0
+
+
+@dataclass(slots=True)
+class _FleetMember:
+    """Envoy in a fleet and the parameters to authenticate it."""
+
+    envoy: Envoy
+    username: str | None = None
+    password: str | None = None
+    token: str | None = None
+    warm_up: bool = False
+    token_refresh_margin: float | None = None
+    #: True once setup and authentication succeeded, until the
+    #: authentication is no longer accepted
+    ready: bool = False
+
+
+class EnvoyFleet:
+    """Class for collecting data from many Envoys."""
+
+    def __init__(
+        self,
+        client: aiohttp.ClientSession | None = None,
+        max_concurrency: int = DEFAULT_FLEET_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_FLEET_TIMEOUT,
+        ssl_session_servers: int | None = None,
+    ) -> None:
+        """
+        Class for collecting data from many Envoys.
+
+        All Envoys in the fleet share one aiohttp ClientSession and its
+        connection pool. Data is collected from at most max_concurrency
+        Envoys at the same time. Each data collection is limited to
+        timeout seconds, so an Envoy not responding does not hold up
+        data collection from the others.
+
+        .. code-block:: python
+
+            fleet = EnvoyFleet()
+            for host in hosts:
+                fleet.add(host, username=username, password=password)
+            async for result in fleet.poll(interval=60):
+                if result.error:
+                    print(f"{result.host} failed: {result.error}")
+                else:
+                    print(f"{result.host}: {result.data.system_production}")
+            # ...
+            await fleet.close()
+
+        :param client: aiohttp ClientSession not verifying SSL
+            certificates, if not specified one will be created. In
+            that case call :py:meth:`EnvoyFleet.close` before
+            application exit.
+        :param max_concurrency: maximum number of Envoys to collect data
+            from at the same time, defaults to :any:`DEFAULT_FLEET_MAX_CONCURRENCY`
+        :param timeout: maximum time in seconds for setup, authentication
+            and update of an Envoy, defaults to :any:`DEFAULT_FLEET_TIMEOUT`
+        :param ssl_session_servers: maximum number of Envoys to keep the
+            last TLS session of, for a fleet of more Envoys than
+            :any:`DEFAULT_SSL_SESSION_SERVERS`. Only used for the
+            ClientSession created by the fleet, see :any:`create_connector`.
+        :raises ValueError: if max_concurrency is less than 1 or timeout
+            is not positive
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be 1 or more")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self._client = client or aiohttp.ClientSession(
+            connector=create_connector(ssl_session_servers=ssl_session_servers),
+            trace_configs=[create_trace_config()],
+        )  # nosec
+        self._user_client = client is not None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._timeout = timeout
+        self._members: dict[str, _FleetMember] = {}
+
+    @property
+    def envoys(self) -> dict[str, Envoy]:
+        """Return the Envoys in the fleet, keyed by host."""
+        return {host: member.envoy for host, member in self._members.items()}
+
+    @property
+    def connection_stats(self) -> EnvoyConnectionStats:
+        """
+        Return connection pool statistics summed over the Envoys in the fleet.
+
+        :return: statistics of the Envoys currently in the fleet,
+            see :any:`Envoy.connection_stats`
+        """
+        total = EnvoyConnectionStats()
+        for member in self._members.values():
+            stats = member.envoy.connection_stats
+            total.opened += stats.opened
+            total.reused += stats.reused
+            total.tls_handshakes += stats.tls_handshakes
+        return total
+
+    def add(
+        self,
+        host: str,
+        username: str | None = None,
+        password: str | None = None,
+        token: str | None = None,
+        warm_up: bool = False,
+        token_refresh_margin: float | None = None,
+        **kwargs: Any,
+    ) -> Envoy:
+        """
+        Add an Envoy to the fleet.
+
+        The Envoy is set up and authenticated when data is first collected
+        from it, or again after setup or authentication failed or the
+        Envoy no longer accepted the authentication.
+
+        :param host: Envoy DNS name or IP address
+        :param username: username to authenticate with, see :any:`Envoy.authenticate`
+        :param password: password to authenticate with, see :any:`Envoy.authenticate`
+        :param token: token to authenticate with, see :any:`Envoy.authenticate`
+        :param warm_up: open connections once authenticated, see
+            :any:`Envoy.authenticate`, defaults to False
+        :param token_refresh_margin: seconds before the token expires to
+            refresh it in the background, see :any:`Envoy.authenticate`,
+            defaults to None for no background refresh
+        :param kwargs: other parameters for the :any:`Envoy`, like max_concurrency
+        :raises ValueError: if the host is already in the fleet
+        :return: Envoy added to the fleet
+        """
+        if host in self._members:
+            raise ValueError(f"Envoy {host} is already in the fleet")
+        envoy = Envoy(host, client=self._client, **kwargs)
+        self._members[host] = _FleetMember(
+            envoy,
+            username=username,
+            password=password,
+            token=token,
+            warm_up=warm_up,
+            token_refresh_margin=token_refresh_margin,
+        )
+        return envoy
+
+    async def remove(self, host: str) -> None:
+        """
+        Remove an Envoy from the fleet and close it.
+
+        Stops background work of the Envoy, like refreshing its token,
+        see :py:meth:`Envoy.close`.
+
+        :param host: Envoy host as added to the fleet
+        :raises KeyError: if the host is not in the fleet
+        """
+        member = self._members.pop(host)
+        await member.envoy.close()
+
+    async def _collect(self, host: str) -> EnvoyFleetResult:
+        """
+        Collect data from an Envoy, setting it up first if needed.
+
+        :param host: Envoy host as added to the fleet
+        :return: result of the data collection
+        """
+        member = self._members[host]
+        envoy = member.envoy
+
+        async def _update() -> EnvoyData:
+            if not member.ready:
+                await envoy.setup()
+                await envoy.authenticate(
+                    username=member.username,
+                    password=member.password,
+                    token=member.token,
+                    warm_up=member.warm_up,
+                    token_refresh_margin=member.token_refresh_margin,
+                )
+                member.ready = True
+            return await envoy.update()
+
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                data = await asyncio.wait_for(_update(), self._timeout)
+            # isolate the failure to this Envoy, whatever the cause
+            except Exception as err:
+                _LOGGER.debug("Data collection from %s failed: %r", host, err)
+                if isinstance(err, EnvoyAuthenticationRequired):
+                    # authenticate again for the next data collection
+                    member.ready = False
+                result = EnvoyFleetResult(
+                    host, envoy, error=err, elapsed=time.monotonic() - start
+                )
+            else:
+                result = EnvoyFleetResult(
+                    host, envoy, data=data, elapsed=time.monotonic() - start
+                )
+        if self._members.get(host) is not member:
+            # removed while collecting, stop what the authentication started
+            await envoy.close()
+        return result
+
+    async def update(
+        self, hosts: Iterable[str] | None = None
+    ) -> AsyncIterator[EnvoyFleetResult]:
+        """
+        Collect data from the Envoys in the fleet once.
+
+        Results are returned as they become available, so the slowest
+        Envoy does not hold up the results of the others.
+
+        .. code-block:: python
+
+            async for result in fleet.update():
+                print(result.host, result.data or result.error)
+
+        :param hosts: hosts to collect data from, defaults to all Envoys
+        :return: iterator of results, one per Envoy
+        """
+        tasks = [
+            asyncio.create_task(self._collect(host))
+            for host in (self._members if hosts is None else hosts)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def poll(
+        self, interval: float, jitter: float = 0.1
+    ) -> AsyncIterator[EnvoyFleetResult]:
+        """
+        Collect data from the Envoys in the fleet every interval seconds.
+
+        Each Envoy is polled on its own schedule. First data collections
+        are spread randomly over the first interval and each following
+        one starts interval seconds after the previous one started, varied
+        randomly by the jitter fraction of the interval. This avoids all
+        Envoys being polled at the same time. Results are returned as they
+        become available. Envoys added while polling are not polled.
+
+        .. code-block:: python
+
+            async for result in fleet.poll(interval=60):
+                print(result.host, result.data or result.error)
+
+        :param interval: time in seconds between data collections of an Envoy
+        :param jitter: fraction of the interval to randomly vary it with
+        :raises ValueError: if interval is not positive or jitter is not
+            between 0 and 1
+        :return: iterator of results, never ending
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be 0 or more and less than 1")
+        # an Envoy waits for its result to be consumed before polling again
+        results: asyncio.Queue[EnvoyFleetResult] = asyncio.Queue(
+            maxsize=max(len(self._members), 1)
+        )
+
+        async def _poll_host(host: str) -> None:
+            await asyncio.sleep(random.uniform(0, interval))  # noqa: S311
+            while host in self._members:
+                start = time.monotonic()
+                await results.put(await self._collect(host))
+                delay = interval * (1 + random.uniform(-jitter, jitter))  # noqa: S311
+                await asyncio.sleep(max(start + delay - time.monotonic(), 0))
+
+        tasks = [asyncio.create_task(_poll_host(host)) for host in self._members]
+        try:
+            while True:
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self) -> None:
+        """
+        Close the Envoys in the fleet and the ClientSession created by the fleet.
+
+        Envoys stay in the fleet and are authenticated again when data is
+        collected from them next. A ClientSession provided by the caller
+        is not closed, the caller remains responsible for closing it.
+
+        :return: None
+        """
+        for member in self._members.values():
+            await member.envoy.close()
+            member.ready = False
+        if not self._user_client and not self._client.closed:
+            await self._client.close()
@@ -5,6 +5,8 @@ from typing import Any
 
 import orjson
 
+from .tracing import SPAN_JSON_DECODE, span
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -17,7 +19,8 @@ def json_loads(end_point: str, json_source: bytes | str) -> Any:
     :return: deserialized JSON
     """
     try:
-        return orjson.loads(json_source)
+        with span(SPAN_JSON_DECODE, endpoint=end_point, size=len(json_source)):
+            return orjson.loads(json_source)
     except orjson.JSONDecodeError as e:
         _LOGGER.debug(
             "Unable to decode response from Envoy endpoint %s: %s\nResponse content: %s",
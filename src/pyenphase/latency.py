@@ -0,0 +1,75 @@
+"""Pyenphase response times of Envoy endpoints"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+
+from .const import ADAPTIVE_TIMEOUT_MIN_SAMPLES, ADAPTIVE_TIMEOUT_WINDOW
+
+
+@dataclass(slots=True)
+class EnvoyEndpointLatency:
+    """
+    Response times of requests to one endpoint of an Envoy.
+
+    Keeps the last :any:`ADAPTIVE_TIMEOUT_WINDOW` response times to
+    derive a request timeout for the endpoint from.
+    """
+
+    #: Response times in seconds of the last completed requests
+    samples: deque[float] = field(
+        default_factory=lambda: deque(maxlen=ADAPTIVE_TIMEOUT_WINDOW)
+    )
+    #: Number of requests timed out since the last completed one
+    timeouts: int = 0
+    _sorted: list[float] | None = field(default=None, repr=False, compare=False)
+
+    def add(self, latency: float) -> None:
+        """
+        Add the response time of a completed request.
+
+        :param latency: time in seconds until the response was read
+        """
+        self.samples.append(latency)
+        self.timeouts = 0
+        self._sorted = None
+
+    def timed_out(self) -> None:
+        """Count a request that did not complete in time."""
+        self.timeouts += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Return a percentile of the response times, using the nearest rank.
+
+        :param percent: percentile to return, between 0 and 100
+        :return: response time in seconds, None if no responses were received
+        """
+        if not self.samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[max(rank, 1) - 1]
+
+    def timeout(self, factor: float, minimum: float, maximum: float) -> float | None:
+        """
+        Return the timeout for the next request to the endpoint.
+
+        The timeout is factor times the 99th percentile response time,
+        limited to minimum and maximum. It doubles for each request timed
+        out since the last response, up to maximum.
+
+        :param factor: multiple of the 99th percentile response time
+        :param minimum: minimum timeout in seconds
+        :param maximum: maximum timeout in seconds
+        :return: timeout in seconds, None if fewer than
+            :any:`ADAPTIVE_TIMEOUT_MIN_SAMPLES` responses were received
+        """
+        if len(self.samples) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return None
+        p99 = self.percentile(99)
+        assert p99 is not None  # nosec
+        return min(max(p99 * factor, minimum) * 2 ** min(self.timeouts, 32), maximum)
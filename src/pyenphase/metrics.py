@@ -0,0 +1,250 @@
+"""Pyenphase request and update metrics of Envoys"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from .const import (
+    METRICS_ATTEMPTS_BUCKETS,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_PROCESSING_BUCKETS,
+    METRICS_SIZE_BUCKETS,
+)
+
+#: Histogram of the duration in seconds of each HTTP request, until its body was read
+REQUEST_DURATION = "pyenphase_request_duration_seconds"
+#: Histogram of the response body size in bytes of each HTTP request
+RESPONSE_SIZE = "pyenphase_response_size_bytes"
+#: Histogram of the number of attempts of each :any:`Envoy.request`
+REQUEST_ATTEMPTS = "pyenphase_request_attempts"
+#: Histogram of the time in seconds to parse JSON responses during update
+PARSE_DURATION = "pyenphase_parse_duration_seconds"
+#: Histogram of the time in seconds an updater spent building models during update
+BUILD_DURATION = "pyenphase_build_duration_seconds"
+#: Counter of HTTP responses by status
+RESPONSES = "pyenphase_responses_total"
+#: Counter of HTTP requests that failed without response by error
+REQUEST_ERRORS = "pyenphase_request_errors_total"
+
+# help text and label names of each metric
+_METRICS: dict[str, tuple[str, tuple[str, ...]]] = {
+    REQUEST_DURATION: ("Duration of HTTP requests to the Envoy", ("host", "endpoint")),
+    RESPONSE_SIZE: ("Size of Envoy response bodies", ("host", "endpoint")),
+    REQUEST_ATTEMPTS: ("Attempts needed per Envoy request", ("host", "endpoint")),
+    PARSE_DURATION: ("Time spent parsing Envoy responses", ("host", "endpoint")),
+    BUILD_DURATION: ("Time spent building models by updaters", ("host", "updater")),
+    RESPONSES: ("Envoy responses by HTTP status", ("host", "endpoint", "status")),
+    REQUEST_ERRORS: (
+        "Envoy requests failed without response",
+        ("host", "endpoint", "error"),
+    ),
+}
+
+
+@dataclass(slots=True)
+class EnvoyHistogram:
+    """Distribution of observed values over buckets."""
+
+    #: Upper bounds of the buckets, in increasing order
+    bounds: tuple[float, ...]
+    #: Number of values in each bucket, not cumulative. The last one
+    #: counts values above the highest bound
+    counts: list[int] = field(init=False)
+    #: Number of observed values
+    count: int = 0
+    #: Sum of observed values
+    sum: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        """
+        Add a value to the histogram.
+
+        :param value: observed value
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class EnvoyMetrics:
+    """Registry of request and update metrics of Envoys."""
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = METRICS_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = METRICS_SIZE_BUCKETS,
+        processing_buckets: Sequence[float] = METRICS_PROCESSING_BUCKETS,
+    ) -> None:
+        """
+        Registry of request and update metrics of Envoys.
+
+        Envoys created with a registry record metrics of their requests,
+        response parsing and model building in it, labeled with the Envoy
+        host and endpoint or updater. Share one registry between Envoys,
+        for example by passing it to :any:`EnvoyFleet.add`, to compare
+        Envoys. Use :any:`render_prometheus` to export the metrics.
+
+        .. code-block:: python
+
+            metrics = EnvoyMetrics()
+            envoy = Envoy(host_ip_or_name, metrics=metrics)
+            # ...
+            text = render_prometheus(metrics)
+
+        To feed another metrics system, subclass it and override the
+        observe methods.
+
+        :param latency_buckets: upper bounds in seconds of request duration
+            histogram buckets, defaults to :any:`METRICS_LATENCY_BUCKETS`
+        :param size_buckets: upper bounds in bytes of response size histogram
+            buckets, defaults to :any:`METRICS_SIZE_BUCKETS`
+        :param processing_buckets: upper bounds in seconds of parse and model
+            build time histogram buckets, defaults to
+            :any:`METRICS_PROCESSING_BUCKETS`
+        """
+        self._buckets: dict[str, tuple[float, ...]] = {
+            REQUEST_DURATION: tuple(latency_buckets),
+            RESPONSE_SIZE: tuple(size_buckets),
+            REQUEST_ATTEMPTS: METRICS_ATTEMPTS_BUCKETS,
+            PARSE_DURATION: tuple(processing_buckets),
+            BUILD_DURATION: tuple(processing_buckets),
+        }
+        #: Histograms by metric name and label values
+        self.histograms: dict[str, dict[tuple[str, ...], EnvoyHistogram]] = {
+            name: {} for name in self._buckets
+        }
+        #: Counters by metric name and label values
+        self.counters: dict[str, dict[tuple[str, ...], int]] = {
+            RESPONSES: {},
+            REQUEST_ERRORS: {},
+        }
+
+    def _observe(self, name: str, labels: tuple[str, ...], value: float) -> None:
+        """Add a value to the histogram of the metric with the labels."""
+        series = self.histograms[name]
+        if (histogram := series.get(labels)) is None:
+            histogram = series[labels] = EnvoyHistogram(self._buckets[name])
+        histogram.observe(value)
+
+    def _increment(self, name: str, labels: tuple[str, ...]) -> None:
+        """Increment the counter of the metric with the labels."""
+        series = self.counters[name]
+        series[labels] = series.get(labels, 0) + 1
+
+    def observe_response(
+        self, host: str, endpoint: str, status: int, duration: float, size: int
+    ) -> None:
+        """
+        Record a response of the Envoy.
+
+        :param host: Envoy host
+        :param endpoint: requested Envoy endpoint
+        :param status: HTTP status of the response
+        :param duration: time in seconds until the response body was read
+        :param size: size of the response body in bytes
+        """
+        labels = (host, endpoint)
+        self._observe(REQUEST_DURATION, labels, duration)
+        self._observe(RESPONSE_SIZE, labels, size)
+        self._increment(RESPONSES, (host, endpoint, str(status)))
+
+    def observe_error(self, host: str, endpoint: str, error: BaseException) -> None:
+        """
+        Record a request that failed without response.
+
+        :param host: Envoy host
+        :param endpoint: requested Envoy endpoint
+        :param error: error the request failed with
+        """
+        self._increment(REQUEST_ERRORS, (host, endpoint, type(error).__name__))
+
+    def observe_attempts(self, host: str, endpoint: str, attempts: int) -> None:
+        """
+        Record the attempts of a completed :any:`Envoy.request`.
+
+        :param host: Envoy host
+        :param endpoint: requested Envoy endpoint
+        :param attempts: number of attempts made, 1 if not retried
+        """
+        self._observe(REQUEST_ATTEMPTS, (host, endpoint), attempts)
+
+    def observe_parse(self, host: str, endpoint: str, duration: float) -> None:
+        """
+        Record the time to parse a JSON response during update.
+
+        :param host: Envoy host
+        :param endpoint: Envoy endpoint of the response
+        :param duration: time in seconds to parse the response
+        """
+        self._observe(PARSE_DURATION, (host, endpoint), duration)
+
+    def observe_build(self, host: str, updater: str, duration: float) -> None:
+        """
+        Record the time an updater spent building models during update.
+
+        :param host: Envoy host
+        :param updater: name of the updater class
+        :param duration: time in seconds of the update, excluding the time
+            spent requesting and parsing responses
+        """
+        self._observe(BUILD_DURATION, (host, updater), duration)
+
+
+def _escape(value: str) -> str:
+    """Return a label value escaped for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Return label names and values in the Prometheus text format."""
+    return ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+
+
+def render_prometheus(metrics: EnvoyMetrics) -> str:
+    """
+    Return the metrics in the Prometheus text exposition format.
+
+    .. code-block:: python
+
+        async def handle_metrics(request: web.Request) -> web.Response:
+            return web.Response(text=render_prometheus(metrics))
+
+    :param metrics: registry to render
+    :return: metrics in Prometheus text format, only including metrics
+        with recorded values
+    """
+    lines: list[str] = []
+    for name, histograms in metrics.histograms.items():
+        if not histograms:
+            continue
+        description, label_names = _METRICS[name]
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        for values, histogram in sorted(histograms.items()):
+            labels = _labels(label_names, values)
+            cumulative = 0
+            # the count of values above the highest bound is left out
+            for bound, count in zip(histogram.bounds, histogram.counts, strict=False):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},le="{float(bound)}"}} {cumulative}'
+                )
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    for name, counters in metrics.counters.items():
+        if not counters:
+            continue
+        description, label_names = _METRICS[name]
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for values, count in sorted(counters.items()):
+            lines.append(f"{name}{{{_labels(label_names, values)}}} {count}")
+    return "".join(f"{line}\n" for line in lines)
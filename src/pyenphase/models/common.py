@@ -1,7 +1,10 @@
 """Model for common properties of an envoy."""
 
+import asyncio
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
+from ..models.inverter_table import EnvoyInverterTable
 from ..models.meters import EnvoyPhaseMode
 
 
@@ -60,6 +63,33 @@ class CommonProperties:
     #: production updater, number of phases actually reporting phase data
     active_phase_count: int = 0
 
+    # controlled by Envoy and the inverter updaters
+    #: inverter updaters build :any:`inverter_table` instead of
+    #: :any:`EnvoyData.inverters`, set by :any:`pyenphase.Envoy.set_inverter_table`
+    inverter_table_mode: bool = False
+    #: inverter updaters, inverters data of the last update in table mode
+    inverter_table: EnvoyInverterTable | None = None
+
+    # controlled by Envoy
+    #: limits the number of updaters and updater requests running at the
+    #: same time, set by :any:`pyenphase.Envoy` for each probe and update
+    concurrency_limit: asyncio.Semaphore | None = field(
+        default=None, compare=False, repr=False
+    )
+    #: endpoints for which updaters keep the parsed content of the last
+    #: response, None for all endpoints, set by
+    #: :any:`pyenphase.Envoy.set_raw_retention`
+    parsed_json_endpoints: frozenset[str] | None = None
+
+    # controlled by updater base class
+    #: number of update responses parsed by updaters
+    parsed_responses: int = 0
+    #: number of update responses not parsed as the body was unchanged
+    unchanged_responses: int = 0
+    #: called with the endpoint and the time in seconds to parse each
+    #: update response, set by :any:`Envoy` when it records metrics
+    observe_parse: Callable[[str, float], None] | None = None
+
     def reset_probe_properties(
         self, is_metered: bool = False, v2_acb_mode: bool = False
     ) -> None:
@@ -3,6 +3,8 @@
 from dataclasses import dataclass, field
 from typing import Any
 
+import orjson
+
 from .acb import EnvoyACB, EnvoyACBPower, EnvoyBatteryAggregate
 from .c6combiner import EnvoyC6CC
 from .collar import EnvoyCollar
@@ -22,13 +24,36 @@ from .system_production import EnvoySystemProduction
 from .tariff import EnvoyTariff
 
 
+@dataclass(frozen=True, slots=True)
+class EnvoyCompactRaw:
+    """
+    Response data kept as compact JSON bytes in :any:`EnvoyData.raw`.
+
+    Used instead of the parsed JSON content when :any:`Envoy.set_raw_retention`
+    is set to :any:`RawRetention.COMPACT`. The content is decoded on access.
+    """
+
+    #: Compact JSON bytes of the response data
+    content: bytes
+
+    @property
+    def json(self) -> Any:
+        """
+        Return the response data, decoding the compact JSON bytes.
+
+        :return: newly decoded JSON content
+        """
+        return orjson.loads(self.content)
+
+
 @dataclass(slots=True)
 class EnvoyData:
     """
     Data Model for an envoy.
 
     Data is extract from raw data requested from Envoy. All raw
-    data is also available as-received in :any:`raw`. For details
+    data is also available as-received in :any:`raw`, unless
+    retained otherwise using :any:`Envoy.set_raw_retention`. For details
     on data models refer to the individual model descriptions.
     """
 
@@ -129,6 +154,36 @@ class EnvoyData:
     tariff: EnvoyTariff | None = None
     # Raw data is exposed so we can __eq__ the data to see if
     # anything has changed and consumers of the library can
-    # avoid dispatching data if nothing has changed.
-    #: All request responses received from Envoy in last :any:`Envoy.update`, keyed by endpoint
+    # avoid dispatching data if nothing has changed. Use
+    # Envoy.changes to avoid a deep comparison of all data.
+    #: All request responses received from Envoy in last :any:`Envoy.update`, keyed by endpoint.
+    #: As :any:`EnvoyCompactRaw` or only for some endpoints, as set by :any:`Envoy.set_raw_retention`
     raw: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class EnvoyDataChanges:
+    """
+    Changes in :any:`EnvoyData` compared to the data of the previous update.
+
+    Returned by :any:`pyenphase.Envoy.changes` after each update, so
+    consumers can publish only the data that changed without comparing
+    all data themselves. Values are compared by identity first, data
+    reused from unchanged responses is not compared in depth.
+    """
+
+    #: Update generation, incremented by each update
+    generation: int = 0
+    #: Names of the :any:`EnvoyData` fields that changed
+    fields: set[str] = field(default_factory=set)
+    #: Serial numbers of the inverters that were added, changed or removed
+    inverters: set[str] = field(default_factory=set)
+    #: :any:`CtType` of the CT meters that were added, changed or removed
+    ctmeters: set[str] = field(default_factory=set)
+    #: :any:`CtType` and :any:`PhaseNames` of the CT meter phases that
+    #: were added, changed or removed
+    ctmeters_phases: set[tuple[str, str]] = field(default_factory=set)
+    #: Generation in which each :any:`EnvoyData` field last changed, keyed
+    #: by field name. Compare with a stored generation to find out if a
+    #: field changed since.
+    generations: dict[str, int] = field(default_factory=dict)
@@ -38,6 +38,21 @@ class EnvoyInverter:
     @classmethod
     def from_device_data(cls, data: dict[str, Any]) -> EnvoyInverter:
         """Initialize from device data."""
+        return cls(*cls.device_data_values(data))
+
+    @staticmethod
+    def device_data_values(data: dict[str, Any]) -> tuple[Any, ...]:
+        """
+        Return the field values of an inverter derived from device data.
+
+        Shared by :any:`from_device_data` and
+        :any:`EnvoyInverterTable.from_device_data`.
+
+        :param data: device data of the inverter
+        :raises KeyError: if the minimal data set of the inverter is missing
+        :raises IndexError: if the inverter reports no channels
+        :return: values in field order, None for missing values
+        """
 
         def safe_convert_milli(value: float | None) -> float | None:
             return value / 1000.0 if value is not None else None
@@ -46,12 +61,6 @@ class EnvoyInverter:
         channel = data["channels"][0]
         last_reading = channel["lastReading"]
 
-        # these four are minimal data set, if one fails keyerror will raise
-        serial_number = data["sn"]
-        last_report_date = last_reading["endDate"]
-        last_report_watts = channel["watts"]["now"]
-        max_report_watts = channel["watts"]["max"]
-
         # get data to avoid divide errors if None
         duration = last_reading.get("duration")
         period_joules_produced = last_reading.get("joulesProduced")
@@ -59,24 +68,25 @@ class EnvoyInverter:
         lifetime_joulesProduced = lifetime.get("joulesProduced") if lifetime else None
         watthours = channel.get("wattHours")
 
-        return cls(
-            serial_number=serial_number,
-            last_report_date=last_report_date,
-            last_report_watts=last_report_watts,
-            max_report_watts=max_report_watts,
+        return (
+            # these four are minimal data set, if one fails keyerror will raise
+            data["sn"],
+            last_reading["endDate"],
+            channel["watts"]["now"],
+            channel["watts"]["max"],
             # next ones may return none as they didn't exist before in the model
-            dc_voltage=safe_convert_milli(last_reading.get("dcVoltageINmV")),
-            dc_current=safe_convert_milli(last_reading.get("dcCurrentINmA")),
-            ac_voltage=safe_convert_milli(last_reading.get("acVoltageINmV")),
-            ac_current=safe_convert_milli(last_reading.get("acCurrentInmA")),
-            ac_frequency=safe_convert_milli(last_reading.get("acFrequencyINmHz")),
-            temperature=last_reading.get("channelTemp"),
-            lifetime_energy=round(lifetime_joulesProduced / 3600.0)
+            safe_convert_milli(last_reading.get("dcVoltageINmV")),
+            safe_convert_milli(last_reading.get("dcCurrentINmA")),
+            safe_convert_milli(last_reading.get("acVoltageINmV")),
+            safe_convert_milli(last_reading.get("acCurrentInmA")),
+            safe_convert_milli(last_reading.get("acFrequencyINmHz")),
+            last_reading.get("channelTemp"),
+            round(lifetime_joulesProduced / 3600.0)
             if lifetime_joulesProduced is not None
             else None,
-            energy_produced=round(period_joules_produced / duration / 3.6, 3)
+            round(period_joules_produced / duration / 3.6, 3)
             if period_joules_produced is not None and duration is not None
             else None,
-            energy_today=watthours.get("today") if watthours else None,
-            last_report_duration=duration,
+            watthours.get("today") if watthours else None,
+            duration,
         )
@@ -0,0 +1,195 @@
+"""Model for a columnar table of Enphase microinverters."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, fields
+from types import ModuleType
+from typing import Any
+
+from .inverter import EnvoyInverter
+
+numpy: ModuleType | None
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+#: Names of the EnvoyInverter fields held in columns, in field order
+_COLUMNS = tuple(inverter_field.name for inverter_field in fields(EnvoyInverter))[1:]
+#: Names of the EnvoyInverter fields holding integer values
+_INT_COLUMNS = frozenset(
+    {
+        "last_report_date",
+        "last_report_watts",
+        "max_report_watts",
+        "temperature",
+        "lifetime_energy",
+        "energy_today",
+        "last_report_duration",
+    }
+)
+#: Number of columns only reported in device data
+_DETAILED_COLUMNS = len(_COLUMNS) - 3
+
+
+def _column(values: Sequence[float]) -> Any:
+    """
+    Return values as a column.
+
+    :param values: column values, NaN for missing values
+    :return: NumPy array of float64 if NumPy is installed, else array of doubles
+    """
+    if numpy is not None:
+        return numpy.array(values, dtype=numpy.float64)
+    return array("d", values)
+
+
+def _optional(value: float | None) -> float:
+    """Return value, NaN for a missing value."""
+    return math.nan if value is None else value
+
+
+@dataclass(slots=True, eq=False)
+class EnvoyInverterTable:
+    """
+    Columnar model for all Enphase microinverters of an Envoy.
+
+    Holds one column of numeric values per :any:`EnvoyInverter` field,
+    with a row per inverter in the order of :any:`serial_numbers`. Columns
+    are NumPy arrays of float64 when NumPy is installed and arrays of
+    doubles from the array module otherwise. Missing values are NaN.
+
+    .. code-block:: python
+
+        envoy.set_inverter_table(True)
+        await envoy.update()
+        table = envoy.inverter_table
+        total_watts = sum(table.last_report_watts)
+        watts = table.last_report_watts[table.index["123456789012"]]
+    """
+
+    #: Serial numbers of the inverters, in row order
+    serial_numbers: list[str]
+    #: Time of the last report, in seconds since the epoch
+    last_report_date: Sequence[float]
+    #: Power in W at the last report
+    last_report_watts: Sequence[float]
+    #: Maximum power in W reported
+    max_report_watts: Sequence[float]
+    #: DC voltage in V at the last report
+    dc_voltage: Sequence[float]
+    #: DC current in A at the last report
+    dc_current: Sequence[float]
+    #: AC voltage in V at the last report
+    ac_voltage: Sequence[float]
+    #: AC current in A at the last report
+    ac_current: Sequence[float]
+    #: AC frequency in Hz at the last report
+    ac_frequency: Sequence[float]
+    #: Temperature in degrees Celsius at the last report
+    temperature: Sequence[float]
+    #: Lifetime energy produced in Wh
+    lifetime_energy: Sequence[float]
+    #: Energy produced in the last report period in Wh
+    energy_produced: Sequence[float]
+    #: Energy produced today in Wh
+    energy_today: Sequence[float]
+    #: Duration of the last report period in seconds
+    last_report_duration: Sequence[float]
+    #: Row of each inverter, keyed by serial number
+    index: dict[str, int] = field(init=False, repr=False)
+    _inverters: dict[str, EnvoyInverter] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        """Index the rows by serial number."""
+        self.index = {serial: row for row, serial in enumerate(self.serial_numbers)}
+
+    def __len__(self) -> int:
+        """Return the number of inverters."""
+        return len(self.serial_numbers)
+
+    @classmethod
+    def _from_rows(
+        cls, serial_numbers: list[str], rows: list[tuple[float, ...]]
+    ) -> EnvoyInverterTable:
+        """Initialize from rows of column values."""
+        columns = list(zip(*rows, strict=True)) or [()] * len(_COLUMNS)
+        return cls(
+            serial_numbers,
+            **{
+                name: _column(values)
+                for name, values in zip(_COLUMNS, columns, strict=True)
+            },
+        )
+
+    @classmethod
+    def from_v1_api(cls, data: Iterable[dict[str, Any]]) -> EnvoyInverterTable:
+        """Initialize from the inverters of the V1 API."""
+        missing = (math.nan,) * _DETAILED_COLUMNS
+        serial_numbers: list[str] = []
+        rows: list[tuple[float, ...]] = []
+        for inverter in data:
+            serial_numbers.append(inverter["serialNumber"])
+            rows.append(
+                (
+                    inverter["lastReportDate"],
+                    inverter["lastReportWatts"],
+                    inverter["maxReportWatts"],
+                    *missing,
+                )
+            )
+        return cls._from_rows(serial_numbers, rows)
+
+    @classmethod
+    def from_device_data(cls, data: Iterable[dict[str, Any]]) -> EnvoyInverterTable:
+        """
+        Initialize from the inverters in device data.
+
+        Values are derived as in :any:`EnvoyInverter.from_device_data`,
+        using :any:`EnvoyInverter.device_data_values`.
+
+        :param data: device data of the inverters
+        :raises KeyError: if the minimal data set of an inverter is missing
+        :raises IndexError: if an inverter reports no channels
+        :return: table of the inverters
+        """
+        serial_numbers: list[str] = []
+        rows: list[tuple[float, ...]] = []
+        for inverter in data:
+            serial, *values = EnvoyInverter.device_data_values(inverter)
+            serial_numbers.append(serial)
+            rows.append(tuple(_optional(value) for value in values))
+        return cls._from_rows(serial_numbers, rows)
+
+    @property
+    def inverters(self) -> dict[str, EnvoyInverter]:
+        """
+        Return the inverters as :any:`EnvoyInverter`, keyed by serial number.
+
+        The dict is built on first access and returned again afterwards,
+        it should not be modified.
+
+        :return: inverters keyed by serial number
+        """
+        if self._inverters is None:
+            columns = [
+                [
+                    None
+                    if math.isnan(value)
+                    else int(value)
+                    if name in _INT_COLUMNS
+                    else value
+                    for value in getattr(self, name).tolist()
+                ]
+                for name in _COLUMNS
+            ]
+            self._inverters = {
+                serial: EnvoyInverter(serial, *values)
+                for serial, *values in zip(self.serial_numbers, *columns, strict=True)
+            }
+        return self._inverters
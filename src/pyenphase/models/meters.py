@@ -113,3 +113,29 @@ class EnvoyMeterData:
             return None
 
         return cls.from_api(channels[phase], meter_status)
+
+
+@dataclass(slots=True)
+class EnvoyMeterStreamData:
+    """Model for a CT meter phase sample of the Envoy meter stream."""
+
+    active_power: float  #: Real power through CT phase, positive is delivering, negative is receiving
+    reactive_power: float  #: Reactive power through CT phase
+    apparent_power: float  #: Apparent power through CT phase
+    power_factor: float  #: Power factor reported for CT phase measurement
+    voltage: float  #: Voltage on circuit phase
+    current: float  #: Current measured by CT phase
+    frequency: float  #: frequency measured by CT phase
+
+    @classmethod
+    def from_stream(cls, data: dict[str, Any]) -> EnvoyMeterStreamData:
+        """Return CT meter phase sample from /stream/meter json."""
+        return cls(
+            active_power=data["p"],
+            reactive_power=data["q"],
+            apparent_power=data["s"],
+            power_factor=data["pf"],
+            voltage=data["v"],
+            current=data["i"],
+            frequency=data["f"],
+        )
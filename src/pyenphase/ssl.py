@@ -2,20 +2,133 @@
 
 import contextlib
 import ssl
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
 
+from .const import DEFAULT_SSL_SESSION_SERVERS
 
-def create_no_verify_ssl_context() -> ssl.SSLContext:
+#: Port of the server a connection is set up to. :py:meth:`ssl.SSLContext.wrap_bio`
+#: only receives the host name of the server, the connector returned by
+#: :any:`create_connector` sets the port while connecting, so servers on
+#: one host keep their own session.
+server_port: ContextVar[int | None] = ContextVar("server_port", default=None)
+
+
+def _resumable_session(sslobj: ssl.SSLObject) -> ssl.SSLSession | None:
+    """
+    Return the session of a connection if it can be resumed.
+
+    :param sslobj: SSL object of the connection
+    :return: session if the handshake completed with a session id or
+        ticket, TLS 1.3 sessions require a ticket, None otherwise
+    """
+    if (version := sslobj.version()) is None or (session := sslobj.session) is None:
+        return None
+    if session.has_ticket or (session.id and version != "TLSv1.3"):
+        return session
+    return None
+
+
+class SessionResumingSSLContext(ssl.SSLContext):
+    """
+    Client SSL context resuming the last TLS session with a server.
+
+    The Envoy is slow to complete a full TLS handshake. When the server
+    allows it, a new connection resumes the session of the previous
+    connection to the same server, which requires an abbreviated
+    handshake only. Servers not supporting resumption fall back to a
+    full handshake.
+
+    Sessions are kept per host name and port, the port is known when
+    connecting through a connector returned by :any:`create_connector`,
+    see :any:`server_port`. Sessions are kept for the most recently
+    connected servers only. The context can be shared by event loops in
+    multiple threads.
+
+    Use :py:meth:`ssl.SSLContext.session_stats` to obtain the number of
+    resumed sessions in ``hits``.
+    """
+
+    def __init__(
+        self,
+        protocol: int | None = None,
+        max_servers: int = DEFAULT_SSL_SESSION_SERVERS,
+    ) -> None:
+        """
+        Client SSL context resuming the last TLS session with a server.
+
+        :param protocol: SSL protocol, handled by :py:class:`ssl.SSLContext`
+        :param max_servers: maximum number of servers to keep the last
+            session of, the least recently connected server is dropped
+            first, defaults to :any:`DEFAULT_SSL_SESSION_SERVERS`
+        """
+        self._max_servers = max_servers
+        self._lock = threading.Lock()
+        # last connection and last resumable session per server, least
+        # recently connected first. The session of the last connection is
+        # only taken when the next connection is set up, as TLS 1.3 sends
+        # session tickets after the handshake completed
+        self._connections: OrderedDict[
+            tuple[str, int | None], tuple[ssl.SSLObject, ssl.SSLSession | None]
+        ] = OrderedDict()
+
+    def wrap_bio(
+        self,
+        incoming: ssl.MemoryBIO,
+        outgoing: ssl.MemoryBIO,
+        server_side: bool = False,
+        server_hostname: str | bytes | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLObject:
+        """
+        Create a new SSL object, resuming the last session with the server.
+
+        See :py:meth:`ssl.SSLContext.wrap_bio` for the parameters. When no
+        session is specified, the last resumable session with the server
+        is used.
+
+        :return: SSL object for the connection
+        """
+        if server_side or not isinstance(server_hostname, str):
+            return super().wrap_bio(
+                incoming, outgoing, server_side, server_hostname, session
+            )
+        server = (server_hostname, server_port.get())
+        with self._lock:
+            last_session: ssl.SSLSession | None = None
+            if (last := self._connections.pop(server, None)) is not None:
+                last_session = _resumable_session(last[0]) or last[1]
+            sslobj = super().wrap_bio(
+                incoming,
+                outgoing,
+                server_side,
+                server_hostname,
+                session or last_session,
+            )
+            self._connections[server] = (sslobj, last_session)
+            while len(self._connections) > self._max_servers:
+                self._connections.popitem(last=False)
+        return sslobj
+
+
+def create_no_verify_ssl_context(
+    max_servers: int = DEFAULT_SSL_SESSION_SERVERS,
+) -> ssl.SSLContext:
     """
     Return an SSL context that does not verify the server certificate.
 
     This is a copy of aiohttp's create_default_context() function, with the
-    ssl verify turned off and old SSL versions enabled.
+    ssl verify turned off and old SSL versions enabled. TLS sessions are
+    resumed when the server allows it, see :any:`SessionResumingSSLContext`.
 
     https://github.com/aio-libs/aiohttp/blob/33953f110e97eecc707e1402daa8d543f38a189b/aiohttp/connector.py#L911
 
+    :param max_servers: maximum number of servers to keep the last TLS
+        session of, defaults to :any:`DEFAULT_SSL_SESSION_SERVERS`
     :return: SSLcontext with ssl verify turned off.
     """
-    sslcontext = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    sslcontext = SessionResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT, max_servers)
     sslcontext.check_hostname = False
     sslcontext.verify_mode = ssl.CERT_NONE
     # Allow all ciphers rather than only Python 3.10 default
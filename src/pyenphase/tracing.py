@@ -0,0 +1,93 @@
+"""Pyenphase tracing hooks"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from typing import Any
+
+#: Span around :any:`Envoy.probe`, attributes host
+SPAN_PROBE = "pyenphase.probe"
+#: Span around the update method of an updater, attributes host and updater
+SPAN_UPDATE = "pyenphase.update"
+#: Span around an HTTP request to the Envoy, until its body was read,
+#: attributes host, endpoint and method
+SPAN_REQUEST = "pyenphase.request"
+#: Span around decoding a JSON response, attributes endpoint and size
+SPAN_JSON_DECODE = "pyenphase.json_decode"
+#: Span around building data models from a response, attributes model and count
+SPAN_BUILD = "pyenphase.build"
+
+#: Hook called at the start of a span with its name and attributes,
+#: returning a context manager that is exited at the end of the span
+TraceHook = Callable[[str, Mapping[str, Any]], AbstractContextManager[Any]]
+
+_NO_SPAN: AbstractContextManager[None] = nullcontext()
+_hooks: tuple[TraceHook, ...] = ()
+
+
+def add_trace_hook(hook: TraceHook) -> Callable[[], None]:
+    """
+    Add a hook to trace the phases of probe and update.
+
+    The hook is called at the start of each span with the span name, like
+    :any:`SPAN_REQUEST`, and its attributes. It returns a context manager
+    that is entered right away and exited at the end of the span. Spans
+    nest, an update span contains the request, JSON decode and build
+    spans of the updater. Hooks apply to all Envoys.
+
+    .. code-block:: python
+
+        from opentelemetry import trace
+
+        tracer = trace.get_tracer("pyenphase")
+        remove_hook = add_trace_hook(
+            lambda name, attributes: tracer.start_as_current_span(
+                name, attributes=attributes
+            )
+        )
+
+    :param hook: hook returning a context manager for each span
+    :return: function to remove the hook again
+    """
+    global _hooks
+    _hooks = (*_hooks, hook)
+
+    def _remove_hook() -> None:
+        """Remove the hook."""
+        global _hooks
+        _hooks = tuple(other for other in _hooks if other is not hook)
+
+    return _remove_hook
+
+
+@contextmanager
+def _spans(
+    hooks: tuple[TraceHook, ...], name: str, attributes: Mapping[str, Any]
+) -> Iterator[None]:
+    """Enter the context managers of all hooks for a span."""
+    with ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook(name, attributes))
+        yield
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager[Any]:
+    """
+    Return a context manager tracing a phase with the added trace hooks.
+
+    Updaters can use this to trace phases of their own. Without trace
+    hooks a shared context manager doing nothing is returned.
+
+    .. code-block:: python
+
+        with span(SPAN_BUILD, model="EnvoyXyz", count=len(xyz_data)):
+            xyz = {serial: EnvoyXyz.from_api(data) for serial, data in xyz_data}
+
+    :param name: name of the span
+    :param attributes: attributes of the span
+    :return: context manager to trace the phase with
+    """
+    if not _hooks:
+        return _NO_SPAN
+    return _spans(_hooks, name, attributes)
@@ -17,6 +17,11 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyApiV1ProductionUpdater(EnvoyUpdater):
     """Class to handle updates for production data."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = SupportedFeatures.PRODUCTION
+    #: CT meter count is set by the meters updater probe
+    probe_depends_on = SupportedFeatures.PRODUCTION | SupportedFeatures.CTMETERS
+
     async def probe(
         self, discovered_features: SupportedFeatures
     ) -> SupportedFeatures | None:
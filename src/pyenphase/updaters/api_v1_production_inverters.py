@@ -5,6 +5,8 @@ from ..const import URL_PRODUCTION_INVERTERS, SupportedFeatures
 from ..exceptions import ENDPOINT_PROBE_EXCEPTIONS, EnvoyAuthenticationRequired
 from ..models.envoy import EnvoyData
 from ..models.inverter import EnvoyInverter
+from ..models.inverter_table import EnvoyInverterTable
+from ..tracing import SPAN_BUILD, span
 from .base import EnvoyUpdater
 
 _LOGGER = logging.getLogger(__name__)
@@ -13,6 +15,19 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyApiV1ProductionInvertersUpdater(EnvoyUpdater):
     """Class to handle updates for inverter production data."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = SupportedFeatures.INVERTERS
+    probe_depends_on = SupportedFeatures.INVERTERS
+
+    #: Digest of the inverters response the inverters data was last extracted from
+    _inverters_digest: bytes | None = None
+    #: Inverters data extracted from the last inverters response
+    _inverters: dict[str, EnvoyInverter] = {}
+    #: Digest of the inverters response the inverter table was last built from
+    _table_digest: bytes | None = None
+    #: Inverter table built from the last inverters response
+    _table: EnvoyInverterTable | None = None
+
     async def probe(
         self, discovered_features: SupportedFeatures
     ) -> SupportedFeatures | None:
@@ -46,8 +61,32 @@ class EnvoyApiV1ProductionInvertersUpdater(EnvoyUpdater):
             URL_PRODUCTION_INVERTERS
         )
         envoy_data.raw[URL_PRODUCTION_INVERTERS] = inverters_data
-        envoy_data.inverters = {
-            inverter["serialNumber"]: EnvoyInverter.from_v1_api(inverter)
-            for inverter in inverters_data
-            if inverter.get("devType", 1) == 1 or self._common_properties.v2_acb_mode
-        }
+        digest = self._response_digest(URL_PRODUCTION_INVERTERS)
+
+        if self._common_properties.inverter_table_mode:
+            # reuse the table if the response was unchanged
+            if digest != self._table_digest:
+                with span(
+                    SPAN_BUILD, model="EnvoyInverterTable", count=len(inverters_data)
+                ):
+                    self._table = EnvoyInverterTable.from_v1_api(
+                        inverter
+                        for inverter in inverters_data
+                        if inverter.get("devType", 1) == 1
+                        or self._common_properties.v2_acb_mode
+                    )
+                self._table_digest = digest
+            self._common_properties.inverter_table = self._table
+            return
+
+        # reuse inverters data if the response was unchanged
+        if digest != self._inverters_digest:
+            with span(SPAN_BUILD, model="EnvoyInverter", count=len(inverters_data)):
+                self._inverters = {
+                    inverter["serialNumber"]: EnvoyInverter.from_v1_api(inverter)
+                    for inverter in inverters_data
+                    if inverter.get("devType", 1) == 1
+                    or self._common_properties.v2_acb_mode
+                }
+            self._inverters_digest = digest
+        envoy_data.inverters = dict(self._inverters)
@@ -1,10 +1,14 @@
+import asyncio
+import hashlib
+import time
 from abc import abstractmethod
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
 from typing import Any
 
-import aiohttp
 from awesomeversion import AwesomeVersion
 
+from ..connection import EnvoyResponse
 from ..const import SupportedFeatures
 from ..exceptions import EnvoyHTTPStatusError
 from ..json import json_loads
@@ -15,11 +19,32 @@ from ..models.envoy import EnvoyData
 class EnvoyUpdater:
     """Base class for Envoy updaters."""
 
+    #: Features of other updaters whose data this updater reads from
+    #: :any:`EnvoyData` during :any:`update`. :any:`Envoy.update` only
+    #: starts this updater after all prior registered updaters providing
+    #: any of these features have completed. Updaters not reading data
+    #: of other updaters should set this to SupportedFeatures(0) so they
+    #: can run concurrently with the others. If None, the updater waits
+    #: for all prior registered updaters to complete.
+    update_depends_on: SupportedFeatures | None = None
+
+    #: Features this updater may return from :any:`probe`. If None, the
+    #: updater may return any feature.
+    probe_provides: SupportedFeatures | None = None
+
+    #: Features this updater reads from discovered_features or, through
+    #: :any:`CommonProperties`, from the probe of other updaters.
+    #: :any:`Envoy.probe` only starts the probe of this updater after all
+    #: prior registered updaters that may provide any of these features
+    #: have completed their probe. If None, the updater waits for all
+    #: prior registered updaters.
+    probe_depends_on: SupportedFeatures | None = None
+
     def __init__(
         self,
         envoy_version: AwesomeVersion,
-        probe_request: Callable[[str], Awaitable[aiohttp.ClientResponse]],
-        request: Callable[[str], Awaitable[aiohttp.ClientResponse]],
+        probe_request: Callable[[str], Awaitable[EnvoyResponse]],
+        request: Callable[[str], Awaitable[EnvoyResponse]],
         common_properties: CommonProperties,
     ) -> None:
         """
@@ -45,6 +70,17 @@ class EnvoyUpdater:
         self._request = request
         self._supported_features = SupportedFeatures(0)
         self._common_properties = common_properties
+        # last response, digest of its body and its JSON content per endpoint,
+        # only the digest for endpoints not retained parsed
+        self._json_cache: dict[str, tuple[EnvoyResponse | None, bytes, Any]] = {}
+        #: Time in seconds with requests of :any:`_json_request` in
+        #: progress since last reset, reset by :any:`Envoy` before each
+        #: update to tell the time spent building models from the time
+        #: spent on requests
+        self.json_request_duration: float = 0.0
+        # number of requests in progress and the time the first one started
+        self._active_requests = 0
+        self._active_since = 0.0
 
     async def _json_request(self, end_point: str) -> Any:
         """
@@ -58,15 +94,133 @@ class EnvoyUpdater:
                 "/xyz/endpoint"
             )
 
+        When the response body is the same as the previous response for the
+        endpoint, the body is not parsed again and the same JSON content
+        object as before is returned. This also applies when
+        :any:`Envoy.update` reuses the response of one of the
+        :any:`CONFIGURATION_ENDPOINTS` for multiple updates. Returned JSON
+        content is shared between updates and should not be modified.
+        Content of endpoints for which :any:`Envoy.set_raw_retention` keeps
+        no parsed response data is not kept and parsed for each response.
+        Updaters can compare :any:`_response_digest` with the digest of
+        the response they extracted data from before, to reuse that data
+        rather than building new models.
+
         :param end_point: Envoy endpoint to request. See :any:`Envoy.request`
         :raises EnvoyHTTPStatusError: If http status not in 2xx range
         :return: JSON content from response
         :seealso: :any:`Envoy.request`
         """
-        response = await self._request(end_point)
-        if not (200 <= response.status < 300):
-            raise EnvoyHTTPStatusError(response.status, str(response.url))
-        return json_loads(end_point, await response.read())
+        with self._timed_request():
+            response = await self._request(end_point)
+            if not (200 <= response.status < 300):
+                raise EnvoyHTTPStatusError(response.status, str(response.url))
+            previous = self._json_cache.get(end_point)
+            if previous and previous[0] is response:
+                self._common_properties.unchanged_responses += 1
+                return previous[2]
+            content = await response.read()
+            digest = hashlib.blake2b(content, digest_size=16).digest()
+            if previous and previous[1] == digest and previous[2] is not None:
+                json_data = previous[2]
+                self._common_properties.unchanged_responses += 1
+            else:
+                parse_start = time.perf_counter()
+                json_data = json_loads(end_point, content)
+                if (observe := self._common_properties.observe_parse) is not None:
+                    observe(end_point, time.perf_counter() - parse_start)
+                self._common_properties.parsed_responses += 1
+            endpoints = self._common_properties.parsed_json_endpoints
+            if endpoints is None or end_point in endpoints:
+                self._json_cache[end_point] = (response, digest, json_data)
+            else:
+                # keep no copy of content not retained in the Envoy data
+                self._json_cache[end_point] = (None, digest, None)
+            return json_data
+
+    def _response_digest(self, end_point: str) -> bytes:
+        """
+        Return the digest of the body of the last response of an endpoint.
+
+        Updaters compare it with the digest of the response they last
+        extracted data from, to reuse that data for an unchanged response.
+
+        :param end_point: Envoy endpoint requested using :any:`_json_request`
+        :return: digest of the last response body
+        """
+        return self._json_cache[end_point][1]
+
+    async def _json_requests(self, end_points: Sequence[str]) -> list[Any]:
+        """
+        Make requests to the Envoy concurrently and return the JSON responses.
+
+        Updaters can use this to request endpoints not depending on each
+        other during :any:`update` method.
+
+        .. code-block:: python
+
+            xyz_json, abc_json = await self._json_requests(
+                ["/xyz/endpoint", "/abc/endpoint"]
+            )
+
+        The requests count against the same concurrency limit as the
+        updaters: one request at a time is made in the slot of the
+        updater itself and one more for each slot not in use by other
+        updaters when the requests start. When a request fails, the
+        other requests are cancelled and the exception is raised.
+
+        :param end_points: Envoy endpoints to request. See :any:`_json_request`
+        :raises EnvoyHTTPStatusError: If http status not in 2xx range
+        :return: JSON content from the responses, in order of end_points
+        """
+        results: list[Any] = [None] * len(end_points)
+        pending = iter(enumerate(end_points))
+
+        async def _work() -> None:
+            for index, end_point in pending:
+                results[index] = await self._json_request(end_point)
+
+        async def _work_in_slot(slots: asyncio.Semaphore) -> None:
+            try:
+                await _work()
+            finally:
+                slots.release()
+
+        workers = [asyncio.create_task(_work())]
+        slots = self._common_properties.concurrency_limit
+        while (
+            slots is not None and len(workers) < len(end_points) and not slots.locked()
+        ):
+            # a free slot is taken right away, without waiting
+            await slots.acquire()
+            workers.append(asyncio.create_task(_work_in_slot(slots)))
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # only workers still running are cancelled, wait for these to end
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return results
+
+    @contextmanager
+    def _timed_request(self) -> Iterator[None]:
+        """
+        Add the time of a request to :any:`json_request_duration`.
+
+        Concurrent requests of the updater are timed together, from the
+        start of the first to the end of the last one, so the duration
+        never exceeds the time the update took.
+        """
+        if not self._active_requests:
+            self._active_since = time.perf_counter()
+        self._active_requests += 1
+        try:
+            yield
+        finally:
+            self._active_requests -= 1
+            if not self._active_requests:
+                self.json_request_duration += time.perf_counter() - self._active_since
 
     async def _json_probe_request(self, end_point: str) -> Any:
         """
@@ -145,6 +299,10 @@ class EnvoyUpdater:
         the envoy, map it to the internal data model and store the data.
         It should also store retrieved raw data in :any:`EnvoyData.raw`
 
+        Updaters may run concurrently with other updaters, only data
+        of updaters providing the features in :any:`update_depends_on`
+        is available in envoy_data when the update method is called.
+
         .. code-block:: python
 
             async def update(self, envoy_data: EnvoyData) -> None:
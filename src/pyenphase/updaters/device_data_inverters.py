@@ -5,6 +5,8 @@ from ..const import URL_DEVICE_DATA, SupportedFeatures
 from ..exceptions import ENDPOINT_PROBE_EXCEPTIONS, EnvoyAuthenticationRequired
 from ..models.envoy import EnvoyData
 from ..models.inverter import EnvoyInverter
+from ..models.inverter_table import EnvoyInverterTable
+from ..tracing import SPAN_BUILD, span
 from .base import EnvoyUpdater
 
 _LOGGER = logging.getLogger(__name__)
@@ -13,6 +15,19 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyDeviceDataInvertersUpdater(EnvoyUpdater):
     """Class to handle updates for inverter device data."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = SupportedFeatures.INVERTERS | SupportedFeatures.DETAILED_INVERTERS
+    probe_depends_on = SupportedFeatures.INVERTERS
+
+    #: Digest of the device data response the inverters data was last extracted from
+    _inverters_digest: bytes | None = None
+    #: Inverters data extracted from the last device data response
+    _inverters: dict[str, EnvoyInverter] = {}
+    #: Digest of the device data response the inverter table was last built from
+    _table_digest: bytes | None = None
+    #: Inverter table built from the last device data response
+    _table: EnvoyInverterTable | None = None
+
     def _filter_inverters(self, inverters_data: dict[str, Any]) -> dict[str, Any]:
         """Filter and return only PCU inverter devices."""
         return {
@@ -103,8 +118,31 @@ class EnvoyDeviceDataInvertersUpdater(EnvoyUpdater):
         """Update the Envoy for this updater."""
         inverters_data: dict[str, Any] = await self._json_request(URL_DEVICE_DATA)
         envoy_data.raw[URL_DEVICE_DATA] = inverters_data
-        filtered_inverters = self._filter_inverters(inverters_data)
-        envoy_data.inverters = {
-            sn: EnvoyInverter.from_device_data(inverter)
-            for sn, inverter in filtered_inverters.items()
-        }
+        digest = self._response_digest(URL_DEVICE_DATA)
+
+        if self._common_properties.inverter_table_mode:
+            # reuse the table if the response was unchanged
+            if digest != self._table_digest:
+                filtered_inverters = self._filter_inverters(inverters_data)
+                with span(
+                    SPAN_BUILD,
+                    model="EnvoyInverterTable",
+                    count=len(filtered_inverters),
+                ):
+                    self._table = EnvoyInverterTable.from_device_data(
+                        filtered_inverters.values()
+                    )
+                self._table_digest = digest
+            self._common_properties.inverter_table = self._table
+            return
+
+        # reuse inverters data if the response was unchanged
+        if digest != self._inverters_digest:
+            filtered_inverters = self._filter_inverters(inverters_data)
+            with span(SPAN_BUILD, model="EnvoyInverter", count=len(filtered_inverters)):
+                self._inverters = {
+                    sn: EnvoyInverter.from_device_data(inverter)
+                    for sn, inverter in filtered_inverters.items()
+                }
+            self._inverters_digest = digest
+        envoy_data.inverters = dict(self._inverters)
@@ -28,6 +28,15 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyEnembleUpdater(EnvoyUpdater):
     """Class to handle updates for Ensemble devices."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = (
+        SupportedFeatures.ENPOWER
+        | SupportedFeatures.ENCHARGE
+        | SupportedFeatures.COLLAR
+        | SupportedFeatures.C6CC
+    )
+    probe_depends_on = SupportedFeatures(0)
+
     async def probe(
         self, discovered_features: SupportedFeatures
     ) -> SupportedFeatures | None:
@@ -70,31 +79,22 @@ class EnvoyEnembleUpdater(EnvoyUpdater):
 
         return self._supported_features
 
-    async def update(self, envoy_data: EnvoyData) -> None:
-        """Update the Envoy for this updater."""
-        # Update Enpower and Encharge data if supported
-        supported_features = self._supported_features
-        ensemble_inventory_data: list[dict[str, Any]] = await self._json_request(
-            URL_ENSEMBLE_INVENTORY
-        )
-        envoy_data.raw[URL_ENSEMBLE_INVENTORY] = ensemble_inventory_data
+    #: Digest of the Ensemble inventory response the device data was last extracted from
+    _inventory_digest: bytes | None = None
+    #: Device data extracted from the last Ensemble inventory response
+    _inventory_data: EnvoyData | None = None
 
-        ensemble_secctrl_data: dict[str, Any] = await self._json_request(
-            URL_ENSEMBLE_SECCTRL
-        )
-        envoy_data.raw[URL_ENSEMBLE_SECCTRL] = await self._json_request(
-            URL_ENSEMBLE_SECCTRL
-        )
+    def _update_from_inventory(
+        self, ensemble_inventory_data: list[dict[str, Any]], envoy_data: EnvoyData
+    ) -> None:
+        """
+        Extract Encharge, Enpower, Collar and C6CC device data from inventory.
 
+        :param ensemble_inventory_data: Ensemble inventory JSON content
+        :param envoy_data: Envoy data model to store device data in
+        """
+        supported_features = self._supported_features
         if supported_features & SupportedFeatures.ENCHARGE:
-            encharge_power_data: dict[str, Any] = await self._json_request(
-                URL_ENCHARGE_BATTERY
-            )
-            envoy_data.raw[URL_ENCHARGE_BATTERY] = encharge_power_data
-            power: dict[str, Any] = {
-                device["serial_num"]: device
-                for device in encharge_power_data["devices:"]
-            }
             inventory: dict[str, Any] = {}
             for item in ensemble_inventory_data:
                 if item["type"] != "ENCHARGE":
@@ -105,12 +105,6 @@ class EnvoyEnembleUpdater(EnvoyUpdater):
                 serial: EnvoyEncharge.from_api(inventory[serial])
                 for serial in inventory
             }
-            envoy_data.encharge_power = {
-                serial: EnvoyEnchargePower.from_api(power[serial]) for serial in power
-            }
-            envoy_data.encharge_aggregate = EnvoyEnchargeAggregate.from_api(
-                ensemble_secctrl_data
-            )
 
         if supported_features & SupportedFeatures.ENPOWER:
             # Update Enpower data
@@ -120,17 +114,77 @@ class EnvoyEnembleUpdater(EnvoyUpdater):
                 enpower_data = item["devices"][0]
             envoy_data.enpower = EnvoyEnpower.from_api(enpower_data)
 
-            # Update dry contact data
-            dry_contact_status_data: dict[str, Any] = await self._json_request(
-                URL_DRY_CONTACT_STATUS
-            )
-            envoy_data.raw[URL_DRY_CONTACT_STATUS] = dry_contact_status_data
+        # IQ Meter collar seems like a single instance only
+        if supported_features & SupportedFeatures.COLLAR:
+            # Update Collar data
+            for item in ensemble_inventory_data:
+                if item["type"] != "COLLAR":
+                    continue
+                if item.get("devices"):
+                    collar_data = item["devices"][0]
+                    envoy_data.collar = EnvoyCollar.from_api(collar_data)
 
-            dry_contact_settings_data: dict[str, Any] = await self._json_request(
-                URL_DRY_CONTACT_SETTINGS
+        # C6 Combiner seems like a single instance only
+        if supported_features & SupportedFeatures.C6CC:
+            # Update C6CC data
+            for item in ensemble_inventory_data:
+                if item["type"] != "C6 COMBINER CONTROLLER":
+                    continue
+                if item.get("devices"):
+                    c6cc_data = item["devices"][0]
+                    envoy_data.c6cc = EnvoyC6CC.from_api(c6cc_data)
+
+    async def update(self, envoy_data: EnvoyData) -> None:
+        """Update the Envoy for this updater."""
+        # Update Enpower and Encharge data if supported
+        supported_features = self._supported_features
+        end_points = [URL_ENSEMBLE_INVENTORY, URL_ENSEMBLE_SECCTRL]
+        if supported_features & SupportedFeatures.ENCHARGE:
+            end_points.append(URL_ENCHARGE_BATTERY)
+        if supported_features & SupportedFeatures.ENPOWER:
+            end_points.extend((URL_DRY_CONTACT_STATUS, URL_DRY_CONTACT_SETTINGS))
+
+        # the endpoints do not depend on each other, request them concurrently
+        json_data: dict[str, Any] = dict(
+            zip(end_points, await self._json_requests(end_points), strict=True)
+        )
+        envoy_data.raw.update(json_data)
+
+        ensemble_inventory_data: list[dict[str, Any]] = json_data[
+            URL_ENSEMBLE_INVENTORY
+        ]
+        ensemble_secctrl_data: dict[str, Any] = json_data[URL_ENSEMBLE_SECCTRL]
+
+        # reuse the device data extracted before if the response was unchanged
+        digest = self._response_digest(URL_ENSEMBLE_INVENTORY)
+        if self._inventory_data is None or digest != self._inventory_digest:
+            self._inventory_data = EnvoyData()
+            self._update_from_inventory(ensemble_inventory_data, self._inventory_data)
+            self._inventory_digest = digest
+        envoy_data.encharge_inventory = self._inventory_data.encharge_inventory
+        envoy_data.enpower = self._inventory_data.enpower
+        envoy_data.collar = self._inventory_data.collar
+        envoy_data.c6cc = self._inventory_data.c6cc
+
+        if supported_features & SupportedFeatures.ENCHARGE:
+            encharge_power_data: dict[str, Any] = json_data[URL_ENCHARGE_BATTERY]
+            power: dict[str, Any] = {
+                device["serial_num"]: device
+                for device in encharge_power_data["devices:"]
+            }
+            envoy_data.encharge_power = {
+                serial: EnvoyEnchargePower.from_api(power[serial]) for serial in power
+            }
+            envoy_data.encharge_aggregate = EnvoyEnchargeAggregate.from_api(
+                ensemble_secctrl_data
             )
-            envoy_data.raw[URL_DRY_CONTACT_SETTINGS] = dry_contact_settings_data
 
+        if supported_features & SupportedFeatures.ENPOWER:
+            # Update dry contact data
+            dry_contact_status_data: dict[str, Any] = json_data[URL_DRY_CONTACT_STATUS]
+            dry_contact_settings_data: dict[str, Any] = json_data[
+                URL_DRY_CONTACT_SETTINGS
+            ]
             envoy_data.dry_contact_status = {
                 relay["id"]: EnvoyDryContactStatus.from_api(relay)
                 for relay in dry_contact_status_data["dry_contacts"]
@@ -148,23 +202,3 @@ class EnvoyEnembleUpdater(EnvoyUpdater):
             envoy_data.battery_aggregate = EnvoyBatteryAggregate.from_api(
                 ensemble_secctrl_data
             )
-
-        # IQ Meter collar seems like a single instance only
-        if supported_features & SupportedFeatures.COLLAR:
-            # Update Collar data
-            for item in ensemble_inventory_data:
-                if item["type"] != "COLLAR":
-                    continue
-                if item.get("devices"):
-                    collar_data = item["devices"][0]
-                    envoy_data.collar = EnvoyCollar.from_api(collar_data)
-
-        # C6 Combiner seems like a single instance only
-        if supported_features & SupportedFeatures.C6CC:
-            # Update C6CC data
-            for item in ensemble_inventory_data:
-                if item["type"] != "C6 COMBINER CONTROLLER":
-                    continue
-                if item.get("devices"):
-                    c6cc_data = item["devices"][0]
-                    envoy_data.c6cc = EnvoyC6CC.from_api(c6cc_data)
@@ -25,12 +25,20 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyGeneratorUpdater(EnvoyUpdater):
     """Class to handle updates for Generator information."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = SupportedFeatures.GENERATOR
+    probe_depends_on = SupportedFeatures.ENPOWER
+
     #: Whether the Envoy exposes the generator status endpoint, set during probe
     _generator_available: bool = False
     #: Whether the Envoy exposes the gen_schedule endpoint, set during probe
     _gen_schedule_available: bool = False
     #: Whether the Envoy exposes the gen_mode endpoint, set during probe
     _gen_mode_available: bool = False
+    #: Digest of the gen_config response the configuration was last extracted from
+    _config_digest: bytes | None = None
+    #: Generator configuration extracted from the last gen_config response
+    _config: EnvoyGeneratorConfig | None = None
 
     async def _optional_endpoint_available(self, end_point: str) -> bool:
         """
@@ -97,9 +105,11 @@ class EnvoyGeneratorUpdater(EnvoyUpdater):
 
         generator_config_data: dict[str, Any] = await self._json_request(URL_GEN_CONFIG)
         envoy_data.raw[URL_GEN_CONFIG] = generator_config_data
-        envoy_data.generator_config = EnvoyGeneratorConfig.from_api(
-            generator_config_data
-        )
+        # reuse data if the response was unchanged
+        if (digest := self._response_digest(URL_GEN_CONFIG)) != self._config_digest:
+            self._config = EnvoyGeneratorConfig.from_api(generator_config_data)
+            self._config_digest = digest
+        envoy_data.generator_config = self._config
 
         if self._gen_schedule_available:
             generator_schedule_data: dict[str, Any] = await self._json_request(
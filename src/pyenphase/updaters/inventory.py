@@ -6,7 +6,7 @@ from typing import Any
 from ..const import URL_INVENTORY, URL_PRODUCTION_INVERTERS, SupportedFeatures
 from ..exceptions import ENDPOINT_PROBE_EXCEPTIONS, EnvoyAuthenticationRequired
 from ..models.acb import EnvoyACB
-from ..models.envoy import EnvoyData
+from ..models.envoy import EnvoyCompactRaw, EnvoyData
 from ..models.inverter import EnvoyInverter
 from .base import EnvoyUpdater
 
@@ -16,6 +16,11 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyInventoryUpdater(EnvoyUpdater):
     """Updater for generic inventory endpoint, currently for ACB devices."""
 
+    #: ACB power details are read from the v1 inverters data in raw
+    update_depends_on = SupportedFeatures.INVERTERS
+    probe_provides = SupportedFeatures.ACB
+    probe_depends_on = SupportedFeatures.ACB
+
     async def probe(
         self, discovered_features: SupportedFeatures
     ) -> SupportedFeatures | None:
@@ -64,9 +69,13 @@ class EnvoyInventoryUpdater(EnvoyUpdater):
         # Build per-ACB power lookup from devType=11 entries in the v1 inverters response.
         # devType=1 (solar microinverters) are filtered out of envoy_data.inverters, so we
         # read directly from the raw response to avoid polluting the inverters dict.
-        raw_v1_inverters: list[dict[str, Any]] = envoy_data.raw.get(
+        raw: list[dict[str, Any]] | EnvoyCompactRaw = envoy_data.raw.get(
             URL_PRODUCTION_INVERTERS, []
         )
+        # kept compact by an earlier update, see Envoy.set_raw_retention
+        raw_v1_inverters: list[dict[str, Any]] = (
+            raw.json if isinstance(raw, EnvoyCompactRaw) else raw
+        )
         if not raw_v1_inverters:
             try:
                 raw_v1_inverters = await self._json_request(URL_PRODUCTION_INVERTERS)
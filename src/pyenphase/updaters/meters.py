@@ -24,6 +24,13 @@ class EnvoyMetersUpdater(EnvoyUpdater):
     data_end_point = (
         ENDPOINT_URL_METERS_READINGS  #: endpoint in Envoy to read CT meter data
     )
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = (
+        SupportedFeatures.CTMETERS
+        | SupportedFeatures.DUALPHASE
+        | SupportedFeatures.THREEPHASE
+    )
+    probe_depends_on = SupportedFeatures.CTMETERS
     meter_types: list[str]  #: CT types found
     phase_mode: EnvoyPhaseMode | None = (
         None  #: Phase mode configured (Single, Dual or Three)
@@ -32,6 +32,17 @@ class EnvoyProductionUpdater(EnvoyUpdater):
     """Class to handle updates for production data."""
 
     end_point = URL_PRODUCTION
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = (
+        SupportedFeatures.PRODUCTION
+        | SupportedFeatures.METERING
+        | SupportedFeatures.TOTAL_CONSUMPTION
+        | SupportedFeatures.NET_CONSUMPTION
+        | SupportedFeatures.ACB
+    )
+    #: production updaters share the production fallback list and
+    #: report phase data for the phase count found by the meters updater
+    probe_depends_on = probe_provides | SupportedFeatures.CTMETERS
     allow_inverters_fallback = False
 
     async def probe(
@@ -12,6 +12,15 @@ _LOGGER = logging.getLogger(__name__)
 class EnvoyTariffUpdater(EnvoyUpdater):
     """Class to handle updates for the Envoy tariff data."""
 
+    update_depends_on = SupportedFeatures(0)  #: reads no data of other updaters
+    probe_provides = SupportedFeatures.TARIFF
+    probe_depends_on = SupportedFeatures(0)
+
+    #: Digest of the tariff response the tariff data was last extracted from
+    _tariff_digest: bytes | None = None
+    #: Tariff data extracted from the last tariff response
+    _tariff: EnvoyTariff | None = None
+
     async def probe(
         self, discovered_features: SupportedFeatures
     ) -> SupportedFeatures | None:
@@ -40,4 +49,8 @@ class EnvoyTariffUpdater(EnvoyUpdater):
         raw = await self._json_request(URL_TARIFF)
         envoy_data.raw[URL_TARIFF] = raw
 
-        envoy_data.tariff = EnvoyTariff.from_api(raw["tariff"])
+        # reuse data if the response was unchanged
+        if (digest := self._response_digest(URL_TARIFF)) != self._tariff_digest:
+            self._tariff = EnvoyTariff.from_api(raw["tariff"])
+            self._tariff_digest = digest
+        envoy_data.tariff = self._tariff
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import logging
+from collections import Counter
 from collections.abc import Generator
 from contextlib import contextmanager
 from os import listdir
@@ -12,6 +13,7 @@ from typing import Any
 
 import aiohttp
 import orjson
+from aiohttp import web
 from aioresponses import aioresponses
 from awesomeversion import AwesomeVersion
 
@@ -514,3 +516,78 @@ async def prep_envoy(
 def updater_features(updaters: list[EnvoyUpdater]) -> dict[str, SupportedFeatures]:
     """Return the updater supported features flags"""
     return {type(updater).__name__: updater._supported_features for updater in updaters}
+
+
+#: fixture version served by the :any:`EnvoySimulator`
+SIMULATOR_VERSION = "5.0.62"
+#: host of the simulated Envoy that never responds
+HUNG_HOST = "hung.local"
+
+
+class EnvoySimulator:
+    """Local stand-in for many Envoys serving fixture data."""
+
+    def __init__(self) -> None:
+        path = f"{_fixtures_dir()}/{SIMULATOR_VERSION}"
+        self.fixtures = {
+            name: _load_fixture(f"{path}/{name}")
+            for name in _fixture_files(path)
+            if not name.endswith("_log.json")
+        }
+        self.port = 0
+        self.requests: Counter[str] = Counter()
+        self.active: Counter[str] = Counter()
+        self.max_active_hosts = 0
+        #: endpoints that never respond for any host
+        self.hung_paths: set[str] = set()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Serve the fixture for the requested endpoint."""
+        host = request.host.split(":")[0]
+        self.requests[host] += 1
+        self.active[host] += 1
+        self.max_active_hosts = max(self.max_active_hosts, len(+self.active))
+        try:
+            if host == HUNG_HOST or request.path in self.hung_paths:
+                await asyncio.Event().wait()
+            name = request.path.strip("/").replace("/", "_")
+            name = name.removesuffix(".json") if name == "inventory.json" else name
+            if (content := self.fixtures.get(name)) is None:
+                return web.Response(status=404)
+            try:
+                orjson.loads(content)
+            except orjson.JSONDecodeError:
+                content_type = "text/html" if name != "info" else "application/xml"
+            else:
+                content_type = "application/json"
+            return web.Response(text=content, content_type=content_type)
+        finally:
+            self.active[host] -= 1
+
+    async def start(self) -> web.AppRunner:
+        """Start the simulator on a free local port."""
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self.handle)
+        runner = web.AppRunner(app, handler_cancellation=True)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        return runner
+
+
+async def get_simulated_envoy(simulator: EnvoySimulator, **kwargs: Any) -> Envoy:
+    """Return an Envoy authenticated to the simulator, kwargs passed to Envoy."""
+    envoy = Envoy(f"127.0.0.1:{simulator.port}", **kwargs)
+    envoy._firmware._firmware_version = AwesomeVersion(SIMULATOR_VERSION)
+    envoy._firmware._serial_number = "123456789012"
+    await envoy.authenticate(username="envoy")
+    return envoy
+
+
+async def latency(delay: float) -> None:
+    """Wait for delay seconds, asyncio.sleep is mocked in tests."""
+    loop = asyncio.get_running_loop()
+    waiter: asyncio.Future[None] = loop.create_future()
+    loop.call_later(delay, waiter.set_result, None)
+    await waiter
@@ -1,5 +1,6 @@
 import inspect
 import logging
+from collections.abc import AsyncGenerator
 from unittest.mock import Mock, patch
 
 import aiohttp
@@ -9,6 +10,7 @@ from aioresponses import aioresponses
 from syrupy import SnapshotAssertion
 
 from pyenphase.ssl import NO_VERIFY_SSL_CONTEXT
+from tests.common import EnvoySimulator
 from tests.syrupy import EnphaseSnapshotExtension
 
 # bandaid for aiorsponses https://github.com/pnuckowski/aioresponses/issues/289
@@ -53,6 +55,15 @@ async def test_client_session():
     await session.close()
 
 
+@pytest_asyncio.fixture
+async def simulator() -> AsyncGenerator[EnvoySimulator]:
+    """Run the Envoy simulator on a free local port."""
+    simulator = EnvoySimulator()
+    runner = await simulator.start()
+    yield simulator
+    await runner.cleanup()
+
+
 @pytest.fixture
 def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
     """Return snapshot assertion fixture with the Enphase extension."""
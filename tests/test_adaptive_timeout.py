@@ -0,0 +1,132 @@
+"""Test adaptive per-endpoint request timeouts."""
+
+import time
+
+import aiohttp
+import pytest
+
+from pyenphase import Envoy
+from pyenphase.const import (
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ADAPTIVE_TIMEOUT_WINDOW,
+    LOCAL_TIMEOUT,
+    URL_PRODUCTION,
+    URL_PRODUCTION_INVERTERS,
+)
+from pyenphase.latency import EnvoyEndpointLatency
+
+from .common import EnvoySimulator, get_simulated_envoy
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+def test_endpoint_latency() -> None:
+    """Verify the timeout is derived from the 99th percentile response time."""
+    latency = EnvoyEndpointLatency()
+    assert latency.percentile(99) is None
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES - 1):
+        latency.add(0.1)
+    assert latency.timeout(3, 0.5, 45) is None
+
+    latency.add(2.0)
+    assert latency.percentile(0) == 0.1
+    assert latency.percentile(50) == 0.1
+    assert latency.percentile(99) == 2.0
+    assert latency.timeout(3, 0.5, 45) == 6.0
+    assert latency.timeout(3, 10, 45) == 10
+    assert latency.timeout(3, 0.5, 5) == 5
+
+    # the timeout doubles after each timed out request
+    latency.timed_out()
+    latency.timed_out()
+    assert latency.timeout(3, 0.5, 45) == 24.0
+    assert latency.timeout(3, 0.5, 20) == 20
+    latency.add(0.1)
+    assert latency.timeout(3, 0.5, 45) == 6.0
+
+    # only the last response times are kept
+    for _ in range(ADAPTIVE_TIMEOUT_WINDOW):
+        latency.add(0.1)
+    assert len(latency.samples) == ADAPTIVE_TIMEOUT_WINDOW
+    assert latency.timeout(3, 0.1, 45) == pytest.approx(0.3)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_timeout(simulator: EnvoySimulator) -> None:
+    """Verify a fast endpoint times out quickly once its response times are known."""
+    envoy = await get_simulated_envoy(
+        simulator, timeout=aiohttp.ClientTimeout(total=0.5)
+    )
+    envoy.set_retry_policy(max_attempts=1)
+    envoy.set_adaptive_timeout(min_timeout=0.05)
+
+    # without response times the timeout for the Envoy is used
+    simulator.hung_paths.add(URL_PRODUCTION_INVERTERS)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        await envoy.request(URL_PRODUCTION_INVERTERS)
+    assert time.monotonic() - start >= 0.5
+    assert URL_PRODUCTION_INVERTERS not in envoy.endpoint_latency
+
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        response = await envoy.request(URL_PRODUCTION)
+        assert response.status == 200
+    latency = envoy.endpoint_latency[URL_PRODUCTION]
+    assert len(latency.samples) == ADAPTIVE_TIMEOUT_MIN_SAMPLES
+    timeout = envoy._request_timeout(URL_PRODUCTION)
+    assert timeout.total is not None
+    assert 0.05 <= timeout.total < 0.5
+    assert timeout.connect == envoy._timeout.connect
+
+    # the endpoint stops responding, it fails fast and the timeout doubles
+    simulator.hung_paths.add(URL_PRODUCTION)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        await envoy.request(URL_PRODUCTION)
+    assert time.monotonic() - start < 0.5
+    assert envoy.endpoint_latency[URL_PRODUCTION].timeouts == 1
+    doubled = envoy._request_timeout(URL_PRODUCTION).total
+    assert doubled == min(timeout.total * 2, 0.5)
+
+    # a response resets the timeout
+    simulator.hung_paths.clear()
+    await envoy.request(URL_PRODUCTION)
+    assert envoy.endpoint_latency[URL_PRODUCTION].timeouts == 0
+
+    # the timeout specified for the Envoy remains the upper bound
+    envoy.set_adaptive_timeout(factor=1e6, max_timeout=60)
+    assert envoy._request_timeout(URL_PRODUCTION).total == 0.5
+    envoy.set_adaptive_timeout(factor=1e6, min_timeout=0.05, max_timeout=0.2)
+    assert envoy._request_timeout(URL_PRODUCTION).total == 0.2
+
+    # and is used when not adapting timeouts
+    envoy.set_adaptive_timeout(factor=0)
+    assert envoy._request_timeout(URL_PRODUCTION) is envoy._timeout
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_timeout_parameters() -> None:
+    """Verify adaptive timeout parameters are validated."""
+    envoy = Envoy("127.0.0.1", timeout=10)
+    assert envoy._timeout == aiohttp.ClientTimeout(total=10)
+    with pytest.raises(ValueError, match="factor can not be negative"):
+        envoy.set_adaptive_timeout(factor=-1)
+    with pytest.raises(ValueError, match="min_timeout must be positive"):
+        envoy.set_adaptive_timeout(min_timeout=0)
+    with pytest.raises(ValueError, match="max_timeout can not be less"):
+        envoy.set_adaptive_timeout(min_timeout=10, max_timeout=5)
+    await envoy.close()
+
+    envoy = Envoy("127.0.0.1", timeout=aiohttp.ClientTimeout(total=None))
+    envoy._endpoint_latency["/endpoint"] = latency = EnvoyEndpointLatency()
+    for _ in range(ADAPTIVE_TIMEOUT_MIN_SAMPLES):
+        latency.add(1000)
+    envoy.set_adaptive_timeout()
+    assert envoy._request_timeout("/endpoint").total == 3000
+    await envoy.close()
+
+    envoy = Envoy("127.0.0.1")
+    assert envoy._timeout is LOCAL_TIMEOUT
+    await envoy.close()
@@ -0,0 +1,290 @@
+"""Benchmarks for data collection from the Envoy."""
+
+import gc
+import logging
+import time
+import tracemalloc
+from collections.abc import Mapping
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+import pyenphase
+from pyenphase import (
+    Envoy,
+    EnvoyData,
+    EnvoyInverter,
+    EnvoyInverterTable,
+)
+from pyenphase.const import (
+    URL_DRY_CONTACT_SETTINGS,
+    URL_DRY_CONTACT_STATUS,
+    URL_ENCHARGE_BATTERY,
+    URL_ENSEMBLE_INVENTORY,
+    URL_ENSEMBLE_SECCTRL,
+    URL_INVENTORY,
+    RawRetention,
+)
+from pyenphase.tracing import SPAN_REQUEST, add_trace_hook, span
+from pyenphase.updaters.ensemble import EnvoyEnembleUpdater
+
+from .common import (
+    _fixtures_dir,
+    get_mock_envoy,
+    latency,
+    load_json_fixture,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+#: Directory of the pyenphase modules, to trace their memory allocations
+_PACKAGE_DIR = Path(pyenphase.__file__).parent
+
+#: simulated Envoy response time for each request in seconds
+LATENCY = 0.05
+
+
+def _add_latency(envoy: Envoy, requests: list[str]) -> None:
+    """Delay each request to the Envoy by LATENCY and record the endpoint."""
+    request = envoy._request
+
+    async def _slow_request(endpoint: str, *args: Any, **kwargs: Any) -> Any:
+        requests.append(endpoint)
+        await latency(LATENCY)
+        return await request(endpoint, *args, **kwargs)
+
+    envoy._request = _slow_request  # type: ignore[method-assign]
+
+
+async def _ensemble_update(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> tuple[Envoy, list[str], float]:
+    """Return the Envoy, the requests and the wall time of an Ensemble update."""
+    version = "8.2.127_with_generator_running"
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    envoy = await get_mock_envoy(test_client_session)
+    ensemble = next(
+        updater
+        for updater in envoy._updaters
+        if isinstance(updater, EnvoyEnembleUpdater)
+    )
+    requests: list[str] = []
+    _add_latency(envoy, requests)
+
+    envoy._endpoint_cache.clear()
+    start = time.monotonic()
+    await ensemble.update(EnvoyData())
+    elapsed = time.monotonic() - start
+    LOGGER.info(
+        "Ensemble update: %s requests in %.3f sec, latency %s sec",
+        len(requests),
+        elapsed,
+        LATENCY,
+    )
+    return envoy, requests, elapsed
+
+
+@pytest.mark.asyncio
+async def test_benchmark_ensemble_update(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Benchmark request count of the Ensemble updater and the Envoy update."""
+    envoy, requests, _elapsed = await _ensemble_update(
+        mock_aioresponse, test_client_session
+    )
+    # one request per endpoint
+    assert sorted(requests) == sorted(
+        [
+            URL_ENSEMBLE_INVENTORY,
+            URL_ENSEMBLE_SECCTRL,
+            URL_ENCHARGE_BATTERY,
+            URL_DRY_CONTACT_STATUS,
+            URL_DRY_CONTACT_SETTINGS,
+        ]
+    )
+
+    requests.clear()
+    start = time.monotonic()
+    await envoy.update()
+    LOGGER.info(
+        "Envoy update: %s requests in %.3f sec, latency %s sec",
+        len(requests),
+        time.monotonic() - start,
+        LATENCY,
+    )
+    assert len(requests) == len(set(requests))
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_ensemble_update_time(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Benchmark wall time of the Ensemble updater requesting concurrently."""
+    _envoy, requests, elapsed = await _ensemble_update(
+        mock_aioresponse, test_client_session
+    )
+    # sending the requests one by one takes at least len(requests) * LATENCY
+    assert elapsed < len(requests) * LATENCY / 2
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_tracing_overhead(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Benchmark the overhead of tracing spans without trace hooks."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = await get_mock_envoy(test_client_session)
+
+    # count the spans of an update
+    spans: list[str] = []
+
+    def _count(name: str, attributes: Mapping[str, Any]) -> nullcontext[None]:
+        spans.append(name)
+        return nullcontext()
+
+    remove_hook = add_trace_hook(_count)
+    await envoy.update()
+    remove_hook()
+    assert spans
+
+    updates = 20
+    start = time.perf_counter()
+    for _ in range(updates):
+        await envoy.update()
+    update_time = (time.perf_counter() - start) / updates
+
+    calls = 100_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        with span(SPAN_REQUEST, host="127.0.0.1", endpoint="/", method="GET"):
+            pass
+    span_time = (time.perf_counter() - start) / calls
+
+    overhead = len(spans) * span_time / update_time
+    LOGGER.info(
+        "Tracing without hooks: %s spans per update of %.3f ms, "
+        "%.0f ns per span, overhead %.4f%%",
+        len(spans),
+        update_time * 1000,
+        span_time * 1e9,
+        overhead * 100,
+    )
+    assert overhead < 0.01
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "version",
+    sorted(
+        path.name
+        for path in _fixtures_dir().iterdir()
+        # 3.7.0 only offers scraped production pages, which are not supported
+        if path.is_dir()
+        and path.name != "3.7.0"
+        and not path.name.endswith("_bad_auth")
+    ),
+)
+@pytest.mark.asyncio
+async def test_benchmark_raw_retention_memory(
+    version: str,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Benchmark the memory kept by an update for each retention."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    memory: dict[str, int] = {}
+    for name, retention, endpoints in (
+        ("parsed", RawRetention.PARSED, None),
+        ("compact", RawRetention.COMPACT, None),
+        ("allow-list", RawRetention.PARSED, [URL_INVENTORY]),
+        ("none", RawRetention.NONE, None),
+    ):
+        envoy = await get_mock_envoy(test_client_session, update=False)
+        envoy.set_raw_retention(retention, endpoints)
+        gc.collect()
+        tracemalloc.start()
+        # the second update reuses the models of unchanged responses
+        await envoy.update()
+        await envoy.update()
+        gc.collect()
+        # returned data, models and response caches kept by the Envoy,
+        # leaving out memory kept by aiohttp and the mocked responses
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, str(_PACKAGE_DIR / "*"))]
+        )
+        tracemalloc.stop()
+        memory[name] = sum(stat.size for stat in snapshot.statistics("filename"))
+        await envoy.close()
+    LOGGER.info(
+        "Memory kept by updates of %s: %s",
+        version,
+        ", ".join(f"{name} {size} bytes" for name, size in memory.items()),
+    )
+    assert memory["allow-list"] <= memory["parsed"]
+    assert memory["none"] < memory["parsed"]
+    if memory["parsed"] - memory["none"] > 8192:
+        # compact JSON only pays off when the responses are not tiny
+        assert memory["compact"] < memory["parsed"]
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_inverter_table() -> None:
+    """Benchmark building an inverter table against building inverter models."""
+    device_data = await load_json_fixture(
+        "8.2.4345_with_device_data", "ivp_pdm_device_data"
+    )
+    pcu = next(
+        device
+        for device in device_data.values()
+        if isinstance(device, dict) and device["devName"] == "pcu"
+    )
+    # a large site, all inverters reporting the data of the fixture inverter
+    devices = [{**pcu, "sn": f"{serial:012d}"} for serial in range(250)]
+
+    def _build_models() -> dict[str, EnvoyInverter]:
+        return {
+            device["sn"]: EnvoyInverter.from_device_data(device) for device in devices
+        }
+
+    def _build_table() -> EnvoyInverterTable:
+        return EnvoyInverterTable.from_device_data(devices)
+
+    results: dict[str, tuple[float, int]] = {}
+    for name, build in (("models", _build_models), ("table", _build_table)):
+        runs = 50
+        start = time.perf_counter()
+        for _ in range(runs):
+            build()
+        elapsed = (time.perf_counter() - start) / runs
+        tracemalloc.start()
+        built = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(built) == len(devices)
+        results[name] = (elapsed, memory)
+    LOGGER.info(
+        "%s inverters: %s",
+        len(devices),
+        ", ".join(
+            f"{name} {elapsed * 1000:.3f} ms {memory} bytes"
+            for name, (elapsed, memory) in results.items()
+        ),
+    )
+    assert results["table"][1] < results["models"][1]
@@ -0,0 +1,131 @@
+"""Test change sets of Envoy data."""
+
+import logging
+from dataclasses import fields, replace
+
+import aiohttp
+import orjson
+import pytest
+from aioresponses import aioresponses
+
+from pyenphase import EnvoyData
+from pyenphase.const import URL_DEVICE_DATA
+from pyenphase.envoy import _data_diff
+
+from .common import (
+    get_mock_envoy,
+    override_mock,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+
+
+@pytest.mark.asyncio
+async def test_update_changes(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify update reports the changed data and its generation."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.3.5169_ACB_inventory")
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    changes = envoy.changes
+    assert changes is None
+
+    first = await envoy.update()
+    changes = envoy.changes
+    assert changes is not None
+    assert changes.generation == 1
+    assert changes.fields == {
+        data_field.name
+        for data_field in fields(EnvoyData)
+        if getattr(first, data_field.name) != getattr(EnvoyData(), data_field.name)
+    }
+    assert changes.inverters == set(first.inverters)
+    assert changes.ctmeters == set(first.ctmeters)
+    assert changes.ctmeters_phases == {
+        (ct_type, phase)
+        for ct_type, phases in first.ctmeters_phases.items()
+        for phase in phases
+    }
+    assert changes.generations["inverters"] == 1
+    assert changes.generations["generator"] == 0
+
+    # same data reports no changes
+    await envoy.update()
+    changes = envoy.changes
+    assert changes is not None
+    assert changes.generation == 2
+    assert not changes.fields
+    assert not changes.inverters
+    assert changes.generations["inverters"] == 1
+
+    # only the changed inverter is reported
+    device_data = dict(first.raw[URL_DEVICE_DATA])
+    key, inverter = next(
+        (key, value)
+        for key, value in device_data.items()
+        if isinstance(value, dict) and value["devName"] == "pcu"
+    )
+    channel = {**inverter["channels"][0], "watts": {"now": 123, "max": 300}}
+    device_data[key] = {**inverter, "channels": [channel]}
+    override_mock(
+        mock_aioresponse,
+        "GET",
+        f"https://127.0.0.1{URL_DEVICE_DATA}",
+        status=200,
+        body=orjson.dumps(device_data),
+    )
+    await envoy.update()
+    changes = envoy.changes
+    assert changes is not None
+    assert changes.generation == 3
+    assert changes.fields == {"inverters", "raw"}
+    assert changes.inverters == {inverter["sn"]}
+    assert changes.generations["inverters"] == 3
+    assert changes.generations["system_production"] == 1
+
+
+@pytest.mark.asyncio
+async def test_data_diff_ctmeters(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify changed and removed CT meters and phases are reported."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = await get_mock_envoy(test_client_session)
+    before = envoy.data
+    assert before is not None
+    ct_type, phases = next(iter(before.ctmeters_phases.items()))
+    phase, meter = next(iter(phases.items()))
+
+    after = replace(
+        before,
+        ctmeters={
+            **before.ctmeters,
+            ct_type: replace(before.ctmeters[ct_type], active_power=-1),
+        },
+        ctmeters_phases={
+            **before.ctmeters_phases,
+            ct_type: {**phases, phase: replace(meter, active_power=-1)},
+        },
+    )
+    changes = _data_diff(before, after)
+    assert changes.fields == {"ctmeters", "ctmeters_phases"}
+    assert changes.ctmeters == {ct_type}
+    assert changes.ctmeters_phases == {(ct_type, phase)}
+
+    changes = _data_diff(before, replace(before, ctmeters={}, ctmeters_phases={}))
+    assert changes.ctmeters == set(before.ctmeters)
+    assert changes.ctmeters_phases == {
+        (ct_type, phase)
+        for ct_type, phases in before.ctmeters_phases.items()
+        for phase in phases
+    }
+    assert not changes.inverters
@@ -0,0 +1,142 @@
+"""Test circuit breakers for failing Envoy endpoints."""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from pyenphase import Envoy
+from pyenphase.circuit_breaker import CircuitState, EnvoyCircuitBreaker
+from pyenphase.const import URL_PRODUCTION_INVERTERS, SupportedFeatures
+from pyenphase.exceptions import EnvoyAuthenticationRequired, EnvoyCircuitOpen
+
+from .common import EnvoySimulator, get_simulated_envoy
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_serves_last_data(simulator: EnvoySimulator) -> None:
+    """Verify a hanging endpoint fails fast and its last data is reused."""
+    envoy = await get_simulated_envoy(
+        simulator,
+        timeout=aiohttp.ClientTimeout(total=0.2),
+        circuit_breaker_threshold=2,
+        circuit_breaker_cooldown=60,
+    )
+    # the first update reuses the responses of the probe
+    await envoy.update()
+    inverters = (await envoy.update()).inverters
+    assert inverters
+    breaker = envoy.circuit_breakers[URL_PRODUCTION_INVERTERS]
+    assert breaker.state is CircuitState.CLOSED
+
+    # the breaker opens after two timeouts, not retrying any further
+    simulator.hung_paths.add(URL_PRODUCTION_INVERTERS)
+    data = await envoy.update()
+    assert data.inverters == inverters
+    breaker = envoy.circuit_breakers[URL_PRODUCTION_INVERTERS]
+    assert breaker.state is CircuitState.OPEN
+    assert (breaker.failures, breaker.trips, breaker.rejected) == (2, 1, 1)
+    # other endpoints are not affected
+    assert all(
+        other.state is CircuitState.CLOSED
+        for endpoint, other in envoy.circuit_breakers.items()
+        if endpoint != URL_PRODUCTION_INVERTERS
+    )
+
+    # while open, the endpoint is not requested and the data ages
+    start = time.monotonic()
+    data = await envoy.update()
+    assert time.monotonic() - start < 0.2
+    assert data.inverters
+    assert envoy.data_age["inverters"] > envoy.data_age["system_production"]
+    data = await envoy.update(features=SupportedFeatures.INVERTERS)
+    assert data.inverters
+    assert envoy.circuit_breakers[URL_PRODUCTION_INVERTERS].rejected == 3
+
+    # after the cooldown a failing trial opens it again
+    envoy._circuit_breakers[URL_PRODUCTION_INVERTERS].opened_at -= 60
+    await envoy.update()
+    breaker = envoy.circuit_breakers[URL_PRODUCTION_INVERTERS]
+    assert (breaker.state, breaker.trips) == (CircuitState.OPEN, 2)
+
+    # and a successful trial closes it
+    simulator.hung_paths.clear()
+    envoy._circuit_breakers[URL_PRODUCTION_INVERTERS].opened_at -= 60
+    await envoy.update()
+    breaker = envoy.circuit_breakers[URL_PRODUCTION_INVERTERS]
+    assert (breaker.state, breaker.failures) == (CircuitState.CLOSED, 0)
+    assert envoy.data_age["inverters"] < 1
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_without_data(simulator: EnvoySimulator) -> None:
+    """Verify the typed error is raised when no data was collected before."""
+    envoy = await get_simulated_envoy(
+        simulator,
+        timeout=aiohttp.ClientTimeout(total=0.2),
+        circuit_breaker_threshold=2,
+        circuit_breaker_cooldown=60,
+    )
+    await envoy.probe()
+    simulator.hung_paths.add(URL_PRODUCTION_INVERTERS)
+    with pytest.raises(EnvoyCircuitOpen) as err:
+        await envoy.update()
+    assert err.value.endpoint == URL_PRODUCTION_INVERTERS
+    assert 0 < err.value.retry_after <= 60
+
+    # sending data is not guarded by a breaker
+    simulator.hung_paths.clear()
+    with pytest.raises(EnvoyCircuitOpen):
+        await envoy.request(URL_PRODUCTION_INVERTERS)
+    response = await envoy.request(URL_PRODUCTION_INVERTERS, data={"test": 1})
+    assert response.status == 200
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_other_errors() -> None:
+    """Verify errors not caused by the endpoint do not count as failures."""
+    envoy = Envoy("127.0.0.1", circuit_breaker_threshold=1)
+    with (
+        patch.object(
+            envoy, "_request", AsyncMock(side_effect=EnvoyAuthenticationRequired(""))
+        ),
+        pytest.raises(EnvoyAuthenticationRequired),
+    ):
+        await envoy._guarded_request("/endpoint")
+    breaker = envoy.circuit_breakers["/endpoint"]
+    assert (breaker.state, breaker.failures) == (CircuitState.CLOSED, 0)
+    await envoy.close()
+
+
+def test_circuit_breaker_trial() -> None:
+    """Verify only one trial request is let through when half open."""
+    breaker = EnvoyCircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.failure(100)
+    assert (breaker.state, breaker.failures) == (CircuitState.OPEN, 1)
+    with pytest.raises(EnvoyCircuitOpen, match="retry in 5 sec"):
+        breaker.acquire("/endpoint", 105)
+
+    breaker.acquire("/endpoint", 110)
+    assert (breaker.state, breaker.rejected) == (CircuitState.HALF_OPEN, 1)
+    with pytest.raises(EnvoyCircuitOpen, match="retry in 0 sec"):
+        breaker.acquire("/endpoint", 110)
+    # a trial that did not complete lets another through
+    breaker.release()
+    breaker.acquire("/endpoint", 111)
+    breaker.success()
+    assert breaker.state is CircuitState.CLOSED
+    assert (breaker.trips, breaker.rejected) == (1, 2)
+
+
+def test_circuit_breaker_parameters() -> None:
+    """Verify circuit breaker parameters are validated."""
+    with pytest.raises(ValueError, match="circuit_breaker_threshold can not be"):
+        Envoy("127.0.0.1", circuit_breaker_threshold=-1)
+    with pytest.raises(ValueError, match="circuit_breaker_cooldown must be"):
+        Envoy("127.0.0.1", circuit_breaker_cooldown=0)
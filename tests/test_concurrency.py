@@ -0,0 +1,490 @@
+"""Test concurrent data collection by the updaters."""
+
+import asyncio
+import logging
+import types
+from collections.abc import Generator
+from dataclasses import replace
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from pyenphase import Envoy, EnvoyData, register_updater
+from pyenphase.const import (
+    URL_ENSEMBLE_INVENTORY,
+    URL_ENSEMBLE_SECCTRL,
+    SupportedFeatures,
+)
+from pyenphase.envoy import _probe_dependencies, _update_dependencies, get_updaters
+from pyenphase.exceptions import EnvoyCommunicationError, EnvoyHTTPStatusError
+from pyenphase.updaters.base import EnvoyUpdater
+from pyenphase.updaters.ensemble import EnvoyEnembleUpdater
+
+from .common import get_mock_envoy, override_mock, prep_envoy, start_7_firmware_mock
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+
+FEATURE_FIRST = SupportedFeatures(1 << 20)
+FEATURE_SECOND = SupportedFeatures(1 << 21)
+
+
+@types.coroutine
+def _yield() -> Generator[None, None, None]:
+    """Yield control to the event loop once, asyncio.sleep is mocked in tests."""
+    yield
+
+
+def _test_updater(
+    feature: SupportedFeatures,
+    update: Any,
+    depends_on: SupportedFeatures | None = SupportedFeatures(0),
+) -> type[EnvoyUpdater]:
+    """Return an updater class providing feature using update as update method."""
+
+    class _TestUpdater(EnvoyUpdater):
+        update_depends_on = depends_on
+
+        async def probe(
+            self, discovered_features: SupportedFeatures
+        ) -> SupportedFeatures | None:
+            self._supported_features |= feature
+            return self._supported_features
+
+        async def update(self, envoy_data: EnvoyData) -> None:
+            await update(envoy_data)
+
+    return _TestUpdater
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "version",
+    [
+        "8.2.127_with_generator_running",
+        "8.3.5169_ACB_inventory",
+        "8.2.4382_ACB",
+        "7.6.185_with_cts_and_battery_3t",
+    ],
+)
+async def test_concurrent_update_matches_sequential_update(
+    version: str,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify concurrent updaters collect the same data as sequential ones."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+
+    envoy = await get_mock_envoy(test_client_session)
+    sequential = Envoy("127.0.0.1", client=test_client_session, max_concurrency=1)
+    await sequential.setup()
+    await sequential.authenticate("username", "password")
+
+    assert await sequential.update() == envoy.data
+    assert sequential._supported_features == envoy._supported_features
+    assert [type(updater) for updater in sequential._updaters] == [
+        type(updater) for updater in envoy._updaters
+    ]
+    # response counters depend on the number of updates
+    assert replace(
+        sequential._common_properties, parsed_responses=0, unchanged_responses=0
+    ) == replace(envoy._common_properties, parsed_responses=0, unchanged_responses=0)
+
+
+def test_probe_dependencies() -> None:
+    """Verify probes only wait for the probes they depend on."""
+    updaters = get_updaters()
+    names = [updater.__name__ for updater in updaters]
+    dependencies = {
+        names[index]: {names[prior] for prior in priors}
+        for index, priors in enumerate(_probe_dependencies(updaters))
+    }
+    production = {
+        "EnvoyMetersUpdater",
+        "EnvoyProductionJsonUpdater",
+        "EnvoyProductionUpdater",
+    }
+    assert dependencies == {
+        "EnvoyMetersUpdater": set(),
+        "EnvoyProductionJsonUpdater": {"EnvoyMetersUpdater"},
+        "EnvoyProductionUpdater": {"EnvoyMetersUpdater", "EnvoyProductionJsonUpdater"},
+        "EnvoyApiV1ProductionUpdater": production,
+        "EnvoyProductionJsonFallbackUpdater": production
+        | {"EnvoyApiV1ProductionUpdater"},
+        "EnvoyDeviceDataInvertersUpdater": set(),
+        "EnvoyApiV1ProductionInvertersUpdater": {"EnvoyDeviceDataInvertersUpdater"},
+        "EnvoyEnembleUpdater": set(),
+        "EnvoyInventoryUpdater": production - {"EnvoyMetersUpdater"}
+        | {"EnvoyProductionJsonFallbackUpdater"},
+        "EnvoyTariffUpdater": set(),
+        "EnvoyGeneratorUpdater": {"EnvoyEnembleUpdater"},
+    }
+
+    class _Undeclared(EnvoyUpdater):
+        """Updater not declaring probe dependencies nor provided features."""
+
+    class _Independent(EnvoyUpdater):
+        probe_depends_on = SupportedFeatures(0)
+
+    class _Dependent(EnvoyUpdater):
+        probe_depends_on = SupportedFeatures.GENERATOR
+
+    # undeclared probes wait for all prior probes, probes not declaring
+    # the features they provide may provide any feature
+    probe_updaters = [*updaters, _Undeclared, _Independent, _Dependent]
+    assert _probe_dependencies(probe_updaters)[-3:] == [
+        list(range(len(updaters))),
+        [],
+        [names.index("EnvoyGeneratorUpdater"), len(updaters), len(updaters) + 1],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_dependencies(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify only the inventory updater waits for the inverter data."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.3.5169_ACB_inventory")
+
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    await envoy.probe()
+    names = [type(updater).__name__ for updater in envoy._updaters]
+    dependencies = {
+        names[index]: [names[prior] for prior in priors]
+        for index, priors in enumerate(_update_dependencies(envoy._updaters))
+    }
+    assert dependencies["EnvoyInventoryUpdater"] == ["EnvoyDeviceDataInvertersUpdater"]
+    assert all(
+        not priors
+        for name, priors in dependencies.items()
+        if name != "EnvoyInventoryUpdater"
+    )
+
+
+@pytest.mark.asyncio
+async def test_updaters_run_concurrently(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify independent updaters run at the same time and dependencies are kept."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "7.6.175_standard")
+    second_started = asyncio.Event()
+    order: list[str] = []
+
+    async def _first(envoy_data: EnvoyData) -> None:
+        # only completes if second runs while first is waiting
+        await asyncio.wait_for(second_started.wait(), 1)
+        order.append("first")
+
+    async def _second(envoy_data: EnvoyData) -> None:
+        second_started.set()
+        order.append("second")
+
+    async def _third(envoy_data: EnvoyData) -> None:
+        order.append("third")
+
+    removers = [
+        register_updater(_test_updater(FEATURE_FIRST, _first)),
+        register_updater(_test_updater(FEATURE_SECOND, _second)),
+        register_updater(
+            _test_updater(SupportedFeatures(1 << 22), _third, FEATURE_FIRST)
+        ),
+    ]
+    try:
+        envoy = await get_mock_envoy(test_client_session)
+        assert order == ["second", "first", "third"] * 2
+
+        # undeclared dependencies wait for all prior updaters
+        order.clear()
+        removers.append(
+            register_updater(_test_updater(SupportedFeatures(1 << 23), _third, None))
+        )
+        await envoy.probe()
+        assert _update_dependencies(envoy._updaters)[-1] == list(
+            range(len(envoy._updaters) - 1)
+        )
+        await envoy.update()
+        assert order == ["second", "first", "third", "third"]
+
+        # without concurrency first waits for second forever
+        envoy._max_concurrency = 1
+        second_started.clear()
+        with pytest.raises(EnvoyCommunicationError, match="Timeout"):
+            await envoy.update()
+    finally:
+        for remove in removers:
+            remove()
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify no more updaters than max_concurrency run at the same time."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "7.6.175_standard")
+    running = peak = 0
+
+    async def _count(envoy_data: EnvoyData) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        for _ in range(3):
+            await _yield()
+        running -= 1
+
+    removers = [
+        register_updater(_test_updater(SupportedFeatures(1 << bit), _count))
+        for bit in range(20, 26)
+    ]
+    try:
+        envoy = Envoy("127.0.0.1", client=test_client_session, max_concurrency=2)
+        await envoy.setup()
+        await envoy.authenticate("username", "password")
+        await envoy.update()
+        assert peak == 2
+
+        peak = 0
+        envoy._max_concurrency = 6
+        await envoy.update()
+        assert peak == 6
+    finally:
+        for remove in removers:
+            remove()
+
+    with pytest.raises(ValueError, match="max_concurrency must be 1 or more"):
+        Envoy("127.0.0.1", max_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_failing_updater_cancels_others(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a failing updater ends the update and cancels running updaters."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "7.6.175_standard")
+    cancelled = asyncio.Event()
+    fail: Exception = EnvoyHTTPStatusError(500, "/test")
+
+    async def _wait(envoy_data: EnvoyData) -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def _fail(envoy_data: EnvoyData) -> None:
+        await _yield()
+        raise fail
+
+    removers = [
+        register_updater(_test_updater(FEATURE_FIRST, _wait)),
+        register_updater(_test_updater(FEATURE_SECOND, _fail)),
+    ]
+    try:
+        envoy = await get_mock_envoy(test_client_session, update=False)
+        with pytest.raises(EnvoyHTTPStatusError):
+            await envoy.update()
+        assert cancelled.is_set()
+
+        fail = aiohttp.ClientError("test")
+        with pytest.raises(EnvoyCommunicationError, match="aiohttp ClientError"):
+            await envoy.update()
+
+        fail = asyncio.TimeoutError("test")
+        with pytest.raises(EnvoyCommunicationError, match="Timeout"):
+            await envoy.update()
+    finally:
+        for remove in removers:
+            remove()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_keeps_statistics(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a cancelled request does not overwrite last request statistics."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "7.6.175_standard")
+    envoy = await get_mock_envoy(test_client_session)
+    stats = envoy.last_request_statistics
+    requested = asyncio.Event()
+
+    async def _hang(url: Any, **kwargs: Any) -> None:
+        requested.set()
+        await asyncio.Event().wait()
+
+    mock_aioresponse.get("https://127.0.0.1/test/hang", callback=_hang)
+    task = asyncio.create_task(envoy.request("/test/hang"))
+    await requested.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert envoy.last_request_statistics == stats
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify concurrent requests for an endpoint share one request."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "7.6.175_standard")
+    envoy = await get_mock_envoy(test_client_session)
+    assert envoy.coalesced_requests == 0
+    sent: list[str] = []
+    release = asyncio.Event()
+    result: Any = types.SimpleNamespace(status=200)
+    fail: BaseException | None = None
+
+    async def _request(endpoint: str) -> Any:
+        sent.append(endpoint)
+        await release.wait()
+        if fail:
+            raise fail
+        return result
+
+    async def _requests(count: int) -> list[asyncio.Task[Any]]:
+        tasks = [
+            asyncio.create_task(envoy._make_cached_request(_request, "/test"))
+            for _ in range(count)
+        ]
+        for _ in range(3):
+            await _yield()
+        return tasks
+
+    # all requests wait for the first one, the response is cached
+    tasks = await _requests(3)
+    release.set()
+    assert await asyncio.gather(*tasks) == [result] * 3
+    assert sent == ["/test"]
+    assert envoy.coalesced_requests == 2
+    assert await envoy._make_cached_request(_request, "/test") is result
+    assert envoy.coalesced_requests == 2
+
+    # all waiting requests get the error of the request in progress
+    envoy._endpoint_cache.clear()
+    sent.clear()
+    release.clear()
+    fail = EnvoyHTTPStatusError(500, "/test")
+    tasks = await _requests(2)
+    release.set()
+    for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        assert outcome is fail
+    assert sent == ["/test"]
+    assert envoy.coalesced_requests == 3
+    assert not envoy._pending_requests
+
+    # a cancelled waiting request does not cancel the request in progress
+    fail = None
+    sent.clear()
+    release.clear()
+    first, second = await _requests(2)
+    second.cancel()
+    release.set()
+    assert await first is result
+    with pytest.raises(asyncio.CancelledError):
+        await second
+
+    # when the request in progress is cancelled, a waiting request sends its own
+    envoy._endpoint_cache.clear()
+    sent.clear()
+    release.clear()
+    first, second = await _requests(2)
+    first.cancel()
+    for _ in range(3):
+        await _yield()
+    release.set()
+    assert await second is result
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert sent == ["/test", "/test"]
+    assert envoy.coalesced_requests == 4
+
+
+@pytest.mark.asyncio
+async def test_updater_requests_share_concurrency_limit(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify concurrent requests of an updater count against max_concurrency."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = Envoy("127.0.0.1", client=test_client_session, max_concurrency=1)
+    await envoy.setup()
+    await envoy.authenticate("username", "password")
+    await envoy.probe()
+    ensemble = next(
+        updater
+        for updater in envoy._updaters
+        if isinstance(updater, EnvoyEnembleUpdater)
+    )
+    request = envoy._request
+    running = peak = 0
+    hang: str | None = None
+    cancelled: list[str] = []
+
+    async def _count(endpoint: str, *args: Any, **kwargs: Any) -> Any:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            for _ in range(3):
+                await _yield()
+            if endpoint == hang:
+                await asyncio.Event().wait()
+            return await request(endpoint, *args, **kwargs)
+        except asyncio.CancelledError:
+            cancelled.append(endpoint)
+            raise
+        finally:
+            running -= 1
+
+    envoy._request = _count  # type: ignore[method-assign]
+    # the Ensemble endpoints are requested one by one within the limit
+    await envoy.update()
+    assert peak == 1
+
+    # and concurrently in slots not in use by other updaters
+    limit = envoy._common_properties.concurrency_limit = asyncio.Semaphore(3)
+    envoy._endpoint_cache.clear()
+    peak = 0
+    async with limit:  # the slot of the updater itself
+        await ensemble.update(EnvoyData())
+    assert peak == 3
+    assert limit._value == 3
+
+    envoy._max_concurrency = 4
+    peak = 0
+    await envoy.update()
+    assert 1 < peak <= 4
+
+    # a failing request cancels the other requests of the updater
+    hang = URL_ENSEMBLE_INVENTORY
+    override_mock(
+        mock_aioresponse,
+        "get",
+        f"https://127.0.0.1{URL_ENSEMBLE_SECCTRL}",
+        status=500,
+        repeat=True,
+    )
+    limit = envoy._common_properties.concurrency_limit = asyncio.Semaphore(3)
+    envoy._endpoint_cache.clear()
+    async with limit:
+        with pytest.raises(EnvoyHTTPStatusError):
+            await ensemble.update(EnvoyData())
+    assert URL_ENSEMBLE_INVENTORY in cancelled
+    assert running == 0
+    assert limit._value == 3
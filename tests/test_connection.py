@@ -0,0 +1,422 @@
+"""Test connection reuse and connection pool statistics."""
+
+import asyncio
+import shutil
+import ssl
+import subprocess  # nosec
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import aiohttp
+import orjson
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from awesomeversion import AwesomeVersion
+
+from pyenphase import Envoy, EnvoyFleet
+from pyenphase.auth import EnvoyLegacyAuth
+from pyenphase.connection import (
+    EnvoyConnectionStats,
+    EnvoyResponse,
+    create_connector,
+    create_trace_config,
+)
+from pyenphase.const import (
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_MAX_CONCURRENCY,
+)
+from pyenphase.exceptions import EnvoyAuthenticationRequired
+from pyenphase.ssl import (
+    NO_VERIFY_SSL_CONTEXT,
+    SessionResumingSSLContext,
+    server_port,
+)
+
+from .common import EnvoySimulator, latency
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+#: path with a response larger than the connection buffers
+LARGE_PATH = "/large"
+LARGE_SIZE = 2_000_000
+
+
+class _Server:
+    """Local stand-in for an Envoy counting its connections."""
+
+    def __init__(self) -> None:
+        self.port = 0
+        # per client address, whether the TLS session was resumed
+        self.connections: dict[tuple[str, int], bool] = {}
+        self.active = 0
+        self.max_active = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Return a small JSON response after some latency."""
+        assert request.transport is not None
+        ssl_object = request.transport.get_extra_info("ssl_object")
+        self.connections[request.transport.get_extra_info("peername")] = bool(
+            ssl_object and ssl_object.session_reused
+        )
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await latency(0.01)
+            if request.path == LARGE_PATH:
+                return web.json_response({"data": "x" * LARGE_SIZE})
+            return web.json_response({"wattsNow": 100})
+        finally:
+            self.active -= 1
+
+    async def start(self, ssl_context: ssl.SSLContext | None = None) -> web.AppRunner:
+        """Start the server on a free local port."""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        return runner
+
+
+class _HttpsLegacyAuth(EnvoyLegacyAuth):
+    """Legacy authentication using https."""
+
+    def get_endpoint_url(self, endpoint: str) -> str:
+        return f"https://{self.host}{endpoint}"
+
+
+@pytest_asyncio.fixture
+async def server() -> AsyncGenerator[_Server]:
+    """Run a local server over http."""
+    server = _Server()
+    runner = await server.start()
+    yield server
+    await runner.cleanup()
+
+
+def _envoy(server: _Server, client: aiohttp.ClientSession | None = None) -> Envoy:
+    """Return an Envoy using the local server."""
+    host = f"127.0.0.1:{server.port}"
+    envoy = Envoy(host, client=client)
+    envoy.auth = EnvoyLegacyAuth(host, "", "")
+    return envoy
+
+
+@pytest.mark.asyncio
+async def test_connection_reuse(server: _Server) -> None:
+    """Verify sequential requests reuse one connection."""
+    envoy = _envoy(server)
+    connector = envoy._client.connector
+    assert isinstance(connector, aiohttp.TCPConnector)
+    assert connector.limit_per_host == DEFAULT_CONNECTION_LIMIT_PER_HOST
+    assert connector._keepalive_timeout == DEFAULT_KEEPALIVE_TIMEOUT
+
+    for _ in range(5):
+        response = await envoy.request("/production.json")
+        assert response.status == 200
+    assert envoy.connection_stats == EnvoyConnectionStats(opened=1, reused=4)
+    assert len(server.connections) == 1
+    # a copy is returned
+    envoy.connection_stats.opened = 10
+    assert envoy.connection_stats.opened == 1
+    await envoy.close()
+
+
+def _acquired(envoy: Envoy) -> int:
+    """Return the number of connections of the Envoy checked out of the pool."""
+    connector = envoy._client.connector
+    assert isinstance(connector, aiohttp.TCPConnector)
+    return len(connector._acquired)
+
+
+@pytest.mark.asyncio
+async def test_request_releases_connection(server: _Server) -> None:
+    """Verify the connection is returned to the pool before the body is used."""
+    envoy = _envoy(server)
+    response = await envoy.request(LARGE_PATH)
+    assert _acquired(envoy) == 0
+    # the body remains available
+    assert len(await response.read()) > LARGE_SIZE
+
+    response = await envoy.request("/production.json")
+    envoy_response = await EnvoyResponse.from_response(response)
+    assert envoy_response.status == 200
+    assert envoy_response.url == response.url
+    assert envoy_response.headers["Content-Type"].startswith("application/json")
+    assert envoy_response.charset == "utf-8"
+    assert await envoy_response.read() == await response.read()
+    assert await envoy_response.text() == '{"wattsNow": 100}'
+    assert await envoy_response.json() == {"wattsNow": 100}
+    assert await envoy_response.json(loads=orjson.loads) == {"wattsNow": 100}
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_update_releases_connections(simulator: EnvoySimulator) -> None:
+    """Verify no connections remain checked out after an update."""
+    envoy = Envoy(f"127.0.0.1:{simulator.port}", configuration_refresh_interval=600)
+    await envoy.setup()
+    await envoy.authenticate()
+    for _ in range(2):
+        data = await envoy.update()
+        assert data.system_production is not None
+        assert _acquired(envoy) == 0
+    # only the read responses are kept
+    assert envoy._configuration_responses
+    assert all(
+        isinstance(response, EnvoyResponse)
+        for _, response in envoy._configuration_responses.values()
+    )
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_limit_per_host(server: _Server) -> None:
+    """Verify concurrent requests are limited to the connections per host."""
+    envoy = _envoy(server)
+    requests = 3 * DEFAULT_CONNECTION_LIMIT_PER_HOST
+    await asyncio.gather(
+        *(envoy.request(f"/endpoint/{index}") for index in range(requests))
+    )
+    assert server.max_active == DEFAULT_CONNECTION_LIMIT_PER_HOST
+    assert envoy.connection_stats == EnvoyConnectionStats(
+        opened=DEFAULT_CONNECTION_LIMIT_PER_HOST,
+        reused=requests - DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    )
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_stats_client_session(server: _Server) -> None:
+    """Verify statistics are collected only with the trace config."""
+    connector = aiohttp.TCPConnector(ssl=NO_VERIFY_SSL_CONTEXT)
+    async with aiohttp.ClientSession(connector=connector) as client:
+        envoy = _envoy(server, client)
+        await envoy.request("/production.json")
+        assert envoy.connection_stats == EnvoyConnectionStats()
+
+    other_server = _Server()
+    runner = await other_server.start()
+    connector = aiohttp.TCPConnector(ssl=NO_VERIFY_SSL_CONTEXT)
+    async with aiohttp.ClientSession(
+        connector=connector, trace_configs=[create_trace_config()]
+    ) as client:
+        # requests by other users of the session are not counted
+        for _ in range(2):
+            await client.get(f"http://127.0.0.1:{server.port}/info")
+        fleet = EnvoyFleet(client=client)
+        for port in (server.port, other_server.port):
+            envoy = fleet.add(f"127.0.0.1:{port}")
+            envoy.auth = EnvoyLegacyAuth(envoy.host, "", "")
+            await envoy.request("/production.json")
+            await envoy.request("/production.json")
+        # the first Envoy reuses the connection opened by the other request
+        assert fleet.envoys[f"127.0.0.1:{server.port}"].connection_stats == (
+            EnvoyConnectionStats(opened=0, reused=2)
+        )
+        assert fleet.connection_stats == EnvoyConnectionStats(opened=1, reused=3)
+        await fleet.close()
+    await runner.cleanup()
+
+
+@pytest.fixture
+def certificate(tmp_path: Path) -> tuple[Path, Path]:
+    """Return the files of a self-signed certificate and its key."""
+    if (openssl := shutil.which("openssl")) is None:
+        pytest.skip("openssl is required to create a certificate")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(  # nosec
+        [
+            openssl,
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=envoy.local",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def _server_ssl_context(
+    certificate: tuple[Path, Path], num_tickets: int = 2
+) -> ssl.SSLContext:
+    """Return a server SSL context, with its own session ticket keys."""
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(*certificate)
+    ssl_context.num_tickets = num_tickets
+    return ssl_context
+
+
+@pytest_asyncio.fixture
+async def tls_server(certificate: tuple[Path, Path]) -> AsyncGenerator[_Server]:
+    """Run a local server over https."""
+    server = _Server()
+    runner = await server.start(_server_ssl_context(certificate))
+    yield server
+    await runner.cleanup()
+
+
+def _tls_envoy(server: _Server) -> Envoy:
+    """Return an Envoy using the local server over https."""
+    envoy = Envoy(f"127.0.0.1:{server.port}")
+    envoy.auth = _HttpsLegacyAuth(envoy.host, "", "")
+    return envoy
+
+
+@pytest.mark.asyncio
+async def test_connection_tls_handshakes(tls_server: _Server) -> None:
+    """Verify steady state polling over https does no new TLS handshakes."""
+    envoy = _tls_envoy(tls_server)
+    for _ in range(3):
+        await envoy.request("/production.json")
+    assert envoy.connection_stats == EnvoyConnectionStats(
+        opened=1, reused=2, tls_handshakes=1
+    )
+    for _ in range(3):
+        await envoy.request("/production.json")
+    assert envoy.connection_stats.tls_handshakes == 1
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_tls_session_resumption(
+    tls_server: _Server, certificate: tuple[Path, Path]
+) -> None:
+    """Verify new connections resume the TLS session of the previous one."""
+    hits = NO_VERIFY_SSL_CONTEXT.session_stats()["hits"]
+    for _ in range(3):
+        # a new client session has no connection to reuse
+        envoy = _tls_envoy(tls_server)
+        await envoy.request("/production.json")
+        assert envoy.connection_stats.tls_handshakes == 1
+        await envoy.close()
+    # the first handshake is a full one, the others resume its session
+    assert list(tls_server.connections.values()) == [False, True, True]
+    assert NO_VERIFY_SSL_CONTEXT.session_stats()["hits"] == hits + 2
+
+    # sessions are not resumed when the server sends no TLS 1.3 session ticket
+    server = _Server()
+    runner = await server.start(_server_ssl_context(certificate, num_tickets=0))
+    for _ in range(2):
+        envoy = _tls_envoy(server)
+        await envoy.request("/production.json")
+        await envoy.close()
+    await runner.cleanup()
+    assert list(server.connections.values()) == [False, False]
+
+    # server side SSL objects do not resume sessions
+    server_context = SessionResumingSSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_side=True)
+    assert not server_context._connections
+
+
+@pytest.mark.asyncio
+async def test_tls_sessions_per_port(
+    tls_server: _Server, certificate: tuple[Path, Path]
+) -> None:
+    """Verify servers on one host keep their own TLS session."""
+    other_server = _Server()
+    runner = await other_server.start(_server_ssl_context(certificate))
+    for server in (tls_server, other_server, tls_server, other_server):
+        envoy = _tls_envoy(server)
+        await envoy.request("/production.json")
+        await envoy.close()
+    await runner.cleanup()
+    assert list(tls_server.connections.values()) == [False, True]
+    assert list(other_server.connections.values()) == [False, True]
+
+
+def test_tls_sessions_bounded() -> None:
+    """Verify sessions are kept for the most recently connected servers only."""
+    context = SessionResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT, max_servers=2)
+    for host in ("envoy-1", "envoy-2", "envoy-1", "envoy-3"):
+        context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname=host)
+    assert list(context._connections) == [("envoy-1", None), ("envoy-3", None)]
+    token = server_port.set(8443)
+    context.wrap_bio(ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname="envoy-1")
+    server_port.reset(token)
+    assert list(context._connections) == [("envoy-3", None), ("envoy-1", 8443)]
+
+    # connections set up by event loops in other threads
+    def _connect(index: int) -> None:
+        context.wrap_bio(
+            ssl.MemoryBIO(), ssl.MemoryBIO(), server_hostname=f"envoy-{index % 5}"
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_connect, range(200)))
+    assert len(context._connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_tls_sessions_configurable() -> None:
+    """Verify the number of servers to keep sessions of can be configured."""
+    connector = create_connector()
+    assert connector._ssl is NO_VERIFY_SSL_CONTEXT
+    await connector.close()
+    connector = create_connector(ssl_session_servers=1000)
+    assert isinstance(connector._ssl, SessionResumingSSLContext)
+    assert connector._ssl is not NO_VERIFY_SSL_CONTEXT
+    assert connector._ssl._max_servers == 1000
+    assert connector._ssl.verify_mode == ssl.CERT_NONE
+    await connector.close()
+
+    fleet = EnvoyFleet(ssl_session_servers=1000)
+    fleet_connector = fleet._client.connector
+    assert isinstance(fleet_connector, aiohttp.TCPConnector)
+    assert isinstance(fleet_connector._ssl, SessionResumingSSLContext)
+    assert fleet_connector._ssl._max_servers == 1000
+    await fleet.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up(tls_server: _Server) -> None:
+    """Verify warm-up opens the connections used by the next requests."""
+    envoy = _tls_envoy(tls_server)
+    await envoy.warm_up()
+    stats = envoy.connection_stats
+    assert stats.opened == stats.tls_handshakes == DEFAULT_MAX_CONCURRENCY
+    await asyncio.gather(*(envoy.request(f"/endpoint/{index}") for index in range(4)))
+    assert envoy.connection_stats.tls_handshakes == DEFAULT_MAX_CONCURRENCY
+    await envoy.warm_up(connections=1)
+    assert envoy.connection_stats.opened == DEFAULT_MAX_CONCURRENCY
+    await envoy.close()
+
+    # failures are not raised
+    envoy = Envoy("127.0.0.1:1")
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.warm_up()
+    envoy.auth = _HttpsLegacyAuth(envoy.host, "", "")
+    await envoy.warm_up()
+    assert envoy.connection_stats == EnvoyConnectionStats()
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_authenticate_warm_up(server: _Server) -> None:
+    """Verify authentication optionally warms up connections."""
+    envoy = Envoy(f"127.0.0.1:{server.port}")
+    envoy._firmware._firmware_version = AwesomeVersion("5.0.62")
+    envoy._firmware._serial_number = "123456789012"
+    await envoy.authenticate(username="envoy")
+    assert envoy.connection_stats == EnvoyConnectionStats()
+    await envoy.authenticate(username="envoy", warm_up=True)
+    assert envoy.connection_stats.opened == DEFAULT_MAX_CONCURRENCY
+    await envoy.close()
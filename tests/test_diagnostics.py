@@ -0,0 +1,117 @@
+"""Test payload logging and recording of raw Envoy responses."""
+
+import logging
+import zlib
+
+import orjson
+import pytest
+
+from pyenphase.const import PAYLOAD_LOGGER, URL_PRODUCTION, URL_PRODUCTION_INVERTERS
+from pyenphase.diagnostics import EnvoyResponseRecorder
+
+from .common import EnvoySimulator, get_simulated_envoy
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+def test_response_recorder() -> None:
+    """Verify responses are kept compressed within the limits."""
+    recorder = EnvoyResponseRecorder(max_responses=3)
+    for index in range(5):
+        recorder.record(f"/endpoint/{index}", 200, b"x" * 1000)
+    responses = recorder.responses
+    assert [response.endpoint for response in responses] == [
+        "/endpoint/2",
+        "/endpoint/3",
+        "/endpoint/4",
+    ]
+    assert responses[0].content == b"x" * 1000
+    assert responses[0].size == 1000
+    assert recorder.size == sum(len(response.compressed) for response in responses)
+    assert recorder.size < 1000
+
+    # the oldest responses are dropped beyond the size limit
+    compressed = len(zlib.compress(b"x" * 1000, 1))
+    recorder = EnvoyResponseRecorder(max_bytes=2 * compressed)
+    for index in range(3):
+        recorder.record(f"/endpoint/{index}", 200, b"x" * 1000)
+    assert [response.endpoint for response in recorder.responses] == [
+        "/endpoint/1",
+        "/endpoint/2",
+    ]
+    assert recorder.size == 2 * compressed
+
+    with pytest.raises(ValueError, match="max_responses must be 1 or more"):
+        EnvoyResponseRecorder(max_responses=0)
+    with pytest.raises(ValueError, match="max_bytes must be 1 or more"):
+        EnvoyResponseRecorder(max_bytes=0)
+
+
+@pytest.mark.asyncio
+async def test_payload_logging(
+    simulator: EnvoySimulator, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Verify payloads are only logged for the selected endpoints, truncated."""
+    envoy = await get_simulated_envoy(simulator)
+    caplog.set_level(logging.DEBUG)
+    envoy.set_payload_logging(URL_PRODUCTION, limit=10)
+
+    await envoy.request(URL_PRODUCTION)
+    await envoy.request(URL_PRODUCTION_INVERTERS)
+    await envoy.request(URL_PRODUCTION, data={"production": "x" * 100}, method="PUT")
+    payloads = [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == PAYLOAD_LOGGER
+    ]
+    content = simulator.fixtures["production"].encode()
+    sent = orjson.dumps({"production": "x" * 100})
+    assert payloads == [
+        f"Response from http://{envoy.host}{URL_PRODUCTION} status 200, "
+        f"{len(content)} bytes: {content[:10]!r}",
+        f"Data sent to http://{envoy.host}{URL_PRODUCTION}: {sent[:10]!r}",
+        f"Response from http://{envoy.host}{URL_PRODUCTION} status 200, "
+        f"{len(content)} bytes: {content[:10]!r}",
+    ]
+    # requests are logged without payloads
+    replies = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("Request reply")
+    ]
+    assert len(replies) == 3
+    assert all(reply.endswith(" bytes") for reply in replies)
+
+    caplog.clear()
+    envoy.set_payload_logging()
+    await envoy.request(URL_PRODUCTION)
+    assert not [record for record in caplog.records if record.name == PAYLOAD_LOGGER]
+    with pytest.raises(ValueError, match="limit can not be negative"):
+        envoy.set_payload_logging(URL_PRODUCTION, limit=-1)
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_response_recording(simulator: EnvoySimulator) -> None:
+    """Verify the recent raw responses of an Envoy are recorded."""
+    envoy = await get_simulated_envoy(simulator)
+    assert envoy.recorded_responses == []
+
+    envoy.set_response_recorder(EnvoyResponseRecorder(max_responses=2))
+    await envoy.request(URL_PRODUCTION)
+    await envoy.request(URL_PRODUCTION_INVERTERS)
+    await envoy.request("/missing")
+    responses = envoy.recorded_responses
+    assert [(response.endpoint, response.status) for response in responses] == [
+        (URL_PRODUCTION_INVERTERS, 200),
+        ("/missing", 404),
+    ]
+    assert (
+        responses[0].content
+        == simulator.fixtures["api_v1_production_inverters"].encode()
+    )
+
+    envoy.set_response_recorder(None)
+    assert envoy.recorded_responses == []
+    await envoy.close()
@@ -1102,3 +1102,52 @@ async def test_with_7_x_firmware(
         )
     else:
         assert data.c6cc is None
+
+
+@pytest.mark.asyncio
+async def test_failed_storage_settings_write_keeps_envoy_state(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a failed tariff write does not change the data of later updates."""
+    version = "8.2.127_with_3cts_and_battery_split"
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    envoy = await get_mock_envoy(test_client_session)
+    full_host = endpoint_path(version, envoy.host)
+    assert envoy.data is not None
+    assert envoy.data.tariff is not None
+    tariff = envoy.data.tariff
+    assert tariff.storage_settings is not None
+    reserved_soc = tariff.storage_settings.reserved_soc
+    charge_from_grid = tariff.storage_settings.charge_from_grid
+    mode = tariff.storage_settings.mode
+    assert reserved_soc != 50
+    assert mode != EnvoyStorageMode.BACKUP
+
+    override_mock(
+        mock_aioresponse, "put", f"{full_host}{URL_TARIFF}", status=500, repeat=True
+    )
+    with pytest.raises(EnvoyError):
+        await envoy.set_reserve_soc(50)
+    with pytest.raises(EnvoyError):
+        await envoy.set_storage_mode(EnvoyStorageMode.BACKUP)
+    with pytest.raises(EnvoyError):
+        await envoy.enable_charge_from_grid()
+    with pytest.raises(EnvoyError):
+        await envoy.disable_charge_from_grid()
+    _cnt, request_data = latest_request(mock_aioresponse, "PUT", URL_TARIFF)
+    assert (
+        orjson.loads(request_data)["tariff"]["storage_settings"]["charge_from_grid"]
+        is False
+    )
+    assert envoy.data.tariff is tariff
+
+    # the Envoy still reports the same tariff, the data reused for it
+    # holds the values the Envoy reported, not the ones sent
+    data = await envoy.update()
+    assert data.tariff is tariff
+    assert data.tariff.storage_settings is not None
+    assert data.tariff.storage_settings.reserved_soc == reserved_soc
+    assert data.tariff.storage_settings.mode == mode
+    assert data.tariff.storage_settings.charge_from_grid is charge_from_grid
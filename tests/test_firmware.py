@@ -7,6 +7,7 @@ import pytest
 from aioresponses import aioresponses
 
 from pyenphase import Envoy
+from pyenphase.const import DEFAULT_PAYLOAD_LOG_LIMIT, PAYLOAD_LOGGER, URL_INFO
 from pyenphase.exceptions import EnvoyFirmwareCheckError
 
 LOGGER = logging.getLogger(__name__)
@@ -35,6 +36,48 @@ async def test_firmware_with_7_6_175_standard(
     assert envoy.part_number == "800-12345-r99"
 
 
+@pytest.mark.asyncio
+async def test_firmware_payload_logging(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the info document is only logged on the payload logger, truncated."""
+    info = (
+        "<?xml version='1.0' encoding='UTF-8'?>"
+        "<envoy_info>"
+        "  <device>"
+        "    <sn>123456789012</sn>"
+        "    <software>D7.8.901</software>"
+        "  </device>"
+        f"  <padding>{'x' * DEFAULT_PAYLOAD_LOG_LIMIT}</padding>"
+        "</envoy_info>"
+    )
+    mock_aioresponse.get("https://127.0.0.1/info", status=200, body=info, repeat=True)
+    # debug logging of pyenphase does not log payloads without opting in
+    caplog.set_level(logging.DEBUG, logger="pyenphase")
+    envoy = Envoy("127.0.0.1", client=test_client_session)
+    await envoy.setup()
+    assert f"status 200: {len(info)} bytes" in caplog.text
+    assert "envoy_info" not in caplog.text
+
+    envoy.set_payload_logging(URL_INFO)
+    await envoy.setup()
+    payloads = [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == PAYLOAD_LOGGER
+    ]
+    assert len(payloads) == 1
+    assert "<sn>123456789012</sn>" in payloads[0]
+    assert "</envoy_info>" not in payloads[0]
+
+    caplog.clear()
+    envoy.set_payload_logging()
+    await envoy.setup()
+    assert "envoy_info" not in caplog.text
+
+
 @pytest.mark.asyncio
 async def test_firmware_no_sn_with_7_6_175_standard(
     mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
@@ -0,0 +1,273 @@
+"""Test polling many Envoys with a fleet."""
+
+import asyncio
+import logging
+import socket
+from collections import Counter
+from collections.abc import AsyncGenerator
+from typing import Any
+from unittest.mock import AsyncMock
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from pyenphase import EnvoyData, EnvoyFleet, EnvoyFleetResult
+from pyenphase.exceptions import (
+    EnvoyAuthenticationRequired,
+    EnvoyFirmwareFatalCheckError,
+)
+from pyenphase.ssl import NO_VERIFY_SSL_CONTEXT
+
+from .common import HUNG_HOST, EnvoySimulator, latency
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+
+#: host that can not be resolved
+MISSING_HOST = "missing.local"
+
+
+class EnvoySimulatorResolver(AbstractResolver):
+    """Resolve all hosts to the local simulator."""
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        if host == MISSING_HOST:
+            raise OSError(f"Unknown host {host}")
+        return [
+            {
+                "hostname": host,
+                "host": "127.0.0.1",
+                "port": port,
+                "family": socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+
+@pytest_asyncio.fixture
+async def fleet_session() -> AsyncGenerator[aiohttp.ClientSession]:
+    """Return a client session resolving all hosts to the simulator."""
+    connector = aiohttp.TCPConnector(
+        ssl=NO_VERIFY_SSL_CONTEXT, resolver=EnvoySimulatorResolver()
+    )
+    session = aiohttp.ClientSession(connector=connector)
+    yield session
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_fleet_update(
+    simulator: EnvoySimulator, fleet_session: aiohttp.ClientSession
+) -> None:
+    """Verify data is collected from many Envoys with failures isolated."""
+    count = 50
+    fleet = EnvoyFleet(client=fleet_session, max_concurrency=8, timeout=1)
+    hosts = [f"envoy-{index}.local:{simulator.port}" for index in range(count)]
+    hung = f"{HUNG_HOST}:{simulator.port}"
+    missing = f"{MISSING_HOST}:{simulator.port}"
+    for host in [hung, *hosts, missing]:
+        fleet.add(host)
+    with pytest.raises(ValueError, match="already in the fleet"):
+        fleet.add(hung)
+    assert all(envoy._client is fleet_session for envoy in fleet.envoys.values())
+
+    results = [result async for result in fleet.update()]
+    LOGGER.info(
+        "Collected data from %s Envoys, slowest %.3f sec",
+        count,
+        max(result.elapsed for result in results if result.data),
+    )
+    assert len(results) == count + 2
+    errors = {result.host: result.error for result in results if result.error}
+    assert set(errors) == {hung, missing}
+    assert isinstance(errors[missing], EnvoyFirmwareFatalCheckError)
+    # the hung Envoy does not hold up the others
+    assert isinstance(errors[hung], TimeoutError)
+    assert all(result.elapsed < 1 for result in results if result.host != hung)
+
+    data = [result.data for result in results if result.data]
+    assert len(data) == count
+    assert data[0] is not None
+    assert data[0].system_production is not None
+    assert all(item == data[0] for item in data)
+    assert simulator.max_active_hosts <= 8
+    requests = simulator.requests["envoy-0.local"]
+
+    # set up Envoys only update next time
+    results = [result async for result in fleet.update(hosts[:2])]
+    assert {result.host for result in results if result.data} == set(hosts[:2])
+    assert simulator.requests["envoy-0.local"] < 2 * requests
+
+    await fleet.remove(missing)
+    assert missing not in fleet.envoys
+    await fleet.close()
+    assert not fleet_session.closed
+
+
+@pytest.mark.asyncio
+async def test_fleet_authentication_retried(
+    simulator: EnvoySimulator,
+    fleet_session: aiohttp.ClientSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verify an Envoy is authenticated again after authentication failed."""
+    fleet = EnvoyFleet(client=fleet_session)
+    envoy = fleet.add(f"envoy-0.local:{simulator.port}")
+    authenticate = envoy.authenticate
+    update = envoy.update
+    attempts = 0
+    session_ended = False
+
+    async def _authenticate(**kwargs: Any) -> None:
+        nonlocal attempts
+        attempts += 1
+        # authentication is set before the failure, as for a rejected token
+        await authenticate(**kwargs)
+        if attempts == 1:
+            raise EnvoyAuthenticationRequired("Token rejected")
+
+    async def _update() -> EnvoyData:
+        nonlocal session_ended
+        if session_ended:
+            session_ended = False
+            raise EnvoyAuthenticationRequired("Session ended")
+        return await update()
+
+    monkeypatch.setattr(envoy, "authenticate", _authenticate)
+    monkeypatch.setattr(envoy, "update", _update)
+    results = [result async for result in fleet.update()]
+    assert isinstance(results[0].error, EnvoyAuthenticationRequired)
+    assert envoy.auth is not None
+
+    for _ in range(2):
+        results = [result async for result in fleet.update()]
+        assert results[0].data is not None
+    assert attempts == 2
+
+    # authentication no longer accepted by the Envoy is repeated next time
+    session_ended = True
+    results = [result async for result in fleet.update()]
+    assert isinstance(results[0].error, EnvoyAuthenticationRequired)
+    results = [result async for result in fleet.update()]
+    assert results[0].data is not None
+    assert attempts == 3
+    await fleet.close()
+
+
+@pytest.mark.asyncio
+async def test_fleet_closes_envoys(
+    simulator: EnvoySimulator,
+    fleet_session: aiohttp.ClientSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verify Envoys are authenticated as added and closed with the fleet."""
+    fleet = EnvoyFleet(client=fleet_session, timeout=0.2)
+    hosts = [f"envoy-{index}.local:{simulator.port}" for index in range(2)]
+    hung = f"{HUNG_HOST}:{simulator.port}"
+    authenticates: dict[str, AsyncMock] = {}
+    closes: dict[str, AsyncMock] = {}
+    for host in [*hosts, hung]:
+        envoy = fleet.add(host, username="envoy", token_refresh_margin=60)
+        authenticates[host] = AsyncMock(wraps=envoy.authenticate)
+        closes[host] = AsyncMock(wraps=envoy.close)
+        monkeypatch.setattr(envoy, "authenticate", authenticates[host])
+        monkeypatch.setattr(envoy, "close", closes[host])
+
+    results = [result async for result in fleet.update(hosts)]
+    assert all(result.data for result in results)
+    authenticates[hosts[0]].assert_awaited_once_with(
+        username="envoy",
+        password=None,
+        token=None,
+        warm_up=False,
+        token_refresh_margin=60,
+    )
+    await fleet.remove(hosts[0])
+    closes[hosts[0]].assert_awaited_once()
+
+    # an Envoy removed while collecting data is closed again afterwards
+    async def collect_hung() -> EnvoyFleetResult:
+        return await anext(fleet.update([hung]))
+
+    collect = asyncio.create_task(collect_hung())
+    await latency(0.05)
+    await fleet.remove(hung)
+    result = await collect
+    assert isinstance(result.error, TimeoutError)
+    assert closes[hung].await_count == 2
+
+    # closing the fleet closes its Envoys, which authenticate again next time
+    await fleet.close()
+    closes[hosts[1]].assert_awaited_once()
+    results = [result async for result in fleet.update()]
+    assert results[0].data is not None
+    assert authenticates[hosts[1]].await_count == 2
+    await fleet.close()
+
+
+@pytest.mark.asyncio
+async def test_fleet_poll(
+    simulator: EnvoySimulator, fleet_session: aiohttp.ClientSession
+) -> None:
+    """Verify Envoys are polled on their own jittered schedule."""
+    fleet = EnvoyFleet(client=fleet_session)
+    hosts = [f"envoy-{index}.local:{simulator.port}" for index in range(3)]
+    for host in hosts:
+        fleet.add(host)
+
+    polled: Counter[str] = Counter()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        async for result in fleet.poll(interval=10, jitter=0.2):
+            assert result.data is not None
+            polled[result.host] += 1
+            if polled.total() == 9:
+                break
+        delays: list[float] = [call.args[0] for call in sleep.await_args_list]
+    assert set(polled) == set(hosts)
+    # first polls spread over the interval, later ones varied by the jitter
+    assert all(0 <= delay <= 12 for delay in delays)
+    assert len(set(delays)) > 1
+
+    # Envoys removed while polling are no longer polled
+    polled_hosts: list[str] = []
+    async for result in fleet.poll(interval=10):
+        if not polled_hosts:
+            await fleet.remove(hosts[0])
+            await fleet.remove(hosts[1])
+        polled_hosts.append(result.host)
+        if len(polled_hosts) == 12:
+            break
+    # results collected before the removal are still returned
+    assert set(polled_hosts[-6:]) == {hosts[2]}
+
+
+@pytest.mark.asyncio
+async def test_fleet_parameters() -> None:
+    """Verify fleet parameters are validated and its own session is closed."""
+    with pytest.raises(ValueError, match="max_concurrency must be 1 or more"):
+        EnvoyFleet(max_concurrency=0)
+    with pytest.raises(ValueError, match="timeout must be positive"):
+        EnvoyFleet(timeout=0)
+
+    fleet = EnvoyFleet()
+    envoy = fleet.add("127.0.0.1")
+    kwargs: dict[str, Any] = {"interval": 0}
+    with pytest.raises(ValueError, match="interval must be positive"):
+        await anext(fleet.poll(**kwargs))
+    with pytest.raises(ValueError, match="jitter must be 0 or more"):
+        await anext(fleet.poll(interval=1, jitter=1))
+    await fleet.close()
+    assert envoy._client.closed
+    await fleet.close()
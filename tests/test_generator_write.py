@@ -16,7 +16,11 @@ from pyenphase.const import (
     URL_GENERATOR,
 )
 from pyenphase.envoy import SupportedFeatures
-from pyenphase.exceptions import EnvoyCommunicationError, EnvoyFeatureNotAvailable
+from pyenphase.exceptions import (
+    EnvoyCommunicationError,
+    EnvoyFeatureNotAvailable,
+    EnvoyHTTPStatusError,
+)
 
 from .common import (
     endpoint_path,
@@ -277,6 +281,33 @@ async def test_set_generator_charge_from_generator(
         await bad_envoy.set_generator_charge_from_generator(False)
 
 
+@pytest.mark.asyncio
+async def test_failed_generator_config_write_keeps_envoy_state(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a failed configuration write does not change later updates."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", VERSION)
+    envoy = await get_mock_envoy(test_client_session)
+    assert envoy.data is not None
+    config = envoy.data.generator_config
+    assert config is not None
+    assert config.charge_from_generator is True
+    full_host = endpoint_path(VERSION, envoy.host)
+
+    mock_aioresponse.post(f"{full_host}{URL_GEN_CONFIG}", status=500)
+    with pytest.raises(EnvoyHTTPStatusError):
+        await envoy.set_generator_charge_from_generator(False)
+    assert envoy.data.generator_config is config
+
+    # the configuration reused for the unchanged response is the one the
+    # Envoy reported, not the one sent
+    data = await envoy.update()
+    assert data.generator_config is config
+    assert config.charge_from_generator is True
+
+
 @pytest.mark.asyncio
 async def test_generator_write_actions_without_generator(
     caplog: pytest.LogCaptureFixture,
@@ -0,0 +1,117 @@
+"""Test the columnar inverter table."""
+
+import math
+from array import array
+from dataclasses import astuple
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from pyenphase import EnvoyInverter, EnvoyInverterTable
+from pyenphase.models import inverter_table
+
+from .common import (
+    _fixtures_dir,
+    get_mock_envoy,
+    load_json_fixture,
+    load_json_list_fixture,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+@pytest.mark.parametrize(
+    "version",
+    sorted(
+        path.name
+        for path in _fixtures_dir().iterdir()
+        # 3.7.0 only offers scraped production pages, which are not supported
+        if path.is_dir()
+        and path.name != "3.7.0"
+        and not path.name.endswith("_bad_auth")
+    ),
+)
+@pytest.mark.asyncio
+async def test_inverter_table(
+    version: str,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify the table holds the same inverter data as EnvoyData.inverters."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    envoy = await get_mock_envoy(test_client_session)
+    assert envoy.data is not None
+    inverters = envoy.data.inverters
+    table = envoy.inverter_table
+    assert table is None
+
+    envoy.set_inverter_table(True)
+    data = await envoy.update()
+    table = envoy.inverter_table
+    if not inverters:
+        assert table is None
+        return
+    assert table is not None
+    assert data.inverters == {}
+    assert len(table) == len(inverters)
+    assert table.inverters == inverters
+    # the values keep their types, not only compare equal
+    assert [
+        list(map(type, astuple(inverter))) for inverter in table.inverters.values()
+    ] == [list(map(type, astuple(inverter))) for inverter in inverters.values()]
+    # the dict is built once and the table reused for unchanged responses
+    assert table.inverters is table.inverters
+    await envoy.update()
+    assert envoy.inverter_table is table
+
+    envoy.set_inverter_table(False)
+    assert (await envoy.update()).inverters == inverters
+    assert envoy.inverter_table is None
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+@pytest.mark.asyncio
+async def test_inverter_table_columns(
+    numpy: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify columns hold the inverter values, NaN for missing values."""
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(inverter_table, "numpy", None)
+    version = "8.2.4345_with_device_data"
+    device_data = await load_json_fixture(version, "ivp_pdm_device_data")
+    serial, device = next(
+        (device["sn"], device)
+        for device in device_data.values()
+        if isinstance(device, dict) and device["devName"] == "pcu"
+    )
+    del device["channels"][0]["lastReading"]["channelTemp"]
+    table = EnvoyInverterTable.from_device_data([device])
+    assert isinstance(table.temperature, array) != numpy
+    inverter = EnvoyInverter.from_device_data(device)
+    assert inverter.temperature is None
+    assert table.serial_numbers == [serial]
+    assert table.index == {serial: 0}
+    assert table.last_report_watts[0] == inverter.last_report_watts
+    assert table.dc_voltage[0] == inverter.dc_voltage
+    assert math.isnan(table.temperature[0])
+    assert table.inverters == {serial: inverter}
+
+    v1_inverters = await load_json_list_fixture(version, "api_v1_production_inverters")
+    table = EnvoyInverterTable.from_v1_api(v1_inverters)
+    assert len(table) == len(v1_inverters)
+    assert all(math.isnan(value) for value in table.ac_voltage)
+    assert table.inverters == {
+        data["serialNumber"]: EnvoyInverter.from_v1_api(data) for data in v1_inverters
+    }
+
+    table = EnvoyInverterTable.from_v1_api([])
+    assert len(table) == 0
+    assert len(table.energy_today) == 0
+    assert table.inverters == {}
@@ -0,0 +1,139 @@
+"""Test digest authentication round trips with a legacy Envoy."""
+
+import hashlib
+import re
+import secrets
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from pyenphase import Envoy
+from pyenphase.auth import EnvoyLegacyAuth
+from pyenphase.exceptions import EnvoyAuthenticationRequired
+
+#: realm used by Envoy firmware before 7
+REALM = "enphaseenergy.com"
+USERNAME = "installer"
+PASSWORD = "secret"
+
+
+def _md5(*parts: str) -> str:
+    """Return the hex MD5 digest of the colon separated parts."""
+    return hashlib.md5(":".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+class _DigestServer:
+    """Local stand-in for a legacy Envoy requiring digest authentication."""
+
+    def __init__(self) -> None:
+        self.port = 0
+        self.requests = 0
+        self.challenges = 0
+        # last nonce count used per valid nonce
+        self.nonces: dict[str, int] = {}
+        self.stale: set[str] = set()
+
+    def expire_nonces(self) -> None:
+        """Make the issued nonces stale."""
+        self.stale.update(self.nonces)
+        self.nonces.clear()
+
+    def _challenge(self, stale: bool = False) -> web.Response:
+        """Return a 401 response with a new nonce."""
+        self.challenges += 1
+        nonce = secrets.token_hex(16)
+        self.nonces[nonce] = 0
+        challenge = f'Digest realm="{REALM}", nonce="{nonce}", qop="auth"'
+        if stale:
+            challenge += ", stale=true"
+        return web.Response(status=401, headers={"WWW-Authenticate": challenge})
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Serve the request if the digest authorization is valid."""
+        self.requests += 1
+        header = request.headers.get("Authorization", "")
+        if not header.startswith("Digest "):
+            return self._challenge()
+        fields = {
+            key: quoted or plain
+            for key, quoted, plain in re.findall(
+                r'(\w+)=(?:"([^"]*)"|([^,\s]*))', header
+            )
+        }
+        nonce = fields["nonce"]
+        if nonce in self.stale:
+            return self._challenge(stale=True)
+        expected = _md5(
+            _md5(USERNAME, REALM, PASSWORD),
+            nonce,
+            fields["nc"],
+            fields["cnonce"],
+            fields["qop"],
+            _md5(request.method, fields["uri"]),
+        )
+        nonce_count = int(fields["nc"], 16)
+        if (
+            fields["username"] != USERNAME
+            or fields["response"] != expected
+            or nonce_count <= self.nonces.get(nonce, nonce_count)
+        ):
+            return self._challenge()
+        self.nonces[nonce] = nonce_count
+        return web.json_response({"wattsNow": 100})
+
+
+@pytest_asyncio.fixture
+async def digest_server() -> AsyncGenerator[_DigestServer]:
+    """Run a local digest protected server."""
+    server = _DigestServer()
+    app = web.Application()
+    app.router.add_get("/{path:.*}", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    server.port = runner.addresses[0][1]
+    yield server
+    await runner.cleanup()
+
+
+def _envoy(server: _DigestServer, password: str = PASSWORD) -> Envoy:
+    """Return an Envoy using legacy authentication with the local server."""
+    envoy = Envoy(f"127.0.0.1:{server.port}")
+    envoy.auth = EnvoyLegacyAuth(envoy.host, USERNAME, password)
+    return envoy
+
+
+@pytest.mark.asyncio
+async def test_digest_nonce_reuse(digest_server: _DigestServer) -> None:
+    """Verify steady state requests need one round trip each."""
+    envoy = _envoy(digest_server)
+    for _ in range(5):
+        response = await envoy.request("/api/v1/production")
+        assert response.status == 200
+    # only the first request is challenged
+    assert digest_server.challenges == 1
+    assert digest_server.requests == 6
+    assert list(digest_server.nonces.values()) == [5]
+
+    # a stale nonce is challenged once more
+    digest_server.expire_nonces()
+    for _ in range(3):
+        response = await envoy.request("/api/v1/production")
+        assert response.status == 200
+    assert digest_server.challenges == 2
+    assert digest_server.requests == 10
+    assert list(digest_server.nonces.values()) == [3]
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_digest_invalid_password(digest_server: _DigestServer) -> None:
+    """Verify invalid credentials still fail authentication."""
+    envoy = _envoy(digest_server, "wrong")
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.request("/api/v1/production")
+    assert digest_server.requests == 2
+    await envoy.close()
@@ -0,0 +1,156 @@
+"""Test the metrics registry and Prometheus exporter."""
+
+from typing import Any
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from pyenphase import Envoy
+from pyenphase.const import URL_PRODUCTION, URL_PRODUCTION_INVERTERS
+from pyenphase.metrics import (
+    BUILD_DURATION,
+    PARSE_DURATION,
+    REQUEST_ATTEMPTS,
+    REQUEST_DURATION,
+    REQUEST_ERRORS,
+    RESPONSE_SIZE,
+    RESPONSES,
+    EnvoyHistogram,
+    EnvoyMetrics,
+    render_prometheus,
+)
+
+from .common import (
+    EnvoySimulator,
+    get_simulated_envoy,
+    latency,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+def test_histogram() -> None:
+    """Verify values are counted in the bucket of their upper bound."""
+    histogram = EnvoyHistogram((1, 2))
+    for value in (0.5, 1, 1.5, 3):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert (histogram.count, histogram.sum) == (4, 6.0)
+
+
+def test_render_prometheus() -> None:
+    """Verify metrics are rendered in the Prometheus text format."""
+    metrics = EnvoyMetrics(latency_buckets=(0.1, 1), size_buckets=(1000,))
+    assert render_prometheus(metrics) == ""
+
+    metrics.observe_response("envoy.local", "/production", 200, 0.0625, 2000)
+    metrics.observe_response("envoy.local", "/production", 200, 0.5, 500)
+    metrics.observe_response("envoy.local", "/production", 401, 0.0625, 0)
+    metrics.observe_error("envoy.local", '/odd"path', TimeoutError())
+    assert render_prometheus(metrics) == (
+        "# HELP pyenphase_request_duration_seconds Duration of HTTP requests to the Envoy\n"
+        "# TYPE pyenphase_request_duration_seconds histogram\n"
+        'pyenphase_request_duration_seconds_bucket{host="envoy.local",endpoint="/production",le="0.1"} 2\n'
+        'pyenphase_request_duration_seconds_bucket{host="envoy.local",endpoint="/production",le="1.0"} 3\n'
+        'pyenphase_request_duration_seconds_bucket{host="envoy.local",endpoint="/production",le="+Inf"} 3\n'
+        'pyenphase_request_duration_seconds_sum{host="envoy.local",endpoint="/production"} 0.625\n'
+        'pyenphase_request_duration_seconds_count{host="envoy.local",endpoint="/production"} 3\n'
+        "# HELP pyenphase_response_size_bytes Size of Envoy response bodies\n"
+        "# TYPE pyenphase_response_size_bytes histogram\n"
+        'pyenphase_response_size_bytes_bucket{host="envoy.local",endpoint="/production",le="1000.0"} 2\n'
+        'pyenphase_response_size_bytes_bucket{host="envoy.local",endpoint="/production",le="+Inf"} 3\n'
+        'pyenphase_response_size_bytes_sum{host="envoy.local",endpoint="/production"} 2500.0\n'
+        'pyenphase_response_size_bytes_count{host="envoy.local",endpoint="/production"} 3\n'
+        "# HELP pyenphase_responses_total Envoy responses by HTTP status\n"
+        "# TYPE pyenphase_responses_total counter\n"
+        'pyenphase_responses_total{host="envoy.local",endpoint="/production",status="200"} 2\n'
+        'pyenphase_responses_total{host="envoy.local",endpoint="/production",status="401"} 1\n'
+        "# HELP pyenphase_request_errors_total Envoy requests failed without response\n"
+        "# TYPE pyenphase_request_errors_total counter\n"
+        'pyenphase_request_errors_total{host="envoy.local",endpoint="/odd\\"path",error="TimeoutError"} 1\n'
+    )
+
+
+@pytest.mark.asyncio
+async def test_envoy_metrics(simulator: EnvoySimulator) -> None:
+    """Verify requests, parsing and model building of an Envoy are recorded."""
+    metrics = EnvoyMetrics()
+    host = f"127.0.0.1:{simulator.port}"
+    envoy = await get_simulated_envoy(
+        simulator, timeout=aiohttp.ClientTimeout(total=0.2), metrics=metrics
+    )
+    assert envoy.metrics is metrics
+    # the first update reuses the responses of the probe
+    await envoy.update()
+    await envoy.update()
+
+    durations = metrics.histograms[REQUEST_DURATION]
+    assert durations[(host, URL_PRODUCTION_INVERTERS)].count == 2
+    sizes = metrics.histograms[RESPONSE_SIZE]
+    assert sizes[(host, URL_PRODUCTION_INVERTERS)].sum > 0
+    assert metrics.counters[RESPONSES][(host, URL_PRODUCTION_INVERTERS, "200")] == 2
+    assert metrics.histograms[REQUEST_ATTEMPTS][(host, URL_PRODUCTION_INVERTERS)].count
+    # parsed once, the second response has the same body
+    parsed = metrics.histograms[PARSE_DURATION][(host, URL_PRODUCTION_INVERTERS)]
+    assert parsed.count == 1
+    builds = metrics.histograms[BUILD_DURATION]
+    assert builds[(host, "EnvoyApiV1ProductionInvertersUpdater")].count == 2
+
+    # data sent and failed requests are recorded as well
+    await envoy.request("/missing", data={"tariff": {}}, method="PUT")
+    assert metrics.counters[RESPONSES][(host, "/missing", "404")] == 1
+    envoy.set_retry_policy(max_attempts=1)
+    simulator.hung_paths.add(URL_PRODUCTION)
+    with pytest.raises(TimeoutError):
+        await envoy.request(URL_PRODUCTION)
+    assert metrics.counters[REQUEST_ERRORS] == {
+        (host, URL_PRODUCTION, "TimeoutError"): 1
+    }
+    assert f'endpoint="{URL_PRODUCTION_INVERTERS}"' in render_prometheus(metrics)
+    await envoy.close()
+
+
+class _BuildRecorder(EnvoyMetrics):
+    """Metrics registry keeping each recorded build time."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.builds: list[tuple[str, float]] = []
+
+    def observe_build(self, host: str, updater: str, duration: float) -> None:
+        super().observe_build(host, updater, duration)
+        self.builds.append((updater, duration))
+
+
+@pytest.mark.asyncio
+async def test_build_time_with_concurrent_requests(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify concurrent requests of an updater do not make build times negative."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(
+        mock_aioresponse, "127.0.0.1", "8.2.127_with_3cts_and_battery_split"
+    )
+    metrics = _BuildRecorder()
+    envoy = Envoy("127.0.0.1", client=test_client_session, metrics=metrics)
+    await envoy.setup()
+    await envoy.authenticate("username", "password")
+    await envoy.probe()
+    request = envoy._request
+
+    async def _slow_request(endpoint: str, *args: Any, **kwargs: Any) -> Any:
+        await latency(0.02)
+        return await request(endpoint, *args, **kwargs)
+
+    envoy._request = _slow_request  # type: ignore[method-assign]
+    await envoy.update()
+
+    builds = dict(metrics.builds)
+    # the Ensemble updater requests its endpoints concurrently
+    assert "EnvoyEnembleUpdater" in builds
+    assert all(duration >= 0 for duration in builds.values()), builds
@@ -0,0 +1,165 @@
+"""Test retention of response data in EnvoyData.raw."""
+
+import aiohttp
+import orjson
+import pytest
+from aioresponses import aioresponses
+
+from pyenphase import EnvoyCompactRaw
+from pyenphase.const import (
+    URL_GEN_CONFIG,
+    URL_INVENTORY,
+    URL_PRODUCTION_INVERTERS,
+    RawRetention,
+    SupportedFeatures,
+)
+
+from .common import (
+    EnvoySimulator,
+    endpoint_path,
+    get_mock_envoy,
+    get_simulated_envoy,
+    load_json_fixture,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+@pytest.mark.asyncio
+async def test_raw_retention(simulator: EnvoySimulator) -> None:
+    """Verify response data is kept parsed, compact, for some endpoints or not."""
+    envoy = await get_simulated_envoy(simulator)
+    parsed = (await envoy.update()).raw
+    assert isinstance(parsed[URL_PRODUCTION_INVERTERS], list)
+
+    envoy.set_raw_retention(RawRetention.COMPACT)
+    compact = (await envoy.update()).raw
+    assert compact.keys() == parsed.keys()
+    inverters = compact[URL_PRODUCTION_INVERTERS]
+    assert isinstance(inverters, EnvoyCompactRaw)
+    assert inverters.json == parsed[URL_PRODUCTION_INVERTERS]
+    assert len(inverters.content) < len(
+        simulator.fixtures["api_v1_production_inverters"]
+    )
+    # unchanged responses keep the same raw data
+    assert (await envoy.update()).raw[URL_PRODUCTION_INVERTERS] is inverters
+    assert envoy.changes is not None
+    assert "raw" not in envoy.changes.fields
+
+    envoy.set_raw_retention(RawRetention.PARSED, endpoints=[URL_PRODUCTION_INVERTERS])
+    assert (await envoy.update()).raw == {
+        URL_PRODUCTION_INVERTERS: parsed[URL_PRODUCTION_INVERTERS]
+    }
+
+    envoy.set_raw_retention(RawRetention.NONE)
+    assert (await envoy.update()).raw == {}
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_raw_retention_keeps_no_parsed_content(simulator: EnvoySimulator) -> None:
+    """Verify updaters keep no parsed content not retained and still reuse models."""
+    envoy = await get_simulated_envoy(simulator)
+    envoy.set_raw_retention(RawRetention.COMPACT)
+    inverters = (await envoy.update()).inverters
+    assert inverters
+    data = await envoy.update()
+    assert all(
+        json_data is None
+        for updater in envoy._updaters
+        for _, _, json_data in updater._json_cache.values()
+    )
+    # models extracted from unchanged responses are reused
+    assert all(data.inverters[serial] is inverters[serial] for serial in inverters)
+
+    envoy.set_raw_retention(RawRetention.PARSED, endpoints=[URL_PRODUCTION_INVERTERS])
+    data = await envoy.update()
+    assert {
+        endpoint
+        for updater in envoy._updaters
+        for endpoint, (_, _, json_data) in updater._json_cache.items()
+        if json_data is not None
+    } == {URL_PRODUCTION_INVERTERS}
+    assert all(data.inverters[serial] is inverters[serial] for serial in inverters)
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_raw_retention_partial_update(simulator: EnvoySimulator) -> None:
+    """Verify partial updates retain the data collected before as set now."""
+    envoy = await get_simulated_envoy(simulator)
+    envoy.set_raw_retention(RawRetention.COMPACT, endpoints=[URL_PRODUCTION_INVERTERS])
+    data = await envoy.update()
+    assert list(data.raw) == [URL_PRODUCTION_INVERTERS]
+
+    # data of endpoints not updated is retained as set now as well
+    envoy.set_raw_retention(RawRetention.COMPACT)
+    data = await envoy.update(features=SupportedFeatures.PRODUCTION)
+    assert len(data.raw) > 1
+    assert all(isinstance(value, EnvoyCompactRaw) for value in data.raw.values())
+
+    envoy.set_raw_retention(RawRetention.PARSED, endpoints=[URL_PRODUCTION_INVERTERS])
+    data = await envoy.update(features=SupportedFeatures.PRODUCTION)
+    assert list(data.raw) == [URL_PRODUCTION_INVERTERS]
+    assert data.raw[URL_PRODUCTION_INVERTERS] == orjson.loads(
+        simulator.fixtures["api_v1_production_inverters"]
+    )
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_raw_retention_shared_responses(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify updaters reading response data of others get the parsed content."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.3.5169_ACB_inventory")
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    envoy.set_raw_retention(RawRetention.COMPACT)
+    data = await envoy.update()
+    acb_inventory = data.acb_inventory
+    assert acb_inventory
+    assert URL_PRODUCTION_INVERTERS in data.raw
+
+    # the inventory updater reads the inverters response of another updater
+    data = await envoy.update(features=SupportedFeatures.ACB)
+    assert data.acb_inventory == acb_inventory
+    assert isinstance(data.raw[URL_INVENTORY], EnvoyCompactRaw)
+    assert isinstance(data.raw[URL_PRODUCTION_INVERTERS], EnvoyCompactRaw)
+    await envoy.close()
+
+
+@pytest.mark.asyncio
+async def test_raw_retention_data_sent(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify response data stored after sending data is retained as set."""
+    version = "8.3.5169_with_generator"
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    envoy.set_raw_retention(RawRetention.COMPACT, endpoints=[URL_GEN_CONFIG])
+    await envoy.update()
+
+    disabled = await load_json_fixture(version, "ivp_ss_gen_config")
+    disabled["charge_from_generator"] = False
+    mock_aioresponse.post(
+        f"{endpoint_path(version, envoy.host)}{URL_GEN_CONFIG}",
+        status=200,
+        payload=disabled,
+        repeat=True,
+    )
+    await envoy.set_generator_charge_from_generator(False)
+    assert envoy.data is not None
+    assert list(envoy.data.raw) == [URL_GEN_CONFIG]
+    assert envoy.data.raw[URL_GEN_CONFIG].json == disabled
+
+    # and kept by partial updates not collecting it again
+    data = await envoy.update(features=SupportedFeatures.INVERTERS)
+    assert data.raw[URL_GEN_CONFIG].json == disabled
+    await envoy.close()
@@ -0,0 +1,368 @@
+"""Test refresh of configuration endpoints and update intervals."""
+
+import logging
+from typing import Any
+
+import aiohttp
+import orjson
+import pytest
+from aioresponses import aioresponses
+from yarl import URL
+
+from pyenphase import Envoy, EnvoyData
+from pyenphase.const import (
+    CONFIGURATION_ENDPOINTS,
+    ENDPOINT_URL_METERS,
+    ENDPOINT_URL_METERS_READINGS,
+    URL_DEVICE_DATA,
+    URL_ENCHARGE_BATTERY,
+    URL_ENSEMBLE_INVENTORY,
+    URL_GEN_CONFIG,
+    URL_PRODUCTION_JSON,
+    URL_TARIFF,
+    SupportedFeatures,
+)
+from pyenphase.envoy import _data_changes, get_updaters
+from pyenphase.exceptions import EnvoyFeatureNotAvailable
+from pyenphase.models.tariff import EnvoyStorageMode
+from pyenphase.updaters.device_data_inverters import EnvoyDeviceDataInvertersUpdater
+
+from .common import (
+    get_mock_envoy,
+    override_mock,
+    prep_envoy,
+    start_7_firmware_mock,
+)
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _request_count(mock_aioresponse: aioresponses, endpoint: str) -> int:
+    """Return number of GET requests sent for endpoint."""
+    return len(
+        mock_aioresponse.requests.get(("GET", URL(f"https://127.0.0.1{endpoint}")), [])
+    )
+
+
+@pytest.mark.asyncio
+async def test_configuration_refresh_interval(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify configuration endpoints are only requested once per interval."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = Envoy(
+        "127.0.0.1", client=test_client_session, configuration_refresh_interval=300
+    )
+    await envoy.setup()
+    await envoy.authenticate("username", "password")
+    await envoy.probe()
+    probe_counts = {
+        endpoint: _request_count(mock_aioresponse, endpoint)
+        for endpoint in (
+            *CONFIGURATION_ENDPOINTS,
+            ENDPOINT_URL_METERS_READINGS,
+            URL_ENSEMBLE_INVENTORY,
+        )
+    }
+
+    first = await envoy.update()
+    second = await envoy.update()
+    assert first == second
+    for endpoint in CONFIGURATION_ENDPOINTS:
+        assert _request_count(mock_aioresponse, endpoint) == probe_counts[endpoint] + 1
+    assert (
+        _request_count(mock_aioresponse, ENDPOINT_URL_METERS_READINGS)
+        == probe_counts[ENDPOINT_URL_METERS_READINGS] + 2
+    )
+
+    # data extracted from configuration endpoints is reused
+    assert second.tariff is first.tariff
+    assert second.generator_config is first.generator_config
+    assert second.ctmeters == first.ctmeters
+    assert second.encharge_power is not first.encharge_power
+    # the Ensemble inventory reports live values and is requested each update,
+    # the devices are only extracted again when the response changed
+    assert (
+        _request_count(mock_aioresponse, URL_ENSEMBLE_INVENTORY)
+        == probe_counts[URL_ENSEMBLE_INVENTORY] + 2
+    )
+    assert second.enpower is first.enpower
+    assert second.encharge_inventory is first.encharge_inventory
+
+    # configuration is requested again when the interval has passed
+    for endpoint, (refreshed, response) in envoy._configuration_responses.items():
+        envoy._configuration_responses[endpoint] = (refreshed - 300, response)
+    third = await envoy.update()
+    assert third == first
+    # the unchanged response is not parsed again
+    assert third.tariff is first.tariff
+    for endpoint in CONFIGURATION_ENDPOINTS:
+        assert _request_count(mock_aioresponse, endpoint) == probe_counts[endpoint] + 2
+
+    # data sent to the Envoy may change configuration
+    await envoy.set_storage_mode(EnvoyStorageMode.BACKUP)
+    assert not envoy._configuration_responses
+    await envoy.update()
+    for endpoint in (ENDPOINT_URL_METERS, URL_TARIFF, URL_GEN_CONFIG):
+        assert _request_count(mock_aioresponse, endpoint) == probe_counts[endpoint] + 3
+
+    # a response requested while data is sent to the Envoy is not reused
+    request = envoy.request
+
+    async def _request_while_sending(
+        endpoint: str,
+        data: dict[str, Any] | None = None,
+        method: str | None = None,
+    ) -> aiohttp.ClientResponse:
+        await envoy._request(URL_TARIFF, {"tariff": {}}, method="PUT")
+        return await request(endpoint, data, method)
+
+    envoy._configuration_responses.clear()
+    envoy.request = _request_while_sending  # type: ignore[method-assign]
+    await envoy._update_request(URL_TARIFF)
+    assert URL_TARIFF not in envoy._configuration_responses
+    envoy.request = request  # type: ignore[method-assign]
+
+    # a new probe requests configuration again
+    await envoy.probe()
+    assert not envoy._configuration_responses
+
+
+@pytest.mark.asyncio
+async def test_configuration_refresh_interval_disabled(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify configuration endpoints are requested each update by default."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = Envoy("127.0.0.1", client=test_client_session)
+    await envoy.setup()
+    await envoy.authenticate("username", "password")
+    await envoy.probe()
+    count = _request_count(mock_aioresponse, URL_TARIFF)
+
+    first = await envoy.update()
+    second = await envoy.update()
+    assert _request_count(mock_aioresponse, URL_TARIFF) == count + 2
+    assert second.tariff is first.tariff
+    assert not envoy._configuration_responses
+
+    with pytest.raises(
+        ValueError, match="configuration_refresh_interval can not be negative"
+    ):
+        Envoy("127.0.0.1", configuration_refresh_interval=-1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "version",
+    [
+        "8.2.127_with_generator_running",
+        "8.3.5169_ACB_inventory",
+        "8.2.4345_with_device_data",
+        "7.6.185_with_cts_and_battery_3t",
+        "5.0.62",
+        "3.9.36",
+    ],
+)
+async def test_scheduled_update_matches_update(
+    version: str,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify updates with update intervals collect the same data."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", version)
+    envoy = await get_mock_envoy(test_client_session)
+    assert envoy.data is not None
+    assert set(envoy.data_age) == set(_data_changes(EnvoyData(), envoy.data))
+    assert all(0 <= age < 60 for age in envoy.data_age.values())
+
+    scheduled = await get_mock_envoy(test_client_session, update=False)
+    for updater in get_updaters():
+        scheduled.set_update_interval(updater, 300)
+    assert await scheduled.update() == envoy.data
+    assert await scheduled.update() == envoy.data
+    assert set(scheduled.data_age) == set(envoy.data_age)
+
+
+@pytest.mark.asyncio
+async def test_update_interval(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify updaters only collect data when their update interval passed."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.3.5169_ACB_inventory")
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    envoy.set_update_interval(EnvoyDeviceDataInvertersUpdater, 300)
+    await envoy.probe()
+    device_data_count = _request_count(mock_aioresponse, URL_DEVICE_DATA)
+    production_count = _request_count(mock_aioresponse, URL_PRODUCTION_JSON)
+
+    first = await envoy.update()
+    second = await envoy.update()
+    assert _request_count(mock_aioresponse, URL_DEVICE_DATA) == device_data_count + 1
+    assert _request_count(mock_aioresponse, URL_PRODUCTION_JSON) == production_count + 2
+    assert second == first
+    assert second.inverters is not first.inverters
+    for serial, inverter in second.inverters.items():
+        assert inverter is first.inverters[serial]
+    assert second.raw[URL_DEVICE_DATA] is first.raw[URL_DEVICE_DATA]
+    assert second.system_production is not first.system_production
+
+    # inverters data is as old as the last device data collection
+    index = next(
+        index
+        for index, updater in enumerate(envoy._updaters)
+        if isinstance(updater, EnvoyDeviceDataInvertersUpdater)
+    )
+    collected, changes = envoy._updater_changes[index]
+    envoy._updater_changes[index] = (collected - 200, changes)
+    await envoy.update()
+    assert envoy.data_age["inverters"] >= 200
+    assert envoy.data_age["raw"] >= 200
+    assert envoy.data_age["system_production"] < 200
+    assert _request_count(mock_aioresponse, URL_DEVICE_DATA) == device_data_count + 1
+
+    # collect data again when the interval has passed
+    envoy._updater_changes[index] = (collected - 300, changes)
+    assert await envoy.update() == first
+    assert _request_count(mock_aioresponse, URL_DEVICE_DATA) == device_data_count + 2
+    assert envoy.data_age["inverters"] < 200
+
+    # probe resets the schedule, interval 0 collects data at each update
+    await envoy.probe()
+    assert not envoy._updater_changes
+    envoy.set_update_interval(EnvoyDeviceDataInvertersUpdater, 0)
+    assert not envoy._update_intervals
+    await envoy.update()
+    assert not envoy._updater_changes
+
+    with pytest.raises(ValueError, match="interval can not be negative"):
+        envoy.set_update_interval(EnvoyDeviceDataInvertersUpdater, -1)
+
+
+@pytest.mark.asyncio
+async def test_partial_update(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a partial update only collects data for the requested features."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = await get_mock_envoy(test_client_session)
+    first = envoy.data
+    assert first is not None
+    counts = {
+        endpoint: _request_count(mock_aioresponse, endpoint)
+        for endpoint in (URL_ENSEMBLE_INVENTORY, URL_PRODUCTION_JSON, URL_TARIFF)
+    }
+
+    second = await envoy.update(features=SupportedFeatures.ENCHARGE)
+    assert envoy.data is second
+    assert second == first
+    assert second is not first
+    assert (
+        _request_count(mock_aioresponse, URL_ENSEMBLE_INVENTORY)
+        == counts[URL_ENSEMBLE_INVENTORY] + 1
+    )
+    assert (
+        _request_count(mock_aioresponse, URL_PRODUCTION_JSON)
+        == counts[URL_PRODUCTION_JSON]
+    )
+    assert _request_count(mock_aioresponse, URL_TARIFF) == counts[URL_TARIFF]
+    assert second.encharge_power is not first.encharge_power
+    assert second.system_production is first.system_production
+    assert second.tariff is first.tariff
+    assert second.raw[URL_PRODUCTION_JSON] is first.raw[URL_PRODUCTION_JSON]
+
+    # only the refreshed data is younger
+    envoy._data_collected = {
+        name: collected - 200 for name, collected in envoy._data_collected.items()
+    }
+    await envoy.update(features=SupportedFeatures.ENCHARGE)
+    assert envoy.data_age["encharge_power"] < 200
+    assert envoy.data_age["system_production"] >= 200
+    assert envoy.data_age["raw"] >= 200
+
+    with pytest.raises(EnvoyFeatureNotAvailable):
+        await envoy.update(features=SupportedFeatures.DETAILED_INVERTERS)
+
+
+@pytest.mark.asyncio
+async def test_partial_update_with_update_interval(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a partial update keeps the data used by scheduled updates."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.2.127_with_generator_running")
+    envoy = await get_mock_envoy(test_client_session, update=False)
+
+    # without earlier data a full update is done
+    first = await envoy.update(features=SupportedFeatures.TARIFF)
+    assert first.system_production is not None
+
+    for updater in get_updaters():
+        envoy.set_update_interval(updater, 300)
+    assert await envoy.update() == first
+    count = _request_count(mock_aioresponse, URL_ENCHARGE_BATTERY)
+    second = await envoy.update(features=SupportedFeatures.ENCHARGE)
+    assert second == first
+    assert second.encharge_power is not first.encharge_power
+    assert _request_count(mock_aioresponse, URL_ENCHARGE_BATTERY) == count + 1
+    # the scheduled update uses the data of the partial update
+    third = await envoy.update()
+    assert third == first
+    assert third.encharge_power is second.encharge_power
+    assert third.raw == first.raw
+    assert _request_count(mock_aioresponse, URL_ENCHARGE_BATTERY) == count + 1
+
+
+@pytest.mark.asyncio
+async def test_unchanged_responses(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify unchanged responses are not parsed and their data is reused."""
+    start_7_firmware_mock(mock_aioresponse)
+    await prep_envoy(mock_aioresponse, "127.0.0.1", "8.3.5169_ACB_inventory")
+    envoy = await get_mock_envoy(test_client_session, update=False)
+    await envoy.probe()
+    assert envoy.parsed_responses == envoy.unchanged_responses == 0
+
+    first = await envoy.update()
+    parsed = envoy.parsed_responses
+    assert parsed > 0
+    assert envoy.unchanged_responses == 0
+
+    second = await envoy.update()
+    assert second == first
+    assert envoy.parsed_responses == parsed
+    assert envoy.unchanged_responses == parsed
+    assert second.raw[URL_DEVICE_DATA] is first.raw[URL_DEVICE_DATA]
+    assert second.inverters is not first.inverters
+    for serial, inverter in second.inverters.items():
+        assert inverter is first.inverters[serial]
+
+    # a changed response is parsed again
+    override_mock(
+        mock_aioresponse,
+        "GET",
+        f"https://127.0.0.1{URL_DEVICE_DATA}",
+        status=200,
+        body=orjson.dumps({**first.raw[URL_DEVICE_DATA], "deviceCount": 0}),
+    )
+    third = await envoy.update()
+    assert envoy.parsed_responses == parsed + 1
+    assert third.raw[URL_DEVICE_DATA] is not first.raw[URL_DEVICE_DATA]
+    assert third.inverters == first.inverters
+    for serial, inverter in third.inverters.items():
+        assert inverter is not first.inverters[serial]
@@ -0,0 +1,239 @@
+"""Test the Envoy meter stream."""
+
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from typing import Any
+from unittest.mock import AsyncMock
+
+import aiohttp
+import orjson
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aioresponses import aioresponses
+
+from pyenphase import Envoy
+from pyenphase.auth import EnvoyLegacyAuth
+from pyenphase.const import URL_STREAM_METER, PhaseNames
+from pyenphase.envoy import _parse_meter_stream_line
+from pyenphase.exceptions import EnvoyAuthenticationRequired, EnvoyHTTPStatusError
+from pyenphase.models.meters import CtType, EnvoyMeterStreamData
+
+from .common import latency
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+LOGGER = logging.getLogger(__name__)
+
+#: host of the local stand-in for the Envoy meter stream, not mocked by aioresponses
+STREAM_HOST = "127.0.0.1:8123"
+
+
+def _stream_sample(power: float) -> dict[str, Any]:
+    """Return a meter stream sample as sent by the Envoy."""
+    phase = {
+        "p": power,
+        "q": 12.5,
+        "s": power + 20,
+        "v": 240.1,
+        "i": 3.2,
+        "pf": 0.98,
+        "f": 60.0,
+    }
+    return {
+        ct_type: {name: dict(phase) for name in ("ph-a", "ph-b", "ph-c")}
+        for ct_type in ("production", "net-consumption", "total-consumption")
+    }
+
+
+def _event(sample: dict[str, Any]) -> bytes:
+    """Return a meter stream sample as server-sent event."""
+    return b"data: " + orjson.dumps(sample) + b"\n\n"
+
+
+StreamHandler = Callable[[web.StreamResponse], Awaitable[None]]
+
+
+@pytest_asyncio.fixture
+async def stream_server() -> AsyncGenerator[list[StreamHandler]]:
+    """Run a local meter stream, each connection is served by the next handler."""
+    handlers: list[StreamHandler] = []
+
+    async def _stream_meter(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await handlers.pop(0)(response)
+        return response
+
+    app = web.Application()
+    app.router.add_get(URL_STREAM_METER, _stream_meter)
+    # stop streaming when the client disconnects
+    runner = web.AppRunner(app, handler_cancellation=True)
+    await runner.setup()
+    host, port = STREAM_HOST.split(":")
+    site = web.TCPSite(runner, host, int(port))
+    await site.start()
+    yield handlers
+    await runner.cleanup()
+
+
+def _stream_envoy(client: aiohttp.ClientSession) -> Envoy:
+    """Return an Envoy using the local meter stream."""
+    envoy = Envoy(STREAM_HOST, client=client)
+    envoy.auth = EnvoyLegacyAuth(STREAM_HOST, "", "")
+    return envoy
+
+
+def test_parse_meter_stream_line() -> None:
+    """Verify meter stream lines are parsed into samples."""
+    sample = _parse_meter_stream_line(_event(_stream_sample(1234.5)))
+    assert sample is not None
+    assert set(sample) == {
+        CtType.PRODUCTION,
+        CtType.NET_CONSUMPTION,
+        CtType.TOTAL_CONSUMPTION,
+    }
+    assert sample[CtType.PRODUCTION][PhaseNames.PHASE_1] == EnvoyMeterStreamData(
+        active_power=1234.5,
+        reactive_power=12.5,
+        apparent_power=1254.5,
+        power_factor=0.98,
+        voltage=240.1,
+        current=3.2,
+        frequency=60.0,
+    )
+    assert set(sample[CtType.PRODUCTION]) == set(PhaseNames)
+
+    # lines without JSON data are skipped
+    assert _parse_meter_stream_line(b"\n") is None
+    assert _parse_meter_stream_line(b": keep-alive\n") is None
+    assert _parse_meter_stream_line(b"event: meter\n") is None
+    assert _parse_meter_stream_line(b"data: {invalid\n") is None
+    assert _parse_meter_stream_line(b'data: {"production": {"ph-a": {}}}\n') is None
+    # data without prefix is accepted
+    assert _parse_meter_stream_line(orjson.dumps(_stream_sample(1))) == (
+        _parse_meter_stream_line(_event(_stream_sample(1)))
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_meters(
+    stream_server: list[StreamHandler],
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify samples are streamed and the stream reconnects when closed."""
+    event = _event(_stream_sample(100))
+
+    async def _split_and_close(response: web.StreamResponse) -> None:
+        # a sample split over chunks is parsed once complete
+        await response.write(b": welcome\n\n" + event[:20])
+        await latency(0.05)
+        await response.write(event[20:] + b"data: {invalid\n\n")
+        await response.write(_event(_stream_sample(200)))
+
+    async def _stream(response: web.StreamResponse) -> None:
+        for power in range(300, 310):
+            await response.write(_event(_stream_sample(power)))
+        await latency(5)
+
+    stream_server.extend([_split_and_close, _stream])
+    envoy = _stream_envoy(test_client_session)
+    powers: list[float] = []
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        async for sample in envoy.stream_meters(reconnect_delay=2):
+            powers.append(sample[CtType.PRODUCTION][PhaseNames.PHASE_1].active_power)
+            if len(powers) == 4:
+                break
+    assert powers == [100, 200, 300, 301]
+    # reconnected once after the Envoy closed the stream
+    sleep.assert_awaited_once_with(2)
+    assert not stream_server
+
+
+@pytest.mark.asyncio
+async def test_stream_meters_backpressure(
+    stream_server: list[StreamHandler],
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify the Envoy has to wait when the consumer is slower than the stream."""
+    event = _event(_stream_sample(100))
+    total = 100_000
+    written = 0
+
+    async def _fast_stream(response: web.StreamResponse) -> None:
+        nonlocal written
+        for _ in range(total):
+            await response.write(event)
+            written += 1
+
+    stream_server.append(_fast_stream)
+    envoy = _stream_envoy(test_client_session)
+    stream = envoy.stream_meters()
+    await anext(stream)
+    # a slow consumer, the stream would complete in this time
+    await latency(0.5)
+    LOGGER.info("%s of %s samples of %s bytes sent", written, total, len(event))
+    assert written < total
+    assert isinstance(stream, AsyncGenerator)
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_meters_backoff(
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify reconnect delays increase until a sample is received."""
+    url = f"http://127.0.0.1{URL_STREAM_METER}"
+    for _ in range(4):
+        mock_aioresponse.get(url, exception=aiohttp.ClientConnectionError())
+    mock_aioresponse.get(url, exception=TimeoutError())
+    mock_aioresponse.get(url, status=200, body=_event(_stream_sample(1)))
+    mock_aioresponse.get(url, status=200, body=b"")
+    mock_aioresponse.get(url, status=200, body=_event(_stream_sample(2)))
+    envoy = Envoy("127.0.0.1", client=test_client_session)
+    envoy.auth = EnvoyLegacyAuth("127.0.0.1", "", "")
+
+    powers: list[float] = []
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        sleep = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        async for sample in envoy.stream_meters(
+            reconnect_delay=1, max_reconnect_delay=10
+        ):
+            powers.append(sample[CtType.PRODUCTION][PhaseNames.PHASE_1].active_power)
+            if len(powers) == 2:
+                break
+    assert powers == [1, 2]
+    assert [call.args[0] for call in sleep.await_args_list] == [1, 2, 4, 8, 10, 1, 2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("status", "exception"),
+    [
+        (401, EnvoyAuthenticationRequired),
+        (403, EnvoyAuthenticationRequired),
+        (404, EnvoyHTTPStatusError),
+    ],
+)
+async def test_stream_meters_errors(
+    status: int,
+    exception: type[Exception],
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify the stream fails when it is not available."""
+    url = f"http://127.0.0.1{URL_STREAM_METER}"
+    mock_aioresponse.get(url, status=status)
+    envoy = Envoy("127.0.0.1", client=test_client_session)
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await anext(envoy.stream_meters())
+
+    envoy.auth = EnvoyLegacyAuth("127.0.0.1", "", "")
+    with pytest.raises(exception):
+        await anext(envoy.stream_meters())
@@ -0,0 +1,452 @@
+"""Test refreshing the token and renewing authentication."""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+import jwt
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aioresponses import CallbackResult, aioresponses
+from awesomeversion import AwesomeVersion
+from yarl import URL
+
+from pyenphase import Envoy, EnvoyTokenAuth
+from pyenphase.auth import EnvoySessionStats
+from pyenphase.const import (
+    SESSION_COOKIE,
+    TOKEN_REFRESH_RETRY_DELAY,
+    URL_AUTH_CHECK_JWT,
+)
+from pyenphase.exceptions import EnvoyAuthenticationError, EnvoyAuthenticationRequired
+
+from .common import latency
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+#: host of the local stand-in for Enlighten, not mocked by aioresponses
+ENLIGHTEN_HOST = "127.0.0.1:8123"
+#: lifetime in seconds of the tokens issued by the stand-in
+TOKEN_LIFETIME = 10000
+PRODUCTION_URL = "https://127.0.0.1/api/v1/production"
+
+
+def _token(expires_in: float) -> str:
+    """Return a token expiring in specified number of seconds."""
+    return jwt.encode(
+        payload={"enphaseUser": "owner", "exp": int(time.time() + expires_in)},
+        key="useaverylongsecretofatleast32bytestoavoidajwtsecuritywarning",
+        algorithm="HS256",
+    )
+
+
+class _Enlighten:
+    """Local stand-in for the Enlighten login and token endpoints."""
+
+    def __init__(self) -> None:
+        self.failures = 0
+        self.stalls = 0
+        self.latency = 0.0
+        self.requests = 0
+        self.tokens: list[str] = []
+
+    async def login(self, request: web.Request) -> web.Response:
+        """Return a session for the login."""
+        return web.json_response({"session_id": "1234", "manager_token": "abcd"})
+
+    async def token(self, request: web.Request) -> web.Response:
+        """Return a new token, or fail if failures are pending."""
+        self.requests += 1
+        await latency(self.latency)
+        if self.stalls:
+            self.stalls -= 1
+            await latency(1)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=500, text="unavailable")
+        self.tokens.append(_token(TOKEN_LIFETIME))
+        return web.Response(text=self.tokens[-1])
+
+
+@pytest_asyncio.fixture
+async def enlighten() -> AsyncGenerator[_Enlighten]:
+    """Run a local Enlighten stand-in."""
+    server = _Enlighten()
+    app = web.Application()
+    app.router.add_post("/login/login.json", server.login)
+    app.router.add_post("/tokens", server.token)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    host, port = ENLIGHTEN_HOST.split(":")
+    site = web.TCPSite(runner, host, int(port))
+    await site.start()
+    with (
+        patch.object(
+            EnvoyTokenAuth,
+            "JSON_LOGIN_URL",
+            f"http://{ENLIGHTEN_HOST}/login/login.json",
+        ),
+        patch.object(EnvoyTokenAuth, "TOKEN_URL", f"http://{ENLIGHTEN_HOST}/tokens"),
+    ):
+        yield server
+    await runner.cleanup()
+
+
+def _check_jwt(url: URL, **kwargs: Any) -> CallbackResult:
+    """Return a session cookie specific for the verified token."""
+    token = kwargs["headers"]["Authorization"].removeprefix("Bearer ")
+    return CallbackResult(
+        headers={"Set-Cookie": f"{SESSION_COOKIE}={token[-8:]}; Path=/"}
+    )
+
+
+def _token_envoy(client: aiohttp.ClientSession) -> Envoy:
+    """Return an Envoy running firmware requiring token authentication."""
+    envoy = Envoy("127.0.0.1", client=client)
+    envoy._firmware._firmware_version = AwesomeVersion("8.2.4")
+    envoy._firmware._serial_number = "123456789012"
+    return envoy
+
+
+class _Sleeps:
+    """Record the delays of asyncio.sleep, blocking once enough were seen."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.delays: list[float] = []
+        self.blocked = asyncio.Event()
+
+    async def __call__(self, delay: float) -> None:
+        self.delays.append(delay)
+        if len(self.delays) >= self.limit:
+            self.blocked.set()
+            await asyncio.Event().wait()
+
+
+def test_token_claims_cached() -> None:
+    """Verify the token is decoded once for its claims."""
+    token = _token(100)
+    auth = EnvoyTokenAuth("127.0.0.1", token=token)
+    with patch("pyenphase.auth.jwt.decode", wraps=jwt.decode) as decode:
+        assert auth.token_type == "owner"
+        assert auth.expire_timestamp == auth.expire_timestamp
+        assert decode.call_count == 1
+        auth._token = _token(200)
+        assert auth.expire_timestamp > time.time() + 100
+        assert decode.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_token_refreshed_in_background(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify the token is replaced before it expires."""
+    mock_aioresponse.get(
+        f"https://127.0.0.1{URL_AUTH_CHECK_JWT}", callback=_check_jwt, repeat=True
+    )
+    envoy = _token_envoy(test_client_session)
+    token = _token(50)
+    sleeps = _Sleeps(limit=2)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(asyncio, "sleep", sleeps)
+        await envoy.authenticate(
+            "user", "password", token=token, token_refresh_margin=100
+        )
+        assert isinstance(envoy.auth, EnvoyTokenAuth)
+        assert envoy.auth.cookies == {SESSION_COOKIE: token[-8:]}
+        # the token expires within the margin and is refreshed right away
+        await asyncio.wait_for(sleeps.blocked.wait(), 1)
+        refresh_task = envoy.auth._refresh_task
+        assert refresh_task is not None
+
+        # authenticating again does not start another refresh
+        await envoy.auth.setup(test_client_session)
+        assert envoy.auth._refresh_task is refresh_task
+
+    assert enlighten.tokens == [envoy.auth.token]
+    assert envoy.auth.cookies == {SESSION_COOKIE: envoy.auth.token[-8:]}
+    assert envoy.auth.manager_token == "abcd"
+    # the next refresh is scheduled for the new token
+    for delay in sleeps.delays:
+        assert TOKEN_LIFETIME - 110 < delay <= TOKEN_LIFETIME - 100
+
+    await envoy.close()
+    assert refresh_task.cancelled()
+    assert envoy.auth._refresh_task is None
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_retried(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a failed refresh is tried again."""
+    mock_aioresponse.get(
+        f"https://127.0.0.1{URL_AUTH_CHECK_JWT}", callback=_check_jwt, repeat=True
+    )
+    enlighten.failures = 1
+    auth = EnvoyTokenAuth(
+        "127.0.0.1", "user", "password", "123456789012", _token(50), 100
+    )
+    sleeps = _Sleeps(limit=2)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(asyncio, "sleep", sleeps)
+        await auth.setup(test_client_session)
+        await asyncio.wait_for(sleeps.blocked.wait(), 1)
+    assert sleeps.delays[0] == TOKEN_REFRESH_RETRY_DELAY
+    assert enlighten.tokens == [auth.token]
+
+    # authenticating again stops the refresh of the previous authentication
+    envoy = _token_envoy(test_client_session)
+    envoy.auth = auth
+    await envoy.authenticate(token=_token(50))
+    assert auth._refresh_task is None
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_retried_after_timeout(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a refresh timing out in Enlighten cloud is tried again."""
+    mock_aioresponse.get(
+        f"https://127.0.0.1{URL_AUTH_CHECK_JWT}", callback=_check_jwt, repeat=True
+    )
+    enlighten.stalls = 1
+    auth = EnvoyTokenAuth(
+        "127.0.0.1", "user", "password", "123456789012", _token(50), 100
+    )
+    client_timeout = aiohttp.ClientTimeout
+    sleeps = _Sleeps(limit=2)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(asyncio, "sleep", sleeps)
+        # time out long before the stalled token request completes
+        monkeypatch.setattr(
+            aiohttp, "ClientTimeout", lambda **kwargs: client_timeout(total=0.1)
+        )
+        await auth.setup(test_client_session)
+        await asyncio.wait_for(sleeps.blocked.wait(), 2)
+    assert auth._refresh_task is not None
+    assert not auth._refresh_task.done()
+    assert sleeps.delays[0] == TOKEN_REFRESH_RETRY_DELAY
+    assert enlighten.requests == 2
+    assert enlighten.tokens == [auth.token]
+    await auth.close()
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_short_lifetime(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a new token expiring within the margin is refreshed after a delay."""
+    mock_aioresponse.get(
+        f"https://127.0.0.1{URL_AUTH_CHECK_JWT}", callback=_check_jwt, repeat=True
+    )
+    auth = EnvoyTokenAuth(
+        "127.0.0.1",
+        "user",
+        "password",
+        "123456789012",
+        _token(50),
+        TOKEN_LIFETIME + 100,
+    )
+    sleeps = _Sleeps(limit=1)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(asyncio, "sleep", sleeps)
+        await auth.setup(test_client_session)
+        await asyncio.wait_for(sleeps.blocked.wait(), 1)
+    assert sleeps.delays == [TOKEN_REFRESH_RETRY_DELAY]
+    assert enlighten.tokens == [auth.token]
+    await auth.close()
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_requires_credentials(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify the token is not refreshed without cloud credentials."""
+    mock_aioresponse.get(
+        f"https://127.0.0.1{URL_AUTH_CHECK_JWT}", callback=_check_jwt, repeat=True
+    )
+    auth = EnvoyTokenAuth("127.0.0.1", token=_token(50), refresh_margin=100)
+    await auth.setup(test_client_session)
+    assert auth._refresh_task is None
+    await auth.close()
+
+    # nothing to stop before authentication
+    envoy = _token_envoy(test_client_session)
+    await envoy.close()
+    assert envoy.auth is None
+
+
+class _Envoy:
+    """Envoy stand-in accepting the specified and newly issued tokens."""
+
+    def __init__(self, enlighten: _Enlighten, *tokens: str) -> None:
+        self.enlighten = enlighten
+        self.tokens = set(tokens)
+        self.sessions = True
+        #: status returned for credentials not accepted
+        self.rejected_status = 401
+
+    def _valid(self, token: str) -> bool:
+        """Return True if the token is accepted."""
+        return token in self.tokens or token in self.enlighten.tokens
+
+    def check_jwt(self, url: URL, **kwargs: Any) -> CallbackResult:
+        """Return a session cookie specific for an accepted token."""
+        token = kwargs["headers"]["Authorization"].removeprefix("Bearer ")
+        if not self._valid(token):
+            return CallbackResult(status=401)
+        if not self.sessions:
+            return CallbackResult()
+        return CallbackResult(
+            headers={"Set-Cookie": f"{SESSION_COOKIE}={token[-8:]}; Path=/"}
+        )
+
+    async def production(self, url: URL, **kwargs: Any) -> CallbackResult:
+        """Return production data, after some latency, for accepted credentials."""
+        await latency(0.05)
+        headers: dict[str, str] = kwargs["headers"]
+        if cookie := headers.get("Cookie"):
+            session = cookie.removeprefix(f"{SESSION_COOKIE}=")
+            valid = any(
+                self._valid(token) and token[-8:] == session
+                for token in {*self.tokens, *self.enlighten.tokens}
+            )
+        else:
+            valid = self._valid(headers["Authorization"].removeprefix("Bearer "))
+        if not valid:
+            return CallbackResult(status=self.rejected_status)
+        return CallbackResult(payload={"wattsNow": 100})
+
+    def mock(self, mock_aioresponse: aioresponses) -> None:
+        """Mock the Envoy endpoints."""
+        mock_aioresponse.get(
+            f"https://127.0.0.1{URL_AUTH_CHECK_JWT}",
+            callback=self.check_jwt,
+            repeat=True,
+        )
+        mock_aioresponse.get(PRODUCTION_URL, callback=self.production, repeat=True)
+
+
+@pytest.mark.asyncio
+async def test_reauthentication_single_flight(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify concurrent authentication failures renew the token once."""
+    token = _token(50)
+    stand_in = _Envoy(enlighten, token)
+    stand_in.mock(mock_aioresponse)
+    envoy = _token_envoy(test_client_session)
+    await envoy.authenticate("user", "password", token=token)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+
+    # the Envoy no longer accepts the token or its session
+    stand_in.tokens.clear()
+    enlighten.latency = 0.2
+    requests = [
+        asyncio.create_task(envoy.request("/api/v1/production")) for _ in range(5)
+    ]
+    # a request started during the renewal waits for it
+    await latency(0.1)
+    assert envoy._auth_recovery is not None
+    requests.append(asyncio.create_task(envoy.request("/api/v1/production")))
+    responses = await asyncio.gather(*requests)
+    assert [response.status for response in responses] == [200] * 6
+
+    assert enlighten.requests == 1
+    assert envoy.auth.token == enlighten.tokens[0]
+    assert envoy.auth.session_stats == EnvoySessionStats(
+        cookie_requests=11, renewals=1, refreshes=1
+    )
+    assert envoy._auth_recovery is None
+
+
+@pytest.mark.asyncio
+async def test_reauthentication_failure(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a failing token refresh is reported to all waiting requests."""
+    token = _token(50)
+    stand_in = _Envoy(enlighten, token)
+    stand_in.mock(mock_aioresponse)
+    envoy = _token_envoy(test_client_session)
+    await envoy.authenticate("user", "password", token=token)
+
+    stand_in.tokens.clear()
+    enlighten.failures = 1
+    results = await asyncio.gather(
+        *(envoy.request("/api/v1/production") for _ in range(5)),
+        return_exceptions=True,
+    )
+    assert enlighten.requests == 1
+    for result in results:
+        assert isinstance(result, EnvoyAuthenticationRequired)
+        assert isinstance(result.__cause__, EnvoyAuthenticationError)
+
+
+@pytest.mark.parametrize("status", [401, 403])
+@pytest.mark.asyncio
+async def test_reauthentication_expired_token(
+    status: int,
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify an expired token sent without session is refreshed."""
+    token = _token(-10)
+    stand_in = _Envoy(enlighten, token)
+    stand_in.sessions = False
+    stand_in.rejected_status = status
+    stand_in.mock(mock_aioresponse)
+    envoy = _token_envoy(test_client_session)
+    await envoy.authenticate("user", "password", token=token)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+
+    stand_in.tokens.clear()
+    response = await envoy.request("/api/v1/production")
+    assert response.status == 200
+    assert envoy.auth.token == enlighten.tokens[0]
+    assert envoy.auth.session_stats == EnvoySessionStats(bearer_requests=2, refreshes=1)
+
+
+@pytest.mark.asyncio
+async def test_reauthentication_not_needed(
+    enlighten: _Enlighten,
+    mock_aioresponse: aioresponses,
+    test_client_session: aiohttp.ClientSession,
+) -> None:
+    """Verify a request failing with replaced credentials is retried right away."""
+    token = _token(50)
+    stand_in = _Envoy(enlighten, token)
+    stand_in.mock(mock_aioresponse)
+    envoy = _token_envoy(test_client_session)
+    await envoy.authenticate("user", "password", token=token)
+
+    request = asyncio.create_task(envoy.request("/api/v1/production"))
+    await latency(0.01)
+    # authenticate with a new token while the request is sent
+    new_token = _token(100)
+    stand_in.tokens = {new_token}
+    await envoy.authenticate("user", "password", token=new_token)
+    response = await request
+    assert response.status == 200
+    assert enlighten.requests == 0
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=1)
@@ -0,0 +1,216 @@
+"""Test the Envoy session cookie with token authentication."""
+
+from typing import Any
+
+import aiohttp
+import jwt
+import orjson
+import pytest
+from aioresponses import CallbackResult, aioresponses
+from yarl import URL
+
+from pyenphase import Envoy, EnvoyTokenAuth
+from pyenphase.auth import EnvoySessionStats
+from pyenphase.const import SESSION_COOKIE, URL_AUTH_CHECK_JWT, URL_STREAM_METER
+from pyenphase.exceptions import EnvoyAuthenticationRequired
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+CHECK_JWT_URL = f"https://127.0.0.1{URL_AUTH_CHECK_JWT}"
+PRODUCTION_URL = "https://127.0.0.1/api/v1/production"
+STREAM_URL = f"https://127.0.0.1{URL_STREAM_METER}"
+TOKEN = jwt.encode(
+    payload={"enphaseUser": "owner", "exp": 2000000000},
+    key="useaverylongsecretofatleast32bytestoavoidajwtsecuritywarning",
+    algorithm="HS256",
+)
+
+
+def _set_cookie(session: str) -> dict[str, str]:
+    """Return the headers setting the Envoy session cookie."""
+    return {"Set-Cookie": f"{SESSION_COOKIE}={session}; Path=/; HttpOnly"}
+
+
+class _Credentials:
+    """Record the credentials sent to the Envoy and accept valid sessions."""
+
+    def __init__(self, *sessions: str) -> None:
+        self.sessions = set(sessions)
+        self.sent: list[str] = []
+
+    def __call__(self, url: URL, **kwargs: Any) -> CallbackResult:
+        """Return production data if the session or token is valid."""
+        headers: dict[str, str] = kwargs["headers"]
+        if cookie := headers.get("Cookie"):
+            self.sent.append(cookie)
+            valid = cookie.removeprefix(f"{SESSION_COOKIE}=") in self.sessions
+        else:
+            self.sent.append(headers["Authorization"])
+            valid = headers["Authorization"] == f"Bearer {TOKEN}"
+        if not valid:
+            return CallbackResult(status=401)
+        return CallbackResult(payload={"wattsNow": 100})
+
+
+async def _token_envoy(client: aiohttp.ClientSession) -> Envoy:
+    """Return an Envoy with its token verified."""
+    envoy = Envoy("127.0.0.1", client=client)
+    envoy.auth = EnvoyTokenAuth("127.0.0.1", token=TOKEN)
+    await envoy.auth.setup(client)
+    return envoy
+
+
+@pytest.mark.asyncio
+async def test_session_cookie_preferred(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify the session cookie is sent instead of the token."""
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("first"))
+    credentials = _Credentials("first")
+    mock_aioresponse.get(PRODUCTION_URL, callback=credentials, repeat=True)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    assert envoy.auth.cookies == {SESSION_COOKIE: "first"}
+
+    for _ in range(3):
+        response = await envoy.request("/api/v1/production")
+        assert response.status == 200
+    assert credentials.sent == [f"{SESSION_COOKIE}=first"] * 3
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=3)
+
+
+@pytest.mark.asyncio
+async def test_session_renewed(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify an expired session is renewed by verifying the token again."""
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("first"))
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("second"))
+    credentials = _Credentials("first")
+    mock_aioresponse.get(PRODUCTION_URL, callback=credentials, repeat=True)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    await envoy.request("/api/v1/production")
+
+    # the Envoy ends the session, the request is retried with a new one
+    credentials.sessions = {"second"}
+    response = await envoy.request("/api/v1/production")
+    assert response.status == 200
+    assert orjson.loads(await response.read()) == {"wattsNow": 100}
+    assert credentials.sent[1:] == [
+        f"{SESSION_COOKIE}={session}" for session in ("first", "second")
+    ]
+    assert envoy.auth.cookies == {SESSION_COOKIE: "second"}
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=3, renewals=1)
+
+    # the token is no longer accepted either
+    credentials.sessions = set()
+    mock_aioresponse.get(CHECK_JWT_URL, status=401)
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.request("/api/v1/production")
+    assert envoy.auth.cookies == {}
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=4, renewals=2)
+
+
+@pytest.mark.asyncio
+async def test_session_not_renewed_when_forbidden(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify a request without access is not retried with a renewed session."""
+    mock_aioresponse.get(
+        CHECK_JWT_URL, status=200, headers=_set_cookie("first"), repeat=True
+    )
+    mock_aioresponse.get(PRODUCTION_URL, status=403, repeat=True)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.request("/api/v1/production")
+    assert envoy.auth.cookies == {SESSION_COOKIE: "first"}
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=1)
+
+
+@pytest.mark.asyncio
+async def test_session_headers_not_counted(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify only requests sent count in the session statistics."""
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("first"))
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    for _ in range(3):
+        assert envoy.auth.headers == {"Cookie": f"{SESSION_COOKIE}=first"}
+    assert envoy.auth.session_stats == EnvoySessionStats()
+
+
+@pytest.mark.asyncio
+async def test_session_not_renewed_twice(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify a request is retried only once with a renewed session."""
+    mock_aioresponse.get(
+        CHECK_JWT_URL, status=200, headers=_set_cookie("first"), repeat=True
+    )
+    credentials = _Credentials()
+    mock_aioresponse.get(PRODUCTION_URL, callback=credentials, repeat=True)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.request("/api/v1/production")
+    assert len(credentials.sent) == 2
+    assert envoy.auth.session_stats.renewals == 1
+
+
+@pytest.mark.asyncio
+async def test_token_without_session(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify the token is sent when the Envoy returns no session cookie."""
+    mock_aioresponse.get(CHECK_JWT_URL, status=200)
+    credentials = _Credentials()
+    mock_aioresponse.get(PRODUCTION_URL, callback=credentials, repeat=True)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    response = await envoy.request("/api/v1/production")
+    assert response.status == 200
+    assert credentials.sent == [f"Bearer {TOKEN}"]
+
+    # a rejected token has no session to renew
+    envoy.auth._token = "expired"
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await envoy.request("/api/v1/production")
+    assert envoy.auth.session_stats == EnvoySessionStats(bearer_requests=2)
+
+
+@pytest.mark.asyncio
+async def test_stream_session_renewed(
+    mock_aioresponse: aioresponses, test_client_session: aiohttp.ClientSession
+) -> None:
+    """Verify the meter stream reopens with a renewed session."""
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("first"))
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("second"))
+    mock_aioresponse.get(STREAM_URL, status=401)
+    phase = {
+        "p": 100.0,
+        "q": 0.0,
+        "s": 100.0,
+        "v": 240.0,
+        "i": 0.4,
+        "pf": 1.0,
+        "f": 50.0,
+    }
+    sample = {"production": {"ph-a": phase}}
+    mock_aioresponse.get(STREAM_URL, body=b"data: " + orjson.dumps(sample) + b"\n\n")
+    mock_aioresponse.get(STREAM_URL, status=401)
+    mock_aioresponse.get(STREAM_URL, status=401)
+    envoy = await _token_envoy(test_client_session)
+    assert isinstance(envoy.auth, EnvoyTokenAuth)
+    stream = envoy.stream_meters()
+    assert await anext(stream)
+    assert envoy.auth.cookies == {SESSION_COOKIE: "second"}
+
+    # after the stream closes it is renewed again, but only once
+    mock_aioresponse.get(CHECK_JWT_URL, status=200, headers=_set_cookie("third"))
+    with pytest.raises(EnvoyAuthenticationRequired):
+        await anext(stream)
+    assert envoy.auth.session_stats == EnvoySessionStats(cookie_requests=4, renewals=2)
@@ -0,0 +1,116 @@
+"""Test tracing hooks around probe, update, request, parse and build phases."""
+
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import pytest
+
+from pyenphase import tracing
+from pyenphase.const import URL_PRODUCTION_INVERTERS
+from pyenphase.tracing import (
+    SPAN_BUILD,
+    SPAN_JSON_DECODE,
+    SPAN_PROBE,
+    SPAN_REQUEST,
+    SPAN_UPDATE,
+    add_trace_hook,
+    span,
+)
+
+from .common import EnvoySimulator, get_simulated_envoy
+
+# we're testing, ignore private member access
+# pyright: reportPrivateUsage=false
+
+
+class _Tracer:
+    """Record spans with their attributes and parent span."""
+
+    def __init__(self) -> None:
+        self.spans: list[tuple[str, dict[str, Any], str | None]] = []
+        # spans of concurrent tasks nest separately, like tracing libraries do
+        self._current: ContextVar[str | None] = ContextVar("span", default=None)
+
+    @contextmanager
+    def __call__(self, name: str, attributes: Mapping[str, Any]) -> Iterator[None]:
+        """Record the span, nested in the running span."""
+        self.spans.append((name, dict(attributes), self._current.get()))
+        token = self._current.set(name)
+        try:
+            yield
+        finally:
+            self._current.reset(token)
+
+    def named(self, name: str) -> list[tuple[dict[str, Any], str | None]]:
+        """Return attributes and parent of the spans with the name."""
+        return [
+            (attributes, parent)
+            for other, attributes, parent in self.spans
+            if other == name
+        ]
+
+
+@pytest.mark.asyncio
+async def test_trace_hooks(simulator: EnvoySimulator) -> None:
+    """Verify probe and update phases are traced with nested spans."""
+    host = f"127.0.0.1:{simulator.port}"
+    envoy = await get_simulated_envoy(simulator)
+    tracer = _Tracer()
+    other = _Tracer()
+    remove_tracer = add_trace_hook(tracer)
+    remove_other = add_trace_hook(other)
+
+    await envoy.probe()
+    assert tracer.named(SPAN_PROBE) == [({"host": host}, None)]
+    assert (
+        {"host": host, "endpoint": URL_PRODUCTION_INVERTERS, "method": "GET"},
+        SPAN_PROBE,
+    ) in tracer.named(SPAN_REQUEST)
+
+    tracer.spans.clear()
+    await envoy.update()
+    updates = tracer.named(SPAN_UPDATE)
+    assert (
+        {"host": host, "updater": "EnvoyApiV1ProductionInvertersUpdater"},
+        None,
+    ) in updates
+    assert len(updates) == len(envoy._updaters)
+    # requests are traced within the update of the updater
+    assert (
+        {"host": host, "endpoint": URL_PRODUCTION_INVERTERS, "method": "GET"},
+        SPAN_UPDATE,
+    ) in tracer.named(SPAN_REQUEST)
+    decode = {
+        attributes["endpoint"]: (attributes["size"], parent)
+        for attributes, parent in tracer.named(SPAN_JSON_DECODE)
+    }
+    content = simulator.fixtures["api_v1_production_inverters"].encode()
+    assert decode[URL_PRODUCTION_INVERTERS] == (len(content), SPAN_UPDATE)
+    assert tracer.named(SPAN_BUILD) == [
+        ({"model": "EnvoyInverter", "count": 40}, SPAN_UPDATE)
+    ]
+    assert other.spans[-len(tracer.spans) :] == tracer.spans
+
+    # data sent is traced with its method
+    await envoy.request("/missing", data={"test": 1}, method="PUT")
+    assert tracer.named(SPAN_REQUEST)[-1] == (
+        {"host": host, "endpoint": "/missing", "method": "PUT"},
+        None,
+    )
+
+    remove_tracer()
+    remove_other()
+    tracer.spans.clear()
+    await envoy.update()
+    assert tracer.spans == []
+    await envoy.close()
+
+
+def test_span_without_hooks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify the same context manager doing nothing is used without hooks."""
+    monkeypatch.setattr(tracing, "_hooks", ())
+    assert span(SPAN_BUILD, model="EnvoyInverter") is span(SPAN_UPDATE)
+    with span(SPAN_BUILD, model="EnvoyInverter") as result:
+        assert result is None